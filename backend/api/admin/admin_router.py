@@ -585,15 +585,17 @@ async def get_activity_logs(
     db = client[os.environ['DB_NAME']]
     
     try:
+        from .audit_partitions import AuditLogPartitions
+        partitions = AuditLogPartitions(db)
+        
         # Get total count
-        total_count = await db.admin_logs.count_documents({})
+        total_count = await partitions.count()
         
         # Calculate pagination
         skip = (page - 1) * limit
         
-        # Fetch logs sorted by timestamp (newest first)
-        logs_cursor = db.admin_logs.find({}).sort("timestamp", -1).skip(skip).limit(limit)
-        logs = await logs_cursor.to_list(length=limit)
+        # Fetch logs sorted by timestamp (newest first) across monthly partitions
+        logs = await partitions.find(skip=skip, limit=limit, projection={"_id": 0})
         
         return {
             "data": logs,
@@ -2048,15 +2050,18 @@ async def get_audit_logs(
         if admin_email:
             query["admin_email"] = admin_email
         
+        from .audit_partitions import AuditLogPartitions
+        partitions = AuditLogPartitions(db)
+        
         # Get total count
-        total = await db.admin_logs.count_documents(query)
+        total = await partitions.count(query)
         
         # Calculate pagination
         skip, limit = get_skip_limit(page, limit)
         pagination = calculate_pagination(page, limit, total)
         
-        # Fetch logs with pagination
-        logs = await db.admin_logs.find(query).sort("timestamp", -1).skip(skip).limit(limit).to_list(limit)
+        # Fetch logs with pagination across monthly partitions (newest first)
+        logs = await partitions.find(query, skip=skip, limit=limit)
         
         # Format logs for response
         formatted_logs = []
@@ -2092,49 +2097,27 @@ async def get_audit_stats(
     """
     from motor.motor_asyncio import AsyncIOMotorClient
     import os
-    from datetime import datetime, timedelta
     
     mongo_url = os.environ['MONGO_URL']
     client = AsyncIOMotorClient(mongo_url)
     db = client[os.environ['DB_NAME']]
     
     try:
-        # Get stats for last 7 days
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        
-        total_actions = await db.admin_logs.count_documents({})
-        recent_actions = await db.admin_logs.count_documents({
-            "timestamp": {"$gte": seven_days_ago}
-        })
+        from .audit_rollups import get_audit_summary
         
-        # Count by action type
-        actions_pipeline = [
-            {"$group": {"_id": "$action", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        actions_by_type = await db.admin_logs.aggregate(actions_pipeline).to_list(100)
+        # Read pre-aggregated hourly/daily rollups (last 7 days for recent)
+        summary = await get_audit_summary(db, recent_days=7)
+        all_time = summary["all_time"]
         
-        # Count by entity
-        entities_pipeline = [
-            {"$group": {"_id": "$entity", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        actions_by_entity = await db.admin_logs.aggregate(entities_pipeline).to_list(100)
-        
-        # Most active admins
-        admins_pipeline = [
-            {"$group": {"_id": "$admin_email", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 5}
-        ]
-        active_admins = await db.admin_logs.aggregate(admins_pipeline).to_list(5)
+        def ranked(counts: Dict, limit: int = 100):
+            return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
         
         return {
-            "total_actions": total_actions,
-            "recent_actions": recent_actions,
-            "actions_by_type": [{"action": item["_id"], "count": item["count"]} for item in actions_by_type],
-            "actions_by_entity": [{"entity": item["_id"], "count": item["count"]} for item in actions_by_entity],
-            "active_admins": [{"email": item["_id"], "count": item["count"]} for item in active_admins]
+            "total_actions": all_time["total"],
+            "recent_actions": summary["recent"]["total"],
+            "actions_by_type": [{"action": name, "count": count} for name, count in ranked(all_time["actions"])],
+            "actions_by_entity": [{"entity": name, "count": count} for name, count in ranked(all_time["entities"])],
+            "active_admins": [{"email": email, "count": count} for email, count in ranked(all_time["admins"], 5)]
         }
     except Exception as e:
         logger.error(f"Error fetching audit stats: {str(e)}")
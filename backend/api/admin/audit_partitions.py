@@ -0,0 +1,400 @@
+"""
+Monthly partitions of the admin audit log.
+
+Entries are written to one collection per month (admin_logs_YYYY_MM).
+Queries fan out across the partitions overlapping the requested time range,
+newest first, so recent pages only touch the current partition. Partitions
+older than the hot retention window are archived to compressed Extended-JSON
+lines under the backup directory and dropped.
+"""
+import asyncio
+import gzip
+import logging
+import os
+import re
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from api.phase14_backup import BACKUP_DIR
+
+logger = logging.getLogger(__name__)
+
+LEGACY_COLLECTION = "admin_logs"
+PARTITION_PREFIX = "admin_logs_"
+PARTITION_PATTERN = re.compile(r"^admin_logs_(\d{4})_(\d{2})$")
+AUDIT_HOT_RETENTION_MONTHS = int(os.environ.get("AUDIT_HOT_RETENTION_MONTHS", "12"))  # Months kept queryable
+AUDIT_ARCHIVE_DIR = BACKUP_DIR / "audit_archive"
+AUDIT_MAINTENANCE_INTERVAL = int(os.environ.get("AUDIT_MAINTENANCE_INTERVAL", str(24 * 3600)))  # Seconds
+MIGRATION_BATCH_SIZE = 1000
+ARCHIVE_BATCH_SIZE = 1000
+MAINTENANCE_LEASE_COLLECTION = "audit_maintenance"
+MAINTENANCE_LEASE_ID = "lease"
+AUDIT_MAINTENANCE_LEASE_SECONDS = int(os.environ.get("AUDIT_MAINTENANCE_LEASE_SECONDS", "600"))  # Renewed while maintenance runs
+
+# Per-partition indexes: a month of data and four B-trees instead of six over all history
+PARTITION_INDEXES = [
+    IndexModel([("id", ASCENDING)], unique=True),
+    IndexModel([("timestamp", DESCENDING)]),
+    IndexModel([("admin_email", ASCENDING), ("timestamp", DESCENDING)]),
+    IndexModel([("entity", ASCENDING), ("action", ASCENDING), ("timestamp", DESCENDING)])
+]
+
+# Partitions whose indexes were created by this process
+_indexed_partitions = set()
+
+
+def partition_name(timestamp: datetime) -> str:
+    """Name of the partition holding entries from this timestamp's month"""
+    return f"{PARTITION_PREFIX}{timestamp.year:04d}_{timestamp.month:02d}"
+
+
+def _partition_month(name: str) -> Optional[Tuple[int, int]]:
+    match = PARTITION_PATTERN.match(name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def _entry_timestamp(entry: Dict[str, Any]) -> datetime:
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, datetime):
+        return timestamp
+    if "_id" in entry and hasattr(entry["_id"], "generation_time"):
+        return entry["_id"].generation_time.replace(tzinfo=None)
+    return datetime.utcnow()
+
+
+class AuditLogPartitions:
+    """
+    Router over the monthly admin log partitions of a database.
+
+    Exposes insert_many and database like a collection, so the audit sink
+    can write through it directly.
+    """
+
+    def __init__(self, db, archive_dir: Path = AUDIT_ARCHIVE_DIR, hot_retention_months: int = AUDIT_HOT_RETENTION_MONTHS):
+        self.db = db
+        self.archive_dir = Path(archive_dir)
+        self.hot_retention_months = hot_retention_months
+        self._lease_owner: Optional[str] = None
+
+    @property
+    def database(self):
+        return self.db
+
+    async def ensure_partition(self, name: str):
+        """Create the partition's indexes once per process"""
+        if name in _indexed_partitions:
+            return
+        await self.db[name].create_indexes(PARTITION_INDEXES)
+        _indexed_partitions.add(name)
+
+    async def insert_many(self, entries: List[Dict[str, Any]], ordered: bool = False):
+        """
+        Insert entries into the partitions of their months.
+
+        Every partition is attempted even when an earlier one fails. Write
+        errors are raised together as one BulkWriteError whose indexes refer
+        to `entries`, like a single collection's insert_many; any other
+        failure is raised after the remaining partitions were tried.
+        """
+        by_partition: Dict[str, List[int]] = {}
+        for index, entry in enumerate(entries):
+            by_partition.setdefault(partition_name(_entry_timestamp(entry)), []).append(index)
+
+        write_errors = []
+        inserted = 0
+        failure: Optional[Exception] = None
+        for name, indexes in by_partition.items():
+            batch = [entries[i] for i in indexes]
+            try:
+                await self.ensure_partition(name)
+                await self.db[name].insert_many(batch, ordered=ordered)
+                inserted += len(batch)
+            except BulkWriteError as e:
+                inserted += e.details.get("nInserted", 0)
+                for error in e.details.get("writeErrors", []):
+                    write_errors.append({**error, "index": indexes[error["index"]]})
+            except Exception as e:
+                failure = failure or e
+
+        if failure is not None:
+            raise failure
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "nInserted": inserted})
+
+    async def list_partitions(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[str]:
+        """
+        Partitions overlapping [since, until), newest first.
+
+        The pre-partitioning admin_logs collection is listed last while it
+        still exists; it is migrated newest-first, so whatever remains in it
+        is older than anything in the monthly partitions.
+        """
+        names = await self.db.list_collection_names()
+        low = _month_index(since.year, since.month) if since else None
+        high = _month_index(until.year, until.month) if until else None
+
+        partitions = []
+        for name in names:
+            month = _partition_month(name)
+            if not month:
+                continue
+            index = _month_index(*month)
+            if (low is not None and index < low) or (high is not None and index > high):
+                continue
+            partitions.append((index, name))
+        ordered = [name for _, name in sorted(partitions, reverse=True)]
+
+        if LEGACY_COLLECTION in names:
+            ordered.append(LEGACY_COLLECTION)
+        return ordered
+
+    @staticmethod
+    def _range_query(query: Optional[Dict[str, Any]], since: Optional[datetime], until: Optional[datetime]) -> Dict[str, Any]:
+        query = dict(query or {})
+        if since or until:
+            timestamp_filter = {}
+            if since:
+                timestamp_filter["$gte"] = since
+            if until:
+                timestamp_filter["$lt"] = until
+            query["timestamp"] = timestamp_filter
+        return query
+
+    async def count(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """Count matching entries across the partitions in range"""
+        query = self._range_query(query, since, until)
+        counts = await asyncio.gather(*[
+            self.db[name].count_documents(query) for name in await self.list_partitions(since, until)
+        ])
+        return sum(counts)
+
+    async def find(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Matching entries newest first.
+
+        Partitions are walked newest to oldest; whole partitions are skipped
+        by count, so a page only reads the partitions it actually spans.
+        """
+        query = self._range_query(query, since, until)
+        results = []
+        remaining_skip = max(skip, 0)
+
+        for name in await self.list_partitions(since, until):
+            if len(results) >= limit:
+                break
+            collection = self.db[name]
+            if remaining_skip:
+                matching = await collection.count_documents(query)
+                if matching <= remaining_skip:
+                    remaining_skip -= matching
+                    continue
+            cursor = collection.find(query, projection).sort("timestamp", DESCENDING)
+            documents = await cursor.skip(remaining_skip).limit(limit - len(results)).to_list(length=limit)
+            remaining_skip = 0
+            results.extend(documents)
+
+        return results
+
+    async def migrate_legacy(self) -> int:
+        """
+        Move entries from the single admin_logs collection into partitions.
+
+        Entries move newest first in batches (copy, then delete), so the
+        legacy collection always holds the oldest remaining entries and
+        queries stay correctly ordered while the migration runs. Safe to
+        re-run: already-copied entries are skipped on their unique id.
+
+        Returns:
+            Number of entries moved
+        """
+        if LEGACY_COLLECTION not in await self.db.list_collection_names():
+            return 0
+
+        legacy = self.db[LEGACY_COLLECTION]
+        moved = 0
+        while True:
+            batch = await legacy.find().sort([("timestamp", DESCENDING), ("_id", DESCENDING)]).limit(MIGRATION_BATCH_SIZE).to_list(length=MIGRATION_BATCH_SIZE)
+            if not batch:
+                break
+            try:
+                await self.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                # Duplicates from an interrupted earlier run are fine
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            await legacy.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            moved += len(batch)
+            await self.renew_lease()
+
+        await legacy.drop()
+        logger.info(f"Migrated {moved} audit log entries into monthly partitions")
+        return moved
+
+    def _archive_path(self, name: str) -> Path:
+        return self.archive_dir / f"{name}.jsonl.gz"
+
+    async def acquire_lease(self) -> bool:
+        """
+        Become the one worker maintaining the partitions.
+
+        The lease is a document in Mongo that expires unless renewed, so a
+        worker that dies mid-maintenance is replaced on a later run.
+        """
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        now = datetime.utcnow()
+        try:
+            await self.db[MAINTENANCE_LEASE_COLLECTION].update_one(
+                {"_id": MAINTENANCE_LEASE_ID, "expires_at": {"$lt": now}},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=AUDIT_MAINTENANCE_LEASE_SECONDS)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Held by another worker
+            return False
+        self._lease_owner = owner
+        return True
+
+    async def renew_lease(self):
+        """Extend the lease; raises if another worker has taken it over"""
+        if self._lease_owner is None:
+            return
+        result = await self.db[MAINTENANCE_LEASE_COLLECTION].update_one(
+            {"_id": MAINTENANCE_LEASE_ID, "owner": self._lease_owner},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=AUDIT_MAINTENANCE_LEASE_SECONDS)}}
+        )
+        if result.matched_count == 0:
+            self._lease_owner = None
+            raise RuntimeError("Audit maintenance lease lost to another worker")
+
+    async def release_lease(self):
+        if self._lease_owner is None:
+            return
+        await self.db[MAINTENANCE_LEASE_COLLECTION].delete_one({"_id": MAINTENANCE_LEASE_ID, "owner": self._lease_owner})
+        self._lease_owner = None
+
+    @staticmethod
+    def _count_archive_lines(path: Path) -> int:
+        with gzip.open(path, "rt") as archive_file:
+            return sum(1 for line in archive_file if line.strip())
+
+    async def archive_partition(self, name: str) -> int:
+        """
+        Write a partition to a gzip Extended-JSON lines file, then drop it.
+
+        The collection is only dropped after the file is complete, its line
+        count (re-read from disk) matches the partition, and the maintenance
+        lease is still held.
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = self._archive_path(name)
+        temp_path = archive_path.with_name(f"{archive_path.name}.{os.getpid()}.tmp")
+        loop = asyncio.get_running_loop()
+        collection = self.db[name]
+
+        count = 0
+        archive_file = await loop.run_in_executor(None, gzip.open, temp_path, "wt")
+        try:
+            batch = []
+            async for document in collection.find().sort("_id", ASCENDING).batch_size(ARCHIVE_BATCH_SIZE):
+                batch.append(json_util.dumps(document))
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    await loop.run_in_executor(None, archive_file.write, "\n".join(batch) + "\n")
+                    count += len(batch)
+                    batch = []
+                    await self.renew_lease()
+            if batch:
+                await loop.run_in_executor(None, archive_file.write, "\n".join(batch) + "\n")
+                count += len(batch)
+        except BaseException:
+            await loop.run_in_executor(None, archive_file.close)
+            temp_path.unlink(missing_ok=True)
+            raise
+        await loop.run_in_executor(None, archive_file.close)
+
+        if count != await collection.count_documents({}):
+            temp_path.unlink(missing_ok=True)
+            raise RuntimeError(f"Audit partition {name} changed while archiving; will retry")
+
+        os.replace(temp_path, archive_path)
+        archived = await loop.run_in_executor(None, self._count_archive_lines, archive_path)
+        if archived != count:
+            raise RuntimeError(f"Audit archive {archive_path} holds {archived} of {count} entries; keeping {name}")
+        await self.renew_lease()
+        await collection.drop()
+        _indexed_partitions.discard(name)
+        logger.info(f"Archived {count} audit entries from {name} to {archive_path}")
+        return count
+
+    async def archive_expired(self, now: Optional[datetime] = None) -> List[str]:
+        """Archive partitions that fall outside the hot retention window"""
+        now = now or datetime.utcnow()
+        oldest_hot = _month_index(now.year, now.month) - self.hot_retention_months + 1
+        archived = []
+        for name in await self.list_partitions():
+            month = _partition_month(name)
+            if month and _month_index(*month) < oldest_hot:
+                await self.archive_partition(name)
+                archived.append(name)
+        return archived
+
+    def list_archives(self) -> List[Dict[str, Any]]:
+        """Archived partitions available under the backup directory"""
+        if not self.archive_dir.exists():
+            return []
+        return [
+            {"partition": path.name[:-len(".jsonl.gz")], "file": str(path), "size": path.stat().st_size}
+            for path in sorted(self.archive_dir.glob(f"{PARTITION_PREFIX}*.jsonl.gz"))
+        ]
+
+    async def maintain(self) -> Dict[str, Any]:
+        """
+        Migrate legacy entries and archive expired partitions.
+
+        Every worker runs the maintenance loop; only the holder of the lease
+        does the work.
+        """
+        if not await self.acquire_lease():
+            return {"migrated": 0, "archived": [], "skipped": "maintenance running in another worker"}
+        try:
+            migrated = await self.migrate_legacy()
+            archived = await self.archive_expired()
+        finally:
+            await self.release_lease()
+        return {"migrated": migrated, "archived": archived}
+
+
+async def run_maintenance_loop(db, interval: int = AUDIT_MAINTENANCE_INTERVAL):
+    """Periodically maintain audit partitions (runs as a background task)"""
+    partitions = AuditLogPartitions(db)
+    while True:
+        try:
+            await partitions.maintain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Audit partition maintenance failed: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,268 @@
+"""Hourly and daily rollups of admin_logs, maintained as audit entries are written"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from .audit_partitions import AuditLogPartitions
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = "admin_log_rollups"
+BACKFILL_MARKER_ID = "backfill"
+BACKFILL_LEASE_SECONDS = 600  # An unfinished backfill not renewed for this long is taken over
+BACKFILL_SETTLE_SECONDS = 2.0  # Lets entries stamped before the cutoff leave other workers' sink buffers
+DUPLICATE_KEY_ERROR = 11000
+
+# Counter maps kept on every rollup document
+COUNTER_FIELDS = ("actions", "entities", "admins", "failed")
+
+GRANULARITIES = {
+    "hour": "%Y-%m-%dT%H",
+    "day": "%Y-%m-%d"
+}
+
+
+def _encode_key(key: Any) -> str:
+    """Make a value usable as a field name ('.' and '$' are not allowed in keys)"""
+    return str(key if key not in (None, "") else "unknown").replace(".", "．").replace("$", "＄")
+
+
+def _decode_key(key: str) -> str:
+    return key.replace("．", ".").replace("＄", "$")
+
+
+def _bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_id(bucket: datetime, granularity: str) -> str:
+    return f"{granularity}:{bucket.strftime(GRANULARITIES[granularity])}"
+
+
+def is_failed_action(action: Optional[str]) -> bool:
+    """Audit actions recording a failure (e.g. login_failed)"""
+    return bool(action) and "failed" in action.lower()
+
+
+def _empty_counters() -> Dict[str, Any]:
+    return {"total": 0, **{field: defaultdict(int) for field in COUNTER_FIELDS}}
+
+
+def _count(counters: Dict[str, Any], action: str, entity: str, admin_email: str, count: int = 1):
+    counters["total"] += count
+    counters["actions"][_encode_key(action)] += count
+    counters["entities"][_encode_key(entity)] += count
+    counters["admins"][_encode_key(admin_email)] += count
+    if is_failed_action(action):
+        counters["failed"][_encode_key(action)] += count
+
+
+# Entries stamped before this are counted by the backfill, not by the sinks
+_counted_from: Optional[datetime] = None
+
+
+def _increment_operations(buckets: Dict[tuple, Dict[str, Any]], tag: Optional[str] = None) -> List[UpdateOne]:
+    """
+    $inc upserts for a set of buckets.
+
+    With a tag, each increment applies at most once per rollup document: the
+    tag is recorded on the document, and re-applying it matches nothing and
+    fails the upsert with a duplicate key instead of counting twice.
+    """
+    operations = []
+    for (granularity, bucket), counters in buckets.items():
+        increments = {"total": counters["total"]}
+        for field in COUNTER_FIELDS:
+            for key, count in counters[field].items():
+                increments[f"{field}.{key}"] = count
+        query: Dict[str, Any] = {"_id": _rollup_id(bucket, granularity)}
+        update: Dict[str, Any] = {
+            "$inc": increments,
+            "$setOnInsert": {"granularity": granularity, "bucket": bucket}
+        }
+        if tag is not None:
+            query["backfilled"] = {"$ne": tag}
+            update["$addToSet"] = {"backfilled": tag}
+        operations.append(UpdateOne(query, update, upsert=True))
+    return operations
+
+
+async def record_entries(db, entries: Iterable[Dict[str, Any]]):
+    """
+    Add written audit entries to their hourly and daily rollups.
+
+    A batch usually touches a single hour, so this is one or two upserts.
+    """
+    buckets = defaultdict(_empty_counters)
+    for entry in entries:
+        timestamp = entry.get("timestamp")
+        if not isinstance(timestamp, datetime):
+            continue
+        if _counted_from is not None and timestamp < _counted_from:
+            continue
+        for granularity in GRANULARITIES:
+            _count(
+                buckets[(granularity, _bucket_start(timestamp, granularity))],
+                entry.get("action"), entry.get("entity"), entry.get("admin_email")
+            )
+
+    operations = _increment_operations(buckets)
+    if operations:
+        await db[ROLLUP_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def audit_sink_listener(collection, batch: List[Dict[str, Any]]):
+    """Audit sink hook - rolls up each batch after it is written"""
+    await record_entries(collection.database, batch)
+
+
+async def _claim_backfill(rollups) -> Optional[Dict[str, Any]]:
+    """The backfill marker if this worker should run (or resume) the backfill"""
+    now = datetime.utcnow()
+    marker = {"_id": BACKFILL_MARKER_ID, "cutoff": now, "started_at": now, "done_partitions": []}
+    try:
+        await rollups.insert_one(marker)
+        return marker
+    except DuplicateKeyError:
+        pass
+    # Take over a backfill whose worker died part way through
+    return await rollups.find_one_and_update(
+        {
+            "_id": BACKFILL_MARKER_ID,
+            "completed_at": {"$exists": False},
+            "started_at": {"$lt": now - timedelta(seconds=BACKFILL_LEASE_SECONDS)}
+        },
+        {"$set": {"started_at": now}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def _write_backfill(rollups, operations: List[UpdateOne]):
+    for i in range(0, len(operations), 500):
+        try:
+            await rollups.bulk_write(operations[i:i + 500], ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys are increments an interrupted run already applied
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                raise
+
+
+async def backfill_rollups(db) -> bool:
+    """
+    Build rollups for audit entries written before rollups existed.
+
+    A marker document holds a cutoff: the backfill counts entries stamped
+    before it and the sinks only count entries from it on, so workers whose
+    sinks start while the backfill runs do not double count. Progress is
+    recorded per partition and each partition's increments are tagged, so a
+    backfill whose worker died is resumed by another worker once its lease
+    expires, without counting anything twice. Call it before the audit sink
+    starts.
+
+    Returns:
+        True if this call performed the backfill
+    """
+    global _counted_from
+    rollups = db[ROLLUP_COLLECTION]
+    marker = await _claim_backfill(rollups)
+    if marker is None:
+        existing = await rollups.find_one({"_id": BACKFILL_MARKER_ID}) or {}
+        _counted_from = existing.get("cutoff")  # None for backfills from before the cutoff existed
+        return False
+
+    cutoff = _counted_from = marker.get("cutoff") or marker["started_at"]
+    # Entries stamped just before the cutoff may still be buffered by other workers
+    await asyncio.sleep(max(0.0, BACKFILL_SETTLE_SECONDS - (datetime.utcnow() - cutoff).total_seconds()))
+
+    pipeline = [
+        {"$match": {"timestamp": {"$type": "date", "$lt": cutoff}}},
+        {"$group": {
+            "_id": {
+                "hour": {"$dateToString": {"format": GRANULARITIES["hour"], "date": "$timestamp"}},
+                "action": "$action",
+                "entity": "$entity",
+                "admin_email": "$admin_email"
+            },
+            "count": {"$sum": 1}
+        }}
+    ]
+    done = set(marker.get("done_partitions", []))
+    documents = 0
+    for partition in await AuditLogPartitions(db).list_partitions():
+        if partition in done:
+            continue
+        buckets = defaultdict(_empty_counters)
+        async for group in db[partition].aggregate(pipeline, allowDiskUse=True):
+            key = group["_id"]
+            hour = datetime.strptime(key["hour"], GRANULARITIES["hour"])
+            for granularity in GRANULARITIES:
+                _count(
+                    buckets[(granularity, _bucket_start(hour, granularity))],
+                    key.get("action"), key.get("entity"), key.get("admin_email"), group["count"]
+                )
+
+        operations = _increment_operations(buckets, tag=partition)
+        await _write_backfill(rollups, operations)
+        documents += len(operations)
+        # Record progress and renew the lease
+        await rollups.update_one(
+            {"_id": BACKFILL_MARKER_ID},
+            {"$addToSet": {"done_partitions": partition}, "$set": {"started_at": datetime.utcnow()}}
+        )
+
+    await rollups.update_one({"_id": BACKFILL_MARKER_ID}, {"$set": {"completed_at": datetime.utcnow()}})
+    logger.info(f"Backfilled {documents} audit rollup updates (entries before {cutoff.isoformat()})")
+    return True
+
+
+async def read_rollups(
+    db,
+    granularity: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Rollup documents of one granularity, oldest first, with decoded counter keys"""
+    query: Dict[str, Any] = {"granularity": granularity}
+    if since or until:
+        query["bucket"] = {}
+        if since:
+            query["bucket"]["$gte"] = _bucket_start(since, granularity)
+        if until:
+            query["bucket"]["$lt"] = until
+    documents = await db[ROLLUP_COLLECTION].find(query).sort("bucket", 1).to_list(length=None)
+    for document in documents:
+        document.pop("backfilled", None)
+        for field in COUNTER_FIELDS:
+            document[field] = {_decode_key(key): count for key, count in document.get(field, {}).items()}
+    return documents
+
+
+def merge_rollups(documents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum rollup documents into a single set of counters"""
+    merged = {"total": 0, **{field: defaultdict(int) for field in COUNTER_FIELDS}}
+    for document in documents:
+        merged["total"] += document.get("total", 0)
+        for field in COUNTER_FIELDS:
+            for key, count in document.get(field, {}).items():
+                merged[field][key] += count
+    return {"total": merged["total"], **{field: dict(merged[field]) for field in COUNTER_FIELDS}}
+
+
+async def get_audit_summary(db, recent_days: int = 7) -> Dict[str, Any]:
+    """
+    All-time and recent audit counters read from rollups.
+
+    Cost depends on the number of days covered, not on the size of admin_logs.
+    """
+    all_time = merge_rollups(await read_rollups(db, "day"))
+    recent = merge_rollups(
+        await read_rollups(db, "hour", since=datetime.utcnow() - timedelta(days=recent_days))
+    )
+    return {"all_time": all_time, "recent": recent}
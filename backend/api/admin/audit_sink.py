@@ -0,0 +1,230 @@
+"""Buffered, batched writer for the admin audit trail (monthly admin_logs partitions)"""
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
+
+from metrics_registry import MetricFamily, collect_stats, metrics_registry
+
+from .audit_partitions import AuditLogPartitions
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FLUSH_BATCH_SIZE = int(os.environ.get("AUDIT_FLUSH_BATCH_SIZE", "100"))  # Entries per insert_many
+AUDIT_FLUSH_INTERVAL_MS = int(os.environ.get("AUDIT_FLUSH_INTERVAL_MS", "250"))  # Max time an entry waits for a batch
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))  # Buffered entries before callers wait
+AUDIT_ENQUEUE_TIMEOUT = float(os.environ.get("AUDIT_ENQUEUE_TIMEOUT", "2.0"))  # Seconds a caller waits for room
+AUDIT_FLUSH_RETRIES = 3
+DUPLICATE_KEY_ERROR = 11000
+
+
+class AuditLogSink:
+    """
+    In-process audit sink.
+
+    Callers enqueue entries and return immediately; a single worker task
+    drains the queue and writes batches with insert_many once
+    AUDIT_FLUSH_BATCH_SIZE entries are buffered or AUDIT_FLUSH_INTERVAL_MS
+    has passed. When the queue is full callers wait for room (backpressure)
+    up to AUDIT_ENQUEUE_TIMEOUT before the entry is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        max_queue_size: int = AUDIT_QUEUE_SIZE
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._client: Optional[AsyncIOMotorClient] = None
+        self._collection = None
+        self._listeners: List[Callable[[Any, List[Dict[str, Any]]], Awaitable[None]]] = []
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "write_errors": 0
+        }
+
+    def _get_collection(self):
+        if self._collection is None:
+            self._client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+            self._collection = AuditLogPartitions(self._client[os.environ['DB_NAME']])
+        return self._collection
+
+    def use_collection(self, collection):
+        """
+        Write to an existing target instead of opening a dedicated client.
+
+        Anything with insert_many(batch, ordered=...) and a database attribute
+        works: the monthly partition router or a plain collection.
+        """
+        self._collection = collection
+
+    def add_listener(self, listener: Callable[[Any, List[Dict[str, Any]]], Awaitable[None]]):
+        """Register a coroutine called with (collection, batch) after each successful write"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def start(self):
+        """Start the flush worker (idempotent; also done on first enqueue)"""
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def enqueue(self, entry: Dict[str, Any]) -> bool:
+        """
+        Buffer an audit entry for writing.
+
+        Returns:
+            False if the entry was dropped because the buffer stayed full
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(entry), timeout=AUDIT_ENQUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._stats["dropped"] += 1
+                logger.error(f"Audit buffer full, dropped entry: {entry.get('action')} on {entry.get('entity')}")
+                return False
+        self._stats["enqueued"] += 1
+        return True
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for one entry, then gather more until the batch is full or the interval elapses"""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """
+        Write a batch, retrying only the entries that were not written.
+
+        insert_many sets _id on every entry, so an entry written by an
+        attempt that then failed comes back as a duplicate key on the retry;
+        that counts as written. Listeners see exactly the written entries.
+        """
+        pending = batch
+        written: List[Dict[str, Any]] = []
+        for attempt in range(1, AUDIT_FLUSH_RETRIES + 1):
+            try:
+                collection = self._get_collection()
+                await collection.insert_many(pending, ordered=False)
+                written.extend(pending)
+                pending = []
+                break
+            except BulkWriteError as e:
+                failed = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY_ERROR
+                }
+                written.extend(entry for i, entry in enumerate(pending) if i not in failed)
+                pending = [pending[i] for i in sorted(failed)]
+                error_message = str(e)
+            except Exception as e:
+                # Unknown which entries made it; duplicates on the retry tell
+                error_message = str(e)
+            if not pending:
+                break
+            self._stats["write_errors"] += 1
+            if attempt == AUDIT_FLUSH_RETRIES:
+                self._stats["dropped"] += len(pending)
+                logger.error(f"Failed to write {len(pending)} audit entries: {error_message}")
+                break
+            await asyncio.sleep(0.1 * 2 ** attempt)
+
+        if not written:
+            return
+        self._stats["written"] += len(written)
+        self._stats["batches"] += 1
+
+        for listener in self._listeners:
+            try:
+                await listener(collection, written)
+            except Exception as e:
+                logger.error(f"Audit sink listener failed: {str(e)}")
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Wait until every buffered entry has been written"""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def stop(self):
+        """Flush buffered entries and stop the worker (call on shutdown)"""
+        if self._worker is None:
+            return
+        if not self._worker.done():
+            await self.flush()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+        # Entries enqueued after the worker died are written directly
+        leftover = []
+        while self._queue is not None and not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        for i in range(0, len(leftover), self.batch_size):
+            await self._write(leftover[i:i + self.batch_size])
+
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._collection = None
+        logger.info(f"Audit sink stopped: {self._stats['written']} entries written, {self._stats['dropped']} dropped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sink statistics"""
+        return {
+            **self._stats,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000)
+        }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Sink metrics for the metrics registry"""
+        return collect_stats(
+            "audit_sink", self.get_stats(), "Audit log sink",
+            counters=("enqueued", "written", "batches", "dropped", "write_errors")
+        )
+
+
+# Global audit sink instance
+audit_sink = AuditLogSink()
+metrics_registry.register("audit_sink", audit_sink.collect_metrics)
@@ -6,20 +6,21 @@ from datetime import datetime, timedelta
 from typing import Optional
 import os
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
+from db_clients import motor_database
 from dotenv import load_dotenv
 from pathlib import Path
 
+from cache import principal_cache
+from password_hashing import password_hashing_pool
 from .schemas import AdminLogin, AdminToken, Admin, RefreshToken
 from .rate_limits import limiter, AUTH_RATE_LIMIT
+from .refresh_tokens import hash_refresh_token, revoked_refresh_tokens
 
 ROOT_DIR = Path(__file__).parent.parent.parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = motor_database()  # Shared client, created on first query
 
 # Security setup
 security = HTTPBearer()
@@ -31,6 +32,8 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480  # 8 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 30  # 30 days
 
+ADMIN_PRINCIPAL_NAMESPACE = "admin"
+
 logger = logging.getLogger(__name__)
 
 auth_router = APIRouter(prefix="/api/admin/auth", tags=["Admin Auth"])
@@ -47,6 +50,16 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    return await password_hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    return await password_hashing_pool.run(get_password_hash, password)
+
+
 # JWT utilities
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
@@ -56,7 +69,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    # iat identifies this token in the principal cache
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -71,14 +85,14 @@ def create_refresh_token(data: dict) -> str:
 
 
 async def store_refresh_token(admin_id: str, token: str) -> None:
-    """Store refresh token in database"""
+    """Store refresh token in database (by hash)"""
     expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     refresh_token = RefreshToken(
         admin_id=admin_id,
-        token=token,
+        token_hash=hash_refresh_token(token),
         expires_at=expires_at
     )
-    await db.refresh_tokens.insert_one(refresh_token.dict())
+    await db.refresh_tokens.insert_one(refresh_token.model_dump())
 
 
 async def verify_refresh_token(token: str) -> Optional[str]:
@@ -88,14 +102,19 @@ async def verify_refresh_token(token: str) -> Optional[str]:
         if payload.get("type") != "refresh":
             return None
         
-        # Check if token is in database and not revoked
-        token_doc = await db.refresh_tokens.find_one({
-            "token": token,
-            "is_revoked": False,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
+        # The signature proves the token was issued here; only revocation needs checking
+        token_hash = hash_refresh_token(token)
+        revoked = revoked_refresh_tokens.is_revoked(token_hash)
+        if revoked is None:
+            # Local revocation set is stale - ask the database
+            token_doc = await db.refresh_tokens.find_one({
+                "token_hash": token_hash,
+                "is_revoked": False,
+                "expires_at": {"$gt": datetime.utcnow()}
+            }, {"_id": 1})
+            revoked = token_doc is None
         
-        if not token_doc:
+        if revoked:
             return None
         
         email: str = payload.get("sub")
@@ -106,10 +125,13 @@ async def verify_refresh_token(token: str) -> Optional[str]:
 
 async def revoke_refresh_token(token: str) -> bool:
     """Revoke a refresh token"""
+    token_hash = hash_refresh_token(token)
+    now = datetime.utcnow()
     result = await db.refresh_tokens.update_one(
-        {"token": token},
-        {"$set": {"is_revoked": True}}
+        {"token_hash": token_hash},
+        {"$set": {"is_revoked": True, "revoked_at": now}}
     )
+    revoked_refresh_tokens.add(token_hash, now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     return result.modified_count > 0
 
 
@@ -126,7 +148,7 @@ async def authenticate_admin(email: str, password: str) -> Optional[Admin]:
     admin = await get_admin_by_email(email)
     if not admin:
         return None
-    if not verify_password(password, admin.hashed_password):
+    if not await verify_password_async(password, admin.hashed_password):
         return None
     return admin
 
@@ -134,6 +156,13 @@ async def authenticate_admin(email: str, password: str) -> Optional[Admin]:
 # Dependency to get current admin from JWT token
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Admin:
     """Validate JWT token and return current admin"""
+    token = credentials.credentials
+    
+    # Hot path: token already verified and principal cached
+    admin = principal_cache.get(ADMIN_PRINCIPAL_NAMESPACE, token)
+    if admin is not None:
+        return admin
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -141,7 +170,6 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
     )
     
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
@@ -149,6 +177,7 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
     except JWTError:
         raise credentials_exception
     
+    generation = principal_cache.generation(ADMIN_PRINCIPAL_NAMESPACE, email)
     admin = await get_admin_by_email(email)
     if admin is None:
         raise credentials_exception
@@ -159,9 +188,21 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
             detail="Admin account is inactive"
         )
     
+    principal_cache.set(
+        ADMIN_PRINCIPAL_NAMESPACE, token, email,
+        issued_at=payload.get("iat"),
+        token_expires=payload.get("exp"),
+        principal=admin,
+        generation=generation
+    )
     return admin
 
 
+def invalidate_admin_principal(email: str) -> None:
+    """Drop cached principals for an admin (call after role, password or status changes)"""
+    principal_cache.invalidate(ADMIN_PRINCIPAL_NAMESPACE, email)
+
+
 # Refresh token endpoint
 @auth_router.post("/refresh", response_model=AdminToken)
 @limiter.limit(AUTH_RATE_LIMIT)
@@ -9,6 +9,9 @@ import csv
 import sys
 sys.path.append('/app/backend')
 
+from .bulk_engine import bulk_engine
+from .audit_partitions import AuditLogPartitions
+
 logger = logging.getLogger(__name__)
 
 
@@ -210,7 +213,7 @@ class AuditExportService:
             query = filters or {}
             
             # Fetch logs
-            logs = await db.admin_logs.find(query).limit(limit).to_list(limit)
+            logs = await AuditLogPartitions(db).find(query, limit=limit)
             
             logger.info(f"[BACKGROUND JOB] Fetched {len(logs)} audit logs")
             
@@ -290,30 +293,17 @@ class BulkOperationsService:
             
             collection_ref = db[collection]
             
-            success_count = 0
-            failed_count = 0
-            failed_ids = []
-            
-            for item_id in ids:
-                try:
-                    result = await collection_ref.delete_one({"id": item_id})
-                    if result.deleted_count > 0:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                        failed_ids.append(item_id)
-                except Exception as e:
-                    logger.error(f"[BACKGROUND JOB] Failed to delete {item_id}: {str(e)}")
-                    failed_count += 1
-                    failed_ids.append(item_id)
+            outcome = await bulk_engine.delete_by_ids(collection_ref, ids)
             
             result = {
-                "success_count": success_count,
-                "failed_count": failed_count,
-                "failed_ids": failed_ids
+                "success_count": outcome["success_count"],
+                "failed_count": outcome["failed_count"],
+                "failed_ids": outcome["failed_ids"],
+                "outcomes": outcome["outcomes"],
+                "errors": outcome["errors"]
             }
             
-            logger.info(f"[BACKGROUND JOB] Bulk delete complete: {success_count} success, {failed_count} failed")
+            logger.info(f"[BACKGROUND JOB] Bulk delete complete: {result['success_count']} success, {result['failed_count']} failed")
             
             # Send completion email
             await EmailService.send_bulk_operation_report(
@@ -345,34 +335,22 @@ class BulkOperationsService:
             
             collection_ref = db[collection]
             
-            success_count = 0
-            failed_count = 0
-            failed_ids = []
-            
-            for item_id in ids:
-                try:
-                    result = await collection_ref.update_one(
-                        {"id": item_id},
-                        {"$set": {"status": new_status}}
-                    )
-                    if result.matched_count > 0:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                        failed_ids.append(item_id)
-                except Exception as e:
-                    logger.error(f"[BACKGROUND JOB] Failed to update {item_id}: {str(e)}")
-                    failed_count += 1
-                    failed_ids.append(item_id)
+            outcome = await bulk_engine.update_by_ids(
+                collection_ref,
+                ids,
+                {"$set": {"status": new_status}}
+            )
             
             result = {
-                "success_count": success_count,
-                "failed_count": failed_count,
-                "failed_ids": failed_ids,
+                "success_count": outcome["success_count"],
+                "failed_count": outcome["failed_count"],
+                "failed_ids": outcome["failed_ids"],
+                "outcomes": outcome["outcomes"],
+                "errors": outcome["errors"],
                 "new_status": new_status
             }
             
-            logger.info(f"[BACKGROUND JOB] Bulk status update complete: {success_count} success, {failed_count} failed")
+            logger.info(f"[BACKGROUND JOB] Bulk status update complete: {result['success_count']} success, {result['failed_count']} failed")
             
             # Send completion email
             await EmailService.send_bulk_operation_report(
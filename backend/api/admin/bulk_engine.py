@@ -0,0 +1,182 @@
+"""Shared bulk-write engine for bulk delete/update operations."""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+BULK_WRITE_CHUNK_SIZE = int(os.environ.get("BULK_WRITE_CHUNK_SIZE", "500"))  # Operations per bulk_write
+BULK_WRITE_CONCURRENCY = int(os.environ.get("BULK_WRITE_CONCURRENCY", "4"))  # Chunks in flight per call
+
+# Per-item outcomes
+OUTCOME_OK = "ok"
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_FAILED = "failed"
+
+
+class BulkWriteEngine:
+    """
+    Executes typed bulk writes in unordered chunks with bounded concurrency.
+
+    Every operation is paired with a key (usually the entity ``id``) so the
+    result can report an outcome per item instead of only aggregate counts.
+    """
+
+    def __init__(self, chunk_size: int = BULK_WRITE_CHUNK_SIZE, concurrency: int = BULK_WRITE_CONCURRENCY):
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = max(1, concurrency)
+
+    async def execute(
+        self,
+        collection,
+        operations: Sequence[Any],
+        keys: Optional[Sequence[str]] = None,
+        id_field: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run operations against a collection.
+
+        Args:
+            collection: Motor collection
+            operations: pymongo write models (UpdateOne, DeleteOne, ...)
+            keys: Key reported for each operation (defaults to its position)
+            id_field: When set, keys are values of this field and operations
+                whose document does not exist are reported as ``not_found``
+                (one ``find`` per chunk) instead of being sent.
+
+        Returns:
+            Dict with aggregate counts, failed keys and per-key outcomes
+        """
+        keys = [str(k) for k in keys] if keys is not None else [str(i) for i in range(len(operations))]
+        if len(keys) != len(operations):
+            raise ValueError("keys and operations must have the same length")
+
+        result = {
+            "requested_count": len(operations),
+            "success_count": 0,
+            "failed_count": 0,
+            "failed_ids": [],
+            "matched_count": 0,
+            "modified_count": 0,
+            "deleted_count": 0,
+            "upserted_count": 0,
+            "outcomes": {},
+            "errors": {}
+        }
+        if not operations:
+            return result
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        chunks = [
+            (operations[i:i + self.chunk_size], keys[i:i + self.chunk_size])
+            for i in range(0, len(operations), self.chunk_size)
+        ]
+        chunk_results = await asyncio.gather(*[
+            self._run_chunk(collection, chunk_ops, chunk_keys, id_field, semaphore)
+            for chunk_ops, chunk_keys in chunks
+        ])
+
+        for chunk_result in chunk_results:
+            for counter in ("matched_count", "modified_count", "deleted_count", "upserted_count"):
+                result[counter] += chunk_result[counter]
+            result["outcomes"].update(chunk_result["outcomes"])
+            result["errors"].update(chunk_result["errors"])
+
+        for key, outcome in result["outcomes"].items():
+            if outcome == OUTCOME_OK:
+                result["success_count"] += 1
+            else:
+                result["failed_count"] += 1
+                result["failed_ids"].append(key)
+
+        return result
+
+    async def _run_chunk(
+        self,
+        collection,
+        operations: Sequence[Any],
+        keys: List[str],
+        id_field: Optional[str],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        chunk_result = {
+            "matched_count": 0,
+            "modified_count": 0,
+            "deleted_count": 0,
+            "upserted_count": 0,
+            "outcomes": {},
+            "errors": {}
+        }
+
+        async with semaphore:
+            if id_field:
+                # One round trip tells which items exist at all
+                existing = {
+                    str(doc[id_field])
+                    async for doc in collection.find({id_field: {"$in": keys}}, {id_field: 1, "_id": 0})
+                }
+                pending = [(op, key) for op, key in zip(operations, keys) if key in existing]
+                for key in keys:
+                    if key not in existing:
+                        chunk_result["outcomes"][key] = OUTCOME_NOT_FOUND
+            else:
+                pending = list(zip(operations, keys))
+
+            if not pending:
+                return chunk_result
+
+            failed_indexes = {}
+            try:
+                write_result = await collection.bulk_write([op for op, _ in pending], ordered=False)
+                details = write_result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                failed_indexes = {err["index"]: err.get("errmsg", "write error") for err in details.get("writeErrors", [])}
+            except Exception as e:
+                logger.error(f"Bulk write chunk failed: {str(e)}")
+                for _, key in pending:
+                    chunk_result["outcomes"][key] = OUTCOME_FAILED
+                    chunk_result["errors"][key] = str(e)
+                return chunk_result
+
+        chunk_result["matched_count"] = details.get("nMatched", 0)
+        chunk_result["modified_count"] = details.get("nModified", 0)
+        chunk_result["deleted_count"] = details.get("nRemoved", 0)
+        chunk_result["upserted_count"] = details.get("nUpserted", 0)
+
+        for index, (_, key) in enumerate(pending):
+            if index in failed_indexes:
+                chunk_result["outcomes"][key] = OUTCOME_FAILED
+                chunk_result["errors"][key] = failed_indexes[index]
+            else:
+                chunk_result["outcomes"][key] = OUTCOME_OK
+
+        # Report outcomes in request order
+        chunk_result["outcomes"] = {key: chunk_result["outcomes"][key] for key in keys}
+        return chunk_result
+
+    async def delete_by_ids(self, collection, ids: Sequence[str], id_field: str = "id") -> Dict[str, Any]:
+        """Delete documents by id, reporting deleted / not_found / failed per id."""
+        unique_ids = list(dict.fromkeys(str(i) for i in ids))
+        operations = [DeleteOne({id_field: item_id}) for item_id in unique_ids]
+        return await self.execute(collection, operations, keys=unique_ids, id_field=id_field)
+
+    async def update_by_ids(
+        self,
+        collection,
+        ids: Sequence[str],
+        update: Dict[str, Any],
+        id_field: str = "id"
+    ) -> Dict[str, Any]:
+        """Apply the same update to documents by id, reporting an outcome per id."""
+        unique_ids = list(dict.fromkeys(str(i) for i in ids))
+        operations = [UpdateOne({id_field: item_id}, update) for item_id in unique_ids]
+        return await self.execute(collection, operations, keys=unique_ids, id_field=id_field)
+
+
+# Global engine instance shared by all bulk endpoints
+bulk_engine = BulkWriteEngine()
@@ -0,0 +1,300 @@
+"""Streaming bulk import of CSV / NDJSON files into entity collections."""
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import multiprocessing
+import typing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+
+from models import SessionBooking, Event, Blog, Psychologist, Volunteer, Career, ContactForm
+
+from .bulk_engine import bulk_engine, OUTCOME_OK
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))  # Rows validated and written per batch
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", str(min(4, os.cpu_count() or 1))))  # Validation processes
+MAX_REPORTED_ERRORS = 1000  # Row errors returned in the response (all are counted)
+LIST_SEPARATOR = ";"  # Separator for list fields in CSV cells
+
+IMPORT_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson"
+}
+
+# Entity -> model used to validate imported rows
+IMPORT_MODELS: Dict[str, Type[BaseModel]] = {
+    "sessions": SessionBooking,
+    "events": Event,
+    "blogs": Blog,
+    "psychologists": Psychologist,
+    "volunteers": Volunteer,
+    "jobs": Career,
+    "contacts": ContactForm
+}
+
+# Parsing reads the upload sequentially, so a single thread feeds the validation pool
+_import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-import")
+_validation_pool: Optional[ProcessPoolExecutor] = None
+
+
+def detect_format(filename: Optional[str], format: Optional[str] = None) -> str:
+    """Resolve the import format from an explicit value or the file extension"""
+    if format:
+        if format not in ("csv", "ndjson"):
+            raise ValueError("Format must be 'csv' or 'ndjson'")
+        return format
+    suffix = os.path.splitext(filename or "")[1].lower()
+    if suffix not in IMPORT_FORMATS:
+        raise ValueError(f"Cannot infer import format from '{filename}'; use .csv, .ndjson or .jsonl")
+    return IMPORT_FORMATS[suffix]
+
+
+def _list_fields(model: Type[BaseModel]) -> set:
+    """Names of model fields typed as lists (including Optional[List[...]])"""
+    fields = set()
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        candidates = typing.get_args(annotation) if typing.get_origin(annotation) is typing.Union else (annotation,)
+        if any(typing.get_origin(candidate) is list for candidate in candidates):
+            fields.add(name)
+    return fields
+
+
+def iter_csv_rows(stream: BinaryIO, list_fields: set) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line number, row) from a CSV file, reading it incrementally.
+
+    Empty cells are dropped so model defaults apply. List cells hold either a
+    JSON array or values separated by LIST_SEPARATOR.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for raw in reader:
+            row = {}
+            for key, value in raw.items():
+                if key is None or value is None:
+                    continue
+                key = key.strip()
+                value = value.strip()
+                if not key or value == "":
+                    continue
+                if key in list_fields:
+                    if value.startswith("["):
+                        try:
+                            value = json.loads(value)
+                        except ValueError:
+                            pass
+                    else:
+                        value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+                row[key] = value
+            if row:
+                yield reader.line_num, row
+    finally:
+        # Leave the upload's file object open for its owner
+        text.detach()
+
+
+def iter_ndjson_rows(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, row) from a newline-delimited JSON file, reading it incrementally"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def _read_batch(rows: Iterator[Tuple[int, Any]], batch_size: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """Pull up to batch_size parsed rows, splitting off rows that are not objects"""
+    batch = []
+    errors = []
+    for line_number, raw in rows:
+        if isinstance(raw, Exception):
+            errors.append({"row": line_number, "errors": [f"Invalid JSON: {raw}"]})
+        elif not isinstance(raw, dict):
+            errors.append({"row": line_number, "errors": ["Row must be a JSON object"]})
+        else:
+            batch.append((line_number, raw))
+        if len(batch) + len(errors) >= batch_size:
+            break
+    return batch, errors
+
+
+def validate_rows(entity: str, rows: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Tuple[int, str, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Validate rows against the entity model (runs in the validation pool).
+
+    Returns:
+        ([(line number, id, upsert update)], [row error])
+    """
+    model = IMPORT_MODELS[entity]
+    updates = []
+    errors = []
+    for line_number, raw in rows:
+        try:
+            record = model.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"row": line_number, "id": raw.get("id"), "errors": _format_validation_error(e)})
+            continue
+        document = record.model_dump()
+        item_id = str(document.pop("id"))
+        # Columns present in the file overwrite; generated defaults only apply on insert
+        provided = record.model_fields_set - {"id"}
+        update = {}
+        set_fields = {key: document[key] for key in provided}
+        insert_fields = {key: value for key, value in document.items() if key not in provided}
+        if set_fields:
+            update["$set"] = set_fields
+        if insert_fields:
+            update["$setOnInsert"] = insert_fields
+        updates.append((line_number, item_id, update))
+    return updates, errors
+
+
+def _get_validation_pool() -> ProcessPoolExecutor:
+    """Validation is pure-Python CPU work (notably e-mail checks), so it runs in processes"""
+    global _validation_pool
+    if _validation_pool is None:
+        _validation_pool = ProcessPoolExecutor(
+            max_workers=IMPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _validation_pool
+
+
+def shutdown_validation_pool():
+    """Stop the validation worker processes, if any were started (call on shutdown)"""
+    global _validation_pool
+    if _validation_pool is not None:
+        _validation_pool.shutdown(wait=False, cancel_futures=True)
+        _validation_pool = None
+
+
+class BulkImporter:
+    """Imports an uploaded file into an entity collection in validated, upserted batches"""
+
+    def __init__(self, collection, entity: str, batch_size: int = IMPORT_BATCH_SIZE):
+        if entity not in IMPORT_MODELS:
+            raise ValueError(f"Import not supported for entity: {entity}")
+        self.collection = collection
+        self.entity = entity
+        self.model = IMPORT_MODELS[entity]
+        self.batch_size = max(1, batch_size)
+
+    def _rows(self, stream: BinaryIO, format: str) -> Iterator[Tuple[int, Any]]:
+        if format == "csv":
+            return iter_csv_rows(stream, _list_fields(self.model))
+        return iter_ndjson_rows(stream)
+
+    async def _write(self, updates: List[Tuple[int, str, Dict[str, Any]]]) -> Tuple[Dict[str, Any], List[Tuple[int, str, Dict[str, Any]]]]:
+        result = await bulk_engine.execute(
+            self.collection,
+            [UpdateOne({"id": item_id}, update, upsert=True) for _, item_id, update in updates],
+            keys=[str(line_number) for line_number, _, _ in updates]
+        )
+        return result, updates
+
+    async def run(self, stream: BinaryIO, format: str) -> Dict[str, Any]:
+        """
+        Parse, validate and upsert every row of the stream.
+
+        Rows are parsed in batches on a thread, up to IMPORT_WORKERS batches
+        are validated in parallel processes, and the bulk write of one batch
+        overlaps with validation of the next ones. Invalid rows are reported
+        and skipped.
+
+        Returns:
+            Dict with row counts and per-row errors
+        """
+        loop = asyncio.get_running_loop()
+        rows = self._rows(stream, format)
+        validation_pool = _get_validation_pool()
+
+        summary = {
+            "total_rows": 0,
+            "imported_count": 0,
+            "inserted_count": 0,
+            "updated_count": 0,
+            "failed_count": 0,
+            "errors": [],
+            "errors_truncated": False
+        }
+
+        def record_errors(errors: List[Dict[str, Any]]):
+            summary["failed_count"] += len(errors)
+            room = MAX_REPORTED_ERRORS - len(summary["errors"])
+            if len(errors) > room:
+                summary["errors_truncated"] = True
+            summary["errors"].extend(errors[:max(room, 0)])
+
+        def record_write(result: Dict[str, Any], updates: List[Tuple[int, str, Dict[str, Any]]]):
+            summary["imported_count"] += result["success_count"]
+            summary["inserted_count"] += result["upserted_count"]
+            summary["updated_count"] += result["matched_count"]
+            record_errors([
+                {"row": line_number, "id": item_id, "errors": [result["errors"].get(str(line_number), "write failed")]}
+                for line_number, item_id, _ in updates
+                if result["outcomes"].get(str(line_number)) != OUTCOME_OK
+            ])
+
+        validating = deque()
+        pending_write = None
+        exhausted = False
+        try:
+            while not exhausted or validating:
+                if not exhausted:
+                    batch, errors = await loop.run_in_executor(_import_executor, _read_batch, rows, self.batch_size)
+                    summary["total_rows"] += len(batch) + len(errors)
+                    record_errors(errors)
+                    if batch:
+                        validating.append(loop.run_in_executor(validation_pool, validate_rows, self.entity, batch))
+                    elif not errors:
+                        exhausted = True
+
+                # Keep the pool busy; hand the oldest validated batch to the writer
+                if validating and (exhausted or len(validating) >= IMPORT_WORKERS):
+                    updates, errors = await validating.popleft()
+                    record_errors(errors)
+                    if pending_write:
+                        record_write(*await pending_write)
+                        pending_write = None
+                    if updates:
+                        pending_write = asyncio.ensure_future(self._write(updates))
+        except Exception:
+            for future in validating:
+                future.cancel()
+            if pending_write:
+                pending_write.cancel()
+            raise
+        finally:
+            rows.close()
+
+        if pending_write:
+            record_write(*await pending_write)
+
+        summary["errors"].sort(key=lambda item: item["row"])
+        logger.info(
+            f"Bulk import into {self.entity}: {summary['imported_count']}/{summary['total_rows']} rows imported, "
+            f"{summary['failed_count']} failed"
+        )
+        return summary
@@ -1,8 +1,7 @@
 """Bulk operations for admin panel"""
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
-from typing import List, Dict, Any
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, UploadFile, File
+from typing import List, Dict, Any, Optional
+from db_clients import motor_database
 import logging
 from datetime import datetime
 
@@ -10,15 +9,15 @@ from .auth import get_current_admin
 from .schemas import Admin
 from .permissions import require_delete_permission, require_admin_or_above
 from .utils import log_admin_action
-from .rate_limits import limiter, ADMIN_RATE_LIMIT, EXPORT_RATE_LIMIT
+from .rate_limits import limiter, ADMIN_RATE_LIMIT, EXPORT_RATE_LIMIT, UPLOAD_RATE_LIMIT
 from .background_tasks import AuditExportService, BulkOperationsService
+from .bulk_engine import bulk_engine
+from .bulk_import import BulkImporter, detect_format
 
 logger = logging.getLogger(__name__)
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = motor_database()  # Shared client, created on first query
 
 bulk_router = APIRouter(prefix="/api/admin/bulk", tags=["Admin Bulk Operations"])
 
@@ -92,9 +91,9 @@ async def bulk_delete(
     collection = db[collection_name]
     
     try:
-        # Perform bulk delete
-        result = await collection.delete_many({"id": {"$in": ids}})
-        deleted_count = result.deleted_count
+        # Perform bulk delete with per-id outcomes
+        result = await bulk_engine.delete_by_ids(collection, ids)
+        deleted_count = result["deleted_count"]
         
         # Log the bulk delete action
         await log_admin_action(
@@ -112,6 +111,8 @@ async def bulk_delete(
             "success": True,
             "deleted_count": deleted_count,
             "requested_count": len(ids),
+            "failed_ids": result["failed_ids"],
+            "outcomes": result["outcomes"],
             "entity": entity,
             "message": f"Successfully deleted {deleted_count} items"
         }
@@ -121,6 +122,72 @@ async def bulk_delete(
         raise HTTPException(status_code=500, detail=f"Bulk delete failed: {str(e)}")
 
 
+@bulk_router.post("/import/{entity}")
+@limiter.limit(UPLOAD_RATE_LIMIT)
+async def bulk_import(
+    request: Request,
+    entity: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    current_admin: Admin = Depends(require_admin_or_above)
+) -> Dict[str, Any]:
+    """
+    Import items for specified entity from a CSV or NDJSON file
+    
+    Rows are validated against the entity model and upserted on `id`;
+    invalid rows are reported without aborting the import.
+    
+    Args:
+        entity: Entity type (psychologists, events, volunteers, etc.)
+        file: CSV (header row) or NDJSON file
+        format: csv or ndjson (inferred from the file extension if omitted)
+        current_admin: Current authenticated admin
+    
+    Returns:
+        Dict with import counts and per-row errors
+    """
+    if entity not in ENTITY_COLLECTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid entity type: {entity}")
+    
+    try:
+        import_format = detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    collection = db[ENTITY_COLLECTIONS[entity]]
+    
+    try:
+        importer = BulkImporter(collection, entity)
+        result = await importer.run(file.file, import_format)
+        
+        await log_admin_action(
+            admin_id=current_admin.id,
+            admin_email=current_admin.email,
+            action="bulk_import",
+            entity=entity,
+            entity_id="bulk",
+            details=f"Imported {result['imported_count']} of {result['total_rows']} {entity} rows from {file.filename}"
+        )
+        
+        logger.info(f"Admin {current_admin.email} imported {result['imported_count']} {entity} items")
+        
+        return {
+            "success": True,
+            "entity": entity,
+            "format": import_format,
+            **result,
+            "message": f"Imported {result['imported_count']} of {result['total_rows']} rows"
+        }
+    
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    except Exception as e:
+        logger.error(f"Bulk import failed for {entity}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bulk import failed: {str(e)}")
+    finally:
+        await file.close()
+
+
 @bulk_router.get("/export/{entity}")
 @limiter.limit(EXPORT_RATE_LIMIT)
 async def bulk_export(
@@ -300,12 +367,13 @@ async def bulk_status_update(
     collection = db[collection_name]
     
     try:
-        # Perform bulk status update
-        result = await collection.update_many(
-            {"id": {"$in": ids}},
+        # Perform bulk status update with per-id outcomes
+        result = await bulk_engine.update_by_ids(
+            collection,
+            ids,
             {"$set": {"status": new_status}}
         )
-        updated_count = result.modified_count
+        updated_count = result["modified_count"]
         
         # Log the bulk update action
         await log_admin_action(
@@ -323,6 +391,8 @@ async def bulk_status_update(
             "success": True,
             "updated_count": updated_count,
             "requested_count": len(ids),
+            "failed_ids": result["failed_ids"],
+            "outcomes": result["outcomes"],
             "entity": entity,
             "new_status": new_status,
             "message": f"Successfully updated {updated_count} items"
@@ -1,8 +1,7 @@
 """Admin error tracking system"""
 from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import List, Dict, Any, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from db_clients import motor_database
 import logging
 from datetime import datetime
 from pydantic import BaseModel, Field
@@ -15,9 +14,7 @@ from .utils import get_skip_limit, calculate_pagination
 logger = logging.getLogger(__name__)
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = motor_database()  # Shared client, created on first query
 
 error_router = APIRouter(prefix="/api/admin/errors", tags=["Admin Error Tracking"])
 
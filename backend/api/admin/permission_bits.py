@@ -0,0 +1,65 @@
+"""
+Role permissions compiled to integer bitmasks.
+
+Every permission name gets one bit; each role's permission list is folded
+into a mask when its table is registered (at import, i.e. startup). A role
+holding the "*" wildcard gets ALL_PERMISSIONS (-1, every bit set), so a
+check is always a single AND: mask & required == required.
+"""
+from typing import Dict, Iterable, List
+
+WILDCARD = "*"
+ALL_PERMISSIONS = -1  # Every bit set, including bits registered later
+
+
+class PermissionRegistry:
+    """Assigns permission bits and holds the compiled mask of each role"""
+
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._role_masks: Dict[str, int] = {}
+
+    def bit(self, permission: str) -> int:
+        """Bit of a permission, assigning the next free one on first use"""
+        bit = self._bits.get(permission)
+        if bit is None:
+            bit = 1 << len(self._bits)
+            self._bits[permission] = bit
+        return bit
+
+    def mask(self, permissions: Iterable[str]) -> int:
+        """Combined mask of a list of permissions"""
+        result = 0
+        for permission in permissions:
+            if permission == WILDCARD:
+                return ALL_PERMISSIONS
+            result |= self.bit(permission)
+        return result
+
+    def register_roles(self, role_permissions: Dict[str, Iterable[str]]):
+        """
+        Compile a role table into masks.
+
+        Tables registered for the same role are merged, so the original
+        read/create/update/delete roles and the granular Phase 14.3 roles
+        share one mask per role.
+        """
+        for role, permissions in role_permissions.items():
+            self._role_masks[role] = self._role_masks.get(role, 0) | self.mask(permissions)
+
+    def role_mask(self, role: str) -> int:
+        """Mask of a role (0 for unknown roles)"""
+        return self._role_masks.get(role, 0)
+
+    def permissions(self, mask: int) -> List[str]:
+        """Names of the registered permissions set in a mask"""
+        return [name for name, bit in self._bits.items() if mask & bit]
+
+
+def has_permissions(mask: int, required: int) -> bool:
+    """True if the mask holds every bit of the required mask"""
+    return mask & required == required
+
+
+# Global permission registry
+permission_registry = PermissionRegistry()
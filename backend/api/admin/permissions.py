@@ -4,6 +4,7 @@ from typing import List
 from .auth import get_current_admin
 from .schemas import Admin
 from .utils import check_super_admin
+from .permission_bits import permission_registry, has_permissions
 
 
 # Permission levels for different roles
@@ -13,6 +14,12 @@ ROLE_PERMISSIONS = {
     "viewer": ["read"]
 }
 
+permission_registry.register_roles(ROLE_PERMISSIONS)
+
+CREATE_PERMISSION = permission_registry.mask(["create"])
+UPDATE_PERMISSION = permission_registry.mask(["update"])
+DELETE_PERMISSION = permission_registry.mask(["delete"])
+
 
 def check_permission(admin: Admin, required_permissions: List[str]) -> bool:
     """
@@ -25,8 +32,7 @@ def check_permission(admin: Admin, required_permissions: List[str]) -> bool:
     Returns:
         bool: True if admin has all required permissions
     """
-    admin_permissions = ROLE_PERMISSIONS.get(admin.role, [])
-    return all(perm in admin_permissions for perm in required_permissions)
+    return has_permissions(admin.permission_mask, permission_registry.mask(required_permissions))
 
 
 async def require_super_admin(current_admin: Admin = Depends(get_current_admin)) -> Admin:
@@ -66,7 +72,7 @@ async def require_create_permission(current_admin: Admin = Depends(get_current_a
     Raises:
         HTTPException: 403 if user doesn't have create permission
     """
-    if not check_permission(current_admin, ["create"]):
+    if not has_permissions(current_admin.permission_mask, CREATE_PERMISSION):
         raise HTTPException(
             status_code=403,
             detail="Create permission required"
@@ -81,7 +87,7 @@ async def require_update_permission(current_admin: Admin = Depends(get_current_a
     Raises:
         HTTPException: 403 if user doesn't have update permission
     """
-    if not check_permission(current_admin, ["update"]):
+    if not has_permissions(current_admin.permission_mask, UPDATE_PERMISSION):
         raise HTTPException(
             status_code=403,
             detail="Update permission required"
@@ -96,7 +102,7 @@ async def require_delete_permission(current_admin: Admin = Depends(get_current_a
     Raises:
         HTTPException: 403 if user doesn't have delete permission
     """
-    if not check_permission(current_admin, ["delete"]):
+    if not has_permissions(current_admin.permission_mask, DELETE_PERMISSION):
         raise HTTPException(
             status_code=403,
             detail="Delete permission required"
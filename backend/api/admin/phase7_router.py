@@ -16,8 +16,7 @@ from fastapi.security import HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from db_clients import motor_database
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -32,16 +31,14 @@ from .phase7_security import (
 )
 from .permissions import require_super_admin, require_admin_or_above, get_current_admin
 from .utils import log_admin_action
-from .auth import security
+from .auth import security, invalidate_admin_principal
 from .rate_limits import limiter, ADMIN_RATE_LIMIT
 
 ROOT_DIR = Path(__file__).parent.parent.parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = motor_database()  # Shared client, created on first query
 
 logger = logging.getLogger(__name__)
 
@@ -97,7 +94,6 @@ async def soft_delete_entity(
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="soft_delete",
@@ -159,7 +155,6 @@ async def restore_entity(
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="restore",
@@ -262,24 +257,24 @@ async def change_password(
     """
     Change admin password
     """
-    from .auth import verify_password, get_password_hash
+    from .auth import verify_password_async, get_password_hash_async
     
     # Verify current password
-    if not verify_password(password_data.current_password, admin["hashed_password"]):
+    if not await verify_password_async(password_data.current_password, admin["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Check if new password is same as old
-    if verify_password(password_data.new_password, admin["hashed_password"]):
+    if await verify_password_async(password_data.new_password, admin["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password"
         )
     
     # Update password
-    new_hashed_password = get_password_hash(password_data.new_password)
+    new_hashed_password = await get_password_hash_async(password_data.new_password)
     await db.admins.update_one(
         {"id": admin["id"]},
         {
@@ -289,10 +284,10 @@ async def change_password(
             }
         }
     )
+    invalidate_admin_principal(admin["email"])
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="password_change",
@@ -353,10 +348,10 @@ async def verify_2fa(
             {"id": admin["id"]},
             {"$set": {"two_factor_enabled": True}}
         )
+        invalidate_admin_principal(admin["email"])
         
         # Log action
         await log_admin_action(
-            db=db,
             admin_id=admin["id"],
             admin_email=admin["email"],
             action="2fa_enabled",
@@ -391,10 +386,10 @@ async def disable_2fa(
         {"id": admin["id"]},
         {"$set": {"two_factor_enabled": False}}
     )
+    invalidate_admin_principal(admin["email"])
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="2fa_disabled",
@@ -434,7 +429,6 @@ async def create_approval_request(
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="approval_request_created",
@@ -534,7 +528,6 @@ async def review_approval_request(
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="approval_request_reviewed",
@@ -602,7 +595,6 @@ async def update_feature_toggle(
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="feature_toggle_updated",
@@ -728,7 +720,6 @@ async def purge_entity(
     
     # Log action
     await log_admin_action(
-        db=db,
         admin_id=admin["id"],
         admin_email=admin["email"],
         action="purge",
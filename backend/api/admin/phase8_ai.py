@@ -1,13 +1,18 @@
 """
 Phase 8.1A - AI Service Layer
 AI-assisted admin tools using OpenAI GPT-4o-mini via emergentintegrations
+
+The LLM SDK is imported when the first chat is created, so the API boots
+(and every other route works) without it or without an API key.
 """
 import os
-from typing import Dict, List, Optional, Any
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from dotenv import load_dotenv
 import uuid
 
+if TYPE_CHECKING:
+    from emergentintegrations.llm.chat import LlmChat
+
 load_dotenv()
 
 class AIBlogAssistant:
@@ -15,11 +20,12 @@ class AIBlogAssistant:
     
     def __init__(self):
         self.api_key = os.getenv("EMERGENT_LLM_KEY")
-        if not self.api_key:
-            raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
     
-    def _create_chat(self, system_message: str) -> LlmChat:
+    def _create_chat(self, system_message: str) -> "LlmChat":
         """Create a new LLM chat instance"""
+        if not self.api_key:
+            raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
+        from emergentintegrations.llm.chat import LlmChat
         session_id = f"blog-assistant-{uuid.uuid4()}"
         chat = LlmChat(
             api_key=self.api_key,
@@ -30,6 +36,11 @@ class AIBlogAssistant:
         chat.with_model("openai", "gpt-4o-mini")
         return chat
     
+    def _user_message(self, text: str):
+        """Wrap a prompt in the SDK's message type"""
+        from emergentintegrations.llm.chat import UserMessage
+        return UserMessage(text=text)
+    
     async def generate_draft(
         self, 
         topic: str, 
@@ -80,7 +91,7 @@ Create informative, empathetic, and engaging blog content. Focus on mental healt
 psychological insights, and community support. Use clear language accessible to general audiences."""
         
         chat = self._create_chat(system_message)
-        user_message = UserMessage(text=prompt)
+        user_message = self._user_message(prompt)
         
         response = await chat.send_message(user_message)
         
@@ -122,7 +133,7 @@ Provide the improved version maintaining the same general structure and key poin
 Improve content while maintaining its core message. Focus on clarity, engagement, and empathy."""
         
         chat = self._create_chat(system_message)
-        user_message = UserMessage(text=prompt)
+        user_message = self._user_message(prompt)
         
         response = await chat.send_message(user_message)
         
@@ -153,7 +164,7 @@ Provide only the tags as a comma-separated list, nothing else."""
         system_message = "You are a content categorization expert. Suggest relevant, specific tags."
         
         chat = self._create_chat(system_message)
-        user_message = UserMessage(text=prompt)
+        user_message = self._user_message(prompt)
         
         response = await chat.send_message(user_message)
         
@@ -182,7 +193,7 @@ Provide titles as a numbered list, nothing else."""
 that accurately represent the content and attract readers."""
         
         chat = self._create_chat(system_message)
-        user_message = UserMessage(text=prompt)
+        user_message = self._user_message(prompt)
         
         response = await chat.send_message(user_message)
         
@@ -218,7 +229,7 @@ Provide only the summary, nothing else."""
         system_message = "You are a professional content summarizer. Create clear, engaging summaries."
         
         chat = self._create_chat(system_message)
-        user_message = UserMessage(text=prompt)
+        user_message = self._user_message(prompt)
         
         response = await chat.send_message(user_message)
         
@@ -254,7 +265,7 @@ IMPROVEMENTS: [list 2-3 suggestions]"""
 Provide constructive, specific feedback on content quality."""
         
         chat = self._create_chat(system_message)
-        user_message = UserMessage(text=prompt)
+        user_message = self._user_message(prompt)
         
         response = await chat.send_message(user_message)
         
@@ -2,24 +2,21 @@
 Phase 8.1B - Basic Analytics Dashboard
 Session & event trends, blog engagement, volunteer stats, CSV exports
 """
-import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from pymongo import MongoClient
+from db_clients import LazyCollection, sync_database
 import csv
 import io
 
-# MongoDB connection
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = MongoClient(MONGO_URL)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
 # Collections
-sessions_collection = db['session_bookings']
-events_collection = db['events']
-blogs_collection = db['blogs']
-volunteers_collection = db['volunteers']
-contacts_collection = db['contact_forms']
+sessions_collection = LazyCollection(db, 'session_bookings')
+events_collection = LazyCollection(db, 'events')
+blogs_collection = LazyCollection(db, 'blogs')
+volunteers_collection = LazyCollection(db, 'volunteers')
+contacts_collection = LazyCollection(db, 'contact_forms')
 
 
 class AnalyticsEngine:
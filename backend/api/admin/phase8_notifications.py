@@ -2,20 +2,17 @@
 Phase 8.1A - Notification Rule Engine
 Automated notification system with rule-based triggers
 """
-import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from pymongo import MongoClient
+from db_clients import LazyCollection, sync_database
 import uuid
 
-# MongoDB connection
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = MongoClient(MONGO_URL)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
 # Collections
-notification_rules_collection = db['notification_rules']
-notifications_collection = db['notifications']
+notification_rules_collection = LazyCollection(db, 'notification_rules')
+notifications_collection = LazyCollection(db, 'notifications')
 
 
 class NotificationRuleEngine:
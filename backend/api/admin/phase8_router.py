@@ -13,13 +13,11 @@ from .phase8_workflows import workflow_engine
 from .phase8_analytics import analytics_engine
 from .utils import log_admin_action
 import os
-from pymongo import MongoClient
+from db_clients import sync_database
 from fastapi.responses import Response
 
-# MongoDB connection
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = MongoClient(MONGO_URL)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
 router = APIRouter(prefix="/api/admin/phase8", tags=["Phase 8 - Intelligence & Automation"])
 
@@ -2,20 +2,17 @@
 Phase 8.1A - Admin Workflow Automation
 Manual workflow triggers and automated task sequences
 """
-import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from pymongo import MongoClient
+from db_clients import LazyCollection, sync_database
 import uuid
 
-# MongoDB connection
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = MongoClient(MONGO_URL)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
 # Collections
-workflows_collection = db['workflows']
-workflow_executions_collection = db['workflow_executions']
+workflows_collection = LazyCollection(db, 'workflows')
+workflow_executions_collection = LazyCollection(db, 'workflow_executions')
 
 
 class WorkflowEngine:
@@ -2,12 +2,30 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
+from jose import JWTError, jwt
 import logging
+import os
+from typing import Optional
+
+from cache import principal_cache
 
 logger = logging.getLogger(__name__)
 
-# Create limiter instance
-limiter = Limiter(key_func=get_remote_address)
+# ============= STORAGE CONFIGURATION =============
+
+# Where counters live. memory:// is per process, so with several uvicorn
+# workers each one enforces the full limit on its own. For a shared limit
+# point every worker at the same store:
+#   redis://host:6379          - any Redis-protocol server (Redis, Valkey, KeyDB...)
+#   mongodb://host:27017       - the application's MongoDB (no extra dependency)
+RATE_LIMIT_STORAGE_URI = os.environ.get("RATE_LIMIT_STORAGE_URI", "memory://")
+
+# sliding-window-counter keeps two counters per key (current and previous
+# window, weighted) - O(1) memory and time, and no burst of 2x the limit at
+# window boundaries like fixed-window allows
+RATE_LIMIT_STRATEGY = os.environ.get("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+
+RATE_LIMIT_KEY_PREFIX = os.environ.get("RATE_LIMIT_KEY_PREFIX", "acube")
 
 # ============= RATE LIMIT CONFIGURATIONS =============
 
@@ -34,12 +52,70 @@ EXPORT_BURST_LIMIT = "20/hour"    # 20 exports per hour
 
 # ============= HELPER FUNCTIONS =============
 
+def token_principal(token: str) -> Optional[tuple]:
+    """
+    (namespace, subject) of an access token with a valid signature and expiry.
+
+    Taken from the token's claims, so every worker derives the same
+    principal whether or not it has cached it. Tokens verified by the auth
+    dependencies of this worker skip the decode.
+    """
+    principal = principal_cache.subject(token)
+    if principal is not None:
+        return principal
+
+    # Imported here - both modules import this one
+    from api.admin import auth
+    from api import phase12_users
+    try:
+        payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+        if payload.get("sub"):
+            return auth.ADMIN_PRINCIPAL_NAMESPACE, payload["sub"]
+    except JWTError:
+        pass
+    try:
+        payload = jwt.decode(token, phase12_users.JWT_SECRET_USER, algorithms=[phase12_users.JWT_ALGORITHM])
+        if payload.get("type") == "access" and payload.get("user_id"):
+            return phase12_users.USER_PRINCIPAL_NAMESPACE, payload["user_id"]
+    except JWTError:
+        pass
+    return None
+
+
 def get_rate_limit_key(request: Request) -> str:
-    """Generate rate limit key based on IP address."""
-    # In production, could use authenticated user ID for better tracking
+    """
+    Generate rate limit key for a request.
+
+    Requests carrying a valid bearer token are limited per principal, e.g.
+    "admin:<email>" or "user:<user_id>", so users behind a shared IP do not
+    exhaust each other's limits, and a client gets the same key from every
+    worker. Anything else, including invalid tokens, is limited per client IP.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        principal = token_principal(authorization[7:])
+        if principal is not None:
+            return f"{principal[0]}:{principal[1]}"
     return get_remote_address(request)
 
 
+def create_limiter(storage_uri: str = RATE_LIMIT_STORAGE_URI, strategy: str = RATE_LIMIT_STRATEGY) -> Limiter:
+    """
+    Create a limiter on the configured storage.
+
+    With shared storage, limits fall back to per-process memory while the
+    store is unreachable instead of failing requests.
+    """
+    shared = not storage_uri.startswith("memory://")
+    return Limiter(
+        key_func=get_rate_limit_key,
+        storage_uri=storage_uri,
+        strategy=strategy,
+        key_prefix=RATE_LIMIT_KEY_PREFIX,
+        in_memory_fallback_enabled=shared
+    )
+
+
 def log_rate_limit_exceeded(request: Request, limit: str):
     """Log when rate limit is exceeded."""
     ip = get_remote_address(request)
@@ -47,6 +123,10 @@ def log_rate_limit_exceeded(request: Request, limit: str):
     logger.warning(f"Rate limit exceeded: {ip} -> {path} (limit: {limit})")
 
 
+# Create limiter instance
+limiter = create_limiter()
+
+
 # ============= CUSTOM RATE LIMIT DECORATORS =============
 
 def public_rate_limit():
@@ -0,0 +1,198 @@
+"""
+Refresh token storage and revocation lookup.
+
+Refresh tokens are stored by SHA-256 hash, never as raw strings. Each
+process keeps the hashes of revoked, unexpired tokens in memory, loaded at
+startup and kept in sync from the collection, so verifying a refresh token
+normally needs no query: the JWT signature proves it was issued here and
+the local set says whether it was revoked. Expired tokens are removed by a
+TTL index on expires_at.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
+
+from metrics_registry import MetricFamily, collect_stats, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_COLLECTION = "refresh_tokens"
+REVOCATION_SYNC_INTERVAL = float(os.environ.get("REVOCATION_SYNC_INTERVAL", "5"))  # Seconds between syncs
+REVOCATION_MAX_STALENESS = float(os.environ.get("REVOCATION_MAX_STALENESS", "30"))  # Older local state falls back to a query
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=5)  # Re-read revocations this far back to cover clock skew
+MIGRATION_BATCH_SIZE = 500
+
+REFRESH_TOKEN_INDEXES = [
+    IndexModel([("id", ASCENDING)], unique=True),
+    IndexModel([("admin_id", ASCENDING)]),
+    IndexModel([("token_hash", ASCENDING)], unique=True, sparse=True),
+    IndexModel([("revoked_at", ASCENDING)], sparse=True),
+    IndexModel([("is_revoked", ASCENDING), ("expires_at", -1)]),
+    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl")
+]
+
+# Indexes from before tokens were hashed (raw token key, non-TTL expiry)
+LEGACY_INDEXES = ("token_1", "expires_at_1")
+
+
+def hash_refresh_token(token: str) -> str:
+    """Storage key for a refresh token"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def ensure_refresh_token_indexes(db):
+    """Create the refresh token indexes, replacing the legacy raw-token ones"""
+    collection = db[REFRESH_TOKEN_COLLECTION]
+    existing = await collection.index_information()
+    for name in LEGACY_INDEXES:
+        if name in existing:
+            await collection.drop_index(name)
+    await collection.create_indexes(REFRESH_TOKEN_INDEXES)
+
+
+async def migrate_legacy_tokens(db) -> int:
+    """
+    Replace raw stored tokens with their hashes.
+
+    Returns:
+        Number of token documents migrated
+    """
+    collection = db[REFRESH_TOKEN_COLLECTION]
+    migrated = 0
+    while True:
+        batch = await collection.find(
+            {"token": {"$exists": True}}, {"_id": 1, "token": 1}
+        ).limit(MIGRATION_BATCH_SIZE).to_list(length=MIGRATION_BATCH_SIZE)
+        if not batch:
+            break
+        await collection.bulk_write([
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"token_hash": hash_refresh_token(doc["token"])}, "$unset": {"token": ""}}
+            )
+            for doc in batch
+        ], ordered=False)
+        migrated += len(batch)
+    if migrated:
+        logger.info(f"Migrated {migrated} refresh tokens to hashed storage")
+    return migrated
+
+
+class RevokedTokenSet:
+    """
+    Process-local set of revoked refresh token hashes.
+
+    Holds only revoked tokens that have not yet expired, so it stays small.
+    Revocations made by this process are added immediately; those made by
+    other workers arrive with the next sync. If the set has not synced
+    within max_staleness, it answers "unknown" and callers query the
+    collection instead.
+    """
+
+    def __init__(self, sync_interval: float = REVOCATION_SYNC_INTERVAL, max_staleness: float = REVOCATION_MAX_STALENESS):
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self._revoked: Dict[str, datetime] = {}
+        self._synced_at: Optional[float] = None
+        self._synced_until: Optional[datetime] = None
+        self._stats = {
+            "local_answers": 0,
+            "fallback_queries": 0,
+            "syncs": 0,
+            "sync_errors": 0
+        }
+
+    def is_fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= self.max_staleness
+
+    def is_revoked(self, token_hash: str) -> Optional[bool]:
+        """
+        Check a token hash against the local set.
+
+        Returns:
+            True if revoked, False if definitely not revoked, None if the
+            local state is too stale to answer
+        """
+        if token_hash in self._revoked:
+            self._stats["local_answers"] += 1
+            return True
+        if not self.is_fresh():
+            self._stats["fallback_queries"] += 1
+            return None
+        self._stats["local_answers"] += 1
+        return False
+
+    def add(self, token_hash: str, expires_at: datetime):
+        self._revoked[token_hash] = expires_at
+
+    def _prune(self, now: datetime):
+        for token_hash in [h for h, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[token_hash]
+
+    async def sync(self, db):
+        """Load revocations since the last sync (everything unexpired on the first call)"""
+        now = datetime.utcnow()
+        query: Dict[str, Any] = {"is_revoked": True, "expires_at": {"$gt": now}}
+        if self._synced_until is not None:
+            query["revoked_at"] = {"$gte": self._synced_until - REVOCATION_SYNC_OVERLAP}
+
+        cursor = db[REFRESH_TOKEN_COLLECTION].find(query, {"_id": 0, "token_hash": 1, "expires_at": 1})
+        async for doc in cursor:
+            if doc.get("token_hash"):
+                self._revoked[doc["token_hash"]] = doc["expires_at"]
+
+        self._prune(now)
+        self._synced_until = now
+        self._synced_at = time.monotonic()
+        self._stats["syncs"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get revocation set statistics"""
+        return {
+            **self._stats,
+            "revoked_tokens": len(self._revoked),
+            "fresh": self.is_fresh(),
+            "last_sync_age_seconds": round(time.monotonic() - self._synced_at, 1) if self._synced_at is not None else None
+        }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Revocation set metrics for the metrics registry"""
+        return collect_stats(
+            "refresh_revocations", self.get_stats(), "Refresh token revocation set",
+            counters=("local_answers", "fallback_queries", "syncs", "sync_errors")
+        )
+
+
+async def run_revocation_sync_loop(db, revocations: "RevokedTokenSet" = None):
+    """Keep the revocation set in sync with the collection (runs as a background task)"""
+    revocations = revocations or revoked_refresh_tokens
+    while True:
+        try:
+            await revocations.sync(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            revocations._stats["sync_errors"] += 1
+            logger.error(f"Refresh token revocation sync failed: {str(e)}")
+        await asyncio.sleep(revocations.sync_interval)
+
+
+async def prepare_refresh_tokens(db):
+    """Hash legacy tokens and set up indexes (call on startup, before syncing)"""
+    await migrate_legacy_tokens(db)
+    try:
+        await ensure_refresh_token_indexes(db)
+    except OperationFailure as e:
+        logger.error(f"Refresh token index setup failed: {str(e)}")
+
+
+# Global revocation set
+revoked_refresh_tokens = RevokedTokenSet()
+metrics_registry.register("refresh_revocations", revoked_refresh_tokens.collect_metrics)
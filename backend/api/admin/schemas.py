@@ -1,8 +1,11 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
+from functools import cached_property
 from typing import List, Any, Optional
 import uuid
 
+from .permission_bits import permission_registry
+
 
 class AdminLogin(BaseModel):
     """Schema for admin login request"""
@@ -32,6 +35,11 @@ class Admin(BaseModel):
     two_factor_enabled: bool = False
     two_factor_secret: str = ""  # For future TOTP implementation
 
+    @cached_property
+    def permission_mask(self) -> int:
+        """Compiled permissions of the admin's role (computed once per cached principal)"""
+        return permission_registry.role_mask(self.role)
+
 
 class AdminCreate(BaseModel):
     """Schema for creating an admin"""
@@ -57,10 +65,11 @@ class RefreshToken(BaseModel):
     """Schema for refresh token storage"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     admin_id: str
-    token: str
+    token_hash: str  # SHA-256 of the token; raw tokens are never stored
     created_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: datetime
     is_revoked: bool = False
+    revoked_at: Optional[datetime] = None
 
 
 # Pagination Response Model
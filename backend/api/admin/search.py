@@ -1,8 +1,7 @@
 """Global search functionality for admin panel"""
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from db_clients import motor_database
 import logging
 
 from .auth import get_current_admin
@@ -12,9 +11,7 @@ from .permissions import ROLE_PERMISSIONS
 logger = logging.getLogger(__name__)
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = motor_database()  # Shared client, created on first query
 
 search_router = APIRouter(prefix="/api/admin/search", tags=["Admin Search"])
 
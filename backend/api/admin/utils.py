@@ -1,15 +1,19 @@
 """Admin utility functions for logging, permissions, and exports"""
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 import csv
 import io
+import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import logging
 from .schemas import AdminActivityLog, Admin
+from .audit_sink import audit_sink
+from .audit_rollups import audit_sink_listener
 
 logger = logging.getLogger(__name__)
 
+# Keep hourly/daily audit rollups current as entries are written
+audit_sink.add_listener(audit_sink_listener)
+
 
 async def log_admin_action(
     admin_id: str,
@@ -17,37 +21,37 @@ async def log_admin_action(
     action: str,
     entity: str,
     entity_id: str,
-    details: str = ""
+    details: Union[str, Dict[str, Any]] = ""
 ):
     """
     Log admin actions to admin_logs collection
     
+    The entry is buffered by the audit sink and written in a batch shortly
+    after, so the request does not wait on a database round trip.
+    
     Args:
         admin_id: ID of the admin performing the action
         admin_email: Email of the admin
         action: Type of action (create, update, delete, status_change)
         entity: Type of entity (sessions, events, blogs, etc.)
         entity_id: ID of the entity being modified
-        details: Additional details about the action
+        details: Additional details about the action (dicts are stored as JSON)
     """
     try:
-        mongo_url = os.environ['MONGO_URL']
-        client = AsyncIOMotorClient(mongo_url)
-        db = client[os.environ['DB_NAME']]
+        if not isinstance(details, str):
+            details = json.dumps(details, default=str)
         
         log_entry = AdminActivityLog(
             admin_id=admin_id,
             admin_email=admin_email,
             action=action,
             entity=entity,
-            entity_id=entity_id,
+            entity_id=entity_id or "",
             details=details
         )
         
-        await db.admin_logs.insert_one(log_entry.dict())
+        await audit_sink.enqueue(log_entry.model_dump())
         logger.info(f"Logged action: {action} on {entity} by {admin_email}")
-        
-        client.close()
     except Exception as e:
         logger.error(f"Failed to log admin action: {str(e)}")
         # Don't raise exception - logging failure shouldn't break main operation
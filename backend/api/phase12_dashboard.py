@@ -3,23 +3,19 @@ PHASE 12.4 - User Dashboard & Engagement Features
 Includes user sessions, events, payments, saved blogs, and engagement tracking
 """
 
-import os
 import logging
 from datetime import datetime
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from pymongo import MongoClient
+from db_clients import sync_database
 from api.phase12_users import get_current_user
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
-# MongoDB connection
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.environ.get("DB_NAME", "test_database")
-mongo_client = MongoClient(MONGO_URL)
-db = mongo_client[DB_NAME]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
 # Router
 phase12_dashboard_router = APIRouter(prefix="/api/phase12/dashboard", tags=["Phase 12 - User Dashboard"])
@@ -8,7 +8,6 @@ import asyncio
 import logging
 from typing import Optional, Dict, Any
 from datetime import datetime
-import resend
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
 
@@ -19,9 +18,8 @@ logger = logging.getLogger(__name__)
 RESEND_API_KEY = os.environ.get("RESEND_API_KEY", "")
 SENDER_EMAIL = os.environ.get("SENDER_EMAIL", "noreply@acube.com")
 
-# Configure Resend
+# Resend SDK (and requests under it) is imported on the first send, not at boot
 if RESEND_API_KEY:
-    resend.api_key = RESEND_API_KEY
     logger.info("Resend email service configured")
 else:
     logger.warning("Resend API key not configured - emails will be mocked")
@@ -39,6 +37,13 @@ class EmailRequest(BaseModel):
 
 # ==================== EMAIL UTILITY FUNCTIONS ====================
 
+def _resend():
+    """The Resend SDK, configured with the API key"""
+    import resend
+    resend.api_key = RESEND_API_KEY
+    return resend
+
+
 async def send_email_async(
     to_email: str,
     subject: str,
@@ -64,6 +69,7 @@ async def send_email_async(
             "html": html_content
         }
         
+        resend = _resend()
         # Run sync SDK in thread to keep FastAPI non-blocking
         email = await asyncio.to_thread(resend.Emails.send, params)
         
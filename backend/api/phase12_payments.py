@@ -6,29 +6,34 @@ Handles payment orders, verification, and transaction management
 import os
 import uuid
 import logging
-import razorpay
 from datetime import datetime
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Request, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
-from pymongo import MongoClient
+from db_clients import sync_database
 from api.phase12_email import send_email_async, create_payment_success_email
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
-# MongoDB connection
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.environ.get("DB_NAME", "test_database")
-mongo_client = MongoClient(MONGO_URL)
-db = mongo_client[DB_NAME]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
-# Razorpay client
+# Razorpay client (the SDK is imported on first payment call, not at boot)
 RAZORPAY_KEY_ID = os.environ.get("RAZORPAY_KEY_ID", "")
 RAZORPAY_KEY_SECRET = os.environ.get("RAZORPAY_KEY_SECRET", "")
 RAZORPAY_WEBHOOK_SECRET = os.environ.get("RAZORPAY_WEBHOOK_SECRET", "")
 
-razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+_razorpay_client = None
+
+
+def get_razorpay_client():
+    """Razorpay client, created on first use"""
+    global _razorpay_client
+    if _razorpay_client is None:
+        import razorpay
+        _razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+    return _razorpay_client
 
 # Router
 phase12_payments_router = APIRouter(prefix="/api/phase12/payments", tags=["Phase 12 - Payments"])
@@ -75,7 +80,7 @@ async def create_payment_order(order_request: CreateOrderRequest):
         amount_paise = int(order_request.amount * 100)
         
         # Create Razorpay order
-        razorpay_order = razorpay_client.order.create({
+        razorpay_order = get_razorpay_client().order.create({
             "amount": amount_paise,
             "currency": "INR",
             "payment_capture": 1,  # Auto-capture payment
@@ -129,6 +134,9 @@ async def verify_payment(verify_request: VerifyPaymentRequest, background_tasks:
     """
     Verify Razorpay payment signature and update transaction status
     """
+    from razorpay.errors import SignatureVerificationError
+
+    razorpay_client = get_razorpay_client()
     try:
         # Verify signature
         params_dict = {
@@ -184,7 +192,7 @@ async def verify_payment(verify_request: VerifyPaymentRequest, background_tasks:
             "message": "Payment verified successfully"
         }
         
-    except razorpay.errors.SignatureVerificationError:
+    except SignatureVerificationError:
         logger.error("Payment signature verification failed")
         
         # Mark transaction as failed
@@ -217,7 +225,7 @@ async def razorpay_webhook(request: Request):
         signature = request.headers.get("X-Razorpay-Signature", "")
         
         # Verify webhook signature
-        razorpay_client.utility.verify_webhook_signature(
+        get_razorpay_client().utility.verify_webhook_signature(
             payload.decode(),
             signature,
             RAZORPAY_WEBHOOK_SECRET
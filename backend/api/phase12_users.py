@@ -11,18 +11,19 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, Field
-from pymongo import MongoClient
+from db_clients import sync_database
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 import jwt
 
+from cache import principal_cache
+from password_hashing import password_hashing_pool
+
 # Logger setup
 logger = logging.getLogger(__name__)
 
-# MongoDB connection
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.environ.get("DB_NAME", "test_database")
-mongo_client = MongoClient(MONGO_URL)
-db = mongo_client[DB_NAME]
+# MongoDB connection (shared client, created on first query)
+db = sync_database()
 
 # JWT Configuration
 JWT_SECRET_USER = os.environ.get("JWT_SECRET_USER", "supersecret_user_jwt_key_change_in_production")
@@ -36,6 +37,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Security
 security = HTTPBearer()
 
+USER_PRINCIPAL_NAMESPACE = "user"
+
 # Router
 phase12_users_router = APIRouter(prefix="/api/phase12/users", tags=["Phase 12 - User Auth"])
 
@@ -86,7 +89,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=USER_ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    # iat identifies this token in the principal cache
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_USER, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
@@ -120,6 +124,12 @@ def decode_token(token: str) -> dict:
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to get current authenticated user"""
     token = credentials.credentials
+    
+    # Hot path: token already verified and principal cached
+    user = principal_cache.get(USER_PRINCIPAL_NAMESPACE, token)
+    if user is not None:
+        return user
+    
     payload = decode_token(token)
     
     if payload.get("type") != "access":
@@ -135,8 +145,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid token"
         )
     
-    # Fetch user from database
-    user = db.users.find_one({"user_id": user_id}, {"_id": 0, "password": 0})
+    # Fetch user from database (blocking driver, so off the event loop)
+    generation = principal_cache.generation(USER_PRINCIPAL_NAMESPACE, user_id)
+    user = await run_in_threadpool(db.users.find_one, {"user_id": user_id}, {"_id": 0, "password": 0})
     
     if not user:
         raise HTTPException(
@@ -150,9 +161,21 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Account is inactive"
         )
     
+    principal_cache.set(
+        USER_PRINCIPAL_NAMESPACE, token, user_id,
+        issued_at=payload.get("iat"),
+        token_expires=payload.get("exp"),
+        principal=user,
+        generation=generation
+    )
     return user
 
 
+def invalidate_user_principal(user_id: str) -> None:
+    """Drop cached principals for a user (call after profile, password or status changes)"""
+    principal_cache.invalidate(USER_PRINCIPAL_NAMESPACE, user_id)
+
+
 # ==================== AUTHENTICATION ENDPOINTS ====================
 
 @phase12_users_router.post("/signup")
@@ -171,7 +194,7 @@ async def user_signup(signup_request: UserSignupRequest):
         
         # Create user
         user_id = str(uuid.uuid4())
-        hashed_password = hash_password(signup_request.password)
+        hashed_password = await password_hashing_pool.run(hash_password, signup_request.password)
         
         user = {
             "user_id": user_id,
@@ -240,7 +263,7 @@ async def user_login(login_request: UserLoginRequest):
             )
         
         # Verify password
-        if not verify_password(login_request.password, user["password"]):
+        if not await password_hashing_pool.run(verify_password, login_request.password, user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -418,6 +441,7 @@ async def update_user_profile(
                 {"user_id": current_user["user_id"]},
                 {"$set": update_data}
             )
+            invalidate_user_principal(current_user["user_id"])
             
             # Fetch updated user
             updated_user = db.users.find_one(
@@ -458,14 +482,14 @@ async def change_password(
         user = db.users.find_one({"user_id": current_user["user_id"]})
         
         # Verify old password
-        if not verify_password(password_change.old_password, user["password"]):
+        if not await password_hashing_pool.run(verify_password, password_change.old_password, user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
         # Hash new password
-        new_hashed_password = hash_password(password_change.new_password)
+        new_hashed_password = await password_hashing_pool.run(hash_password, password_change.new_password)
         
         # Update password
         db.users.update_one(
@@ -477,6 +501,7 @@ async def change_password(
                 }
             }
         )
+        invalidate_user_principal(current_user["user_id"])
         
         # Revoke all refresh tokens for security
         db.user_refresh_tokens.delete_many({"user_id": current_user["user_id"]})
@@ -511,7 +536,7 @@ async def delete_user_account(
         user = db.users.find_one({"user_id": current_user["user_id"]})
         
         # Verify password
-        if not verify_password(password, user["password"]):
+        if not await password_hashing_pool.run(verify_password, password, user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Password is incorrect"
@@ -528,6 +553,7 @@ async def delete_user_account(
                 }
             }
         )
+        invalidate_user_principal(current_user["user_id"])
         
         # Revoke all refresh tokens
         db.user_refresh_tokens.delete_many({"user_id": current_user["user_id"]})
@@ -4,14 +4,34 @@ Automated database backup, restore, and management functionality
 """
 
 import os
+import io
 import json
+import fcntl
 import gzip
+import zlib
 import shutil
+import asyncio
+import hashlib
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Iterator, AsyncIterator, Set
 from pathlib import Path
 import logging
-from bson import json_util
+from bson import json_util, ObjectId
+from pymongo import ReplaceOne, UpdateOne, IndexModel
+from pymongo.errors import BulkWriteError
+
+from metrics_registry import metrics_registry
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional - gzip is always available
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +39,590 @@ logger = logging.getLogger(__name__)
 BACKUP_DIR = Path("/app/backend/backups")
 MAX_BACKUPS = 30  # Keep last 30 backups
 BACKUP_RETENTION_DAYS = 30
+BACKUP_BATCH_SIZE = int(os.environ.get("BACKUP_BATCH_SIZE", "1000"))  # Documents per cursor batch / write
+BACKUP_COMPRESSION = os.environ.get("BACKUP_COMPRESSION", "gzip")  # gzip or zstd
+BACKUP_CONCURRENCY = int(os.environ.get("BACKUP_CONCURRENCY", "4"))  # Collections dumped at once
+RESTORE_BATCH_SIZE = int(os.environ.get("RESTORE_BATCH_SIZE", "1000"))  # Documents per insert_many
+RESTORE_CONCURRENCY = int(os.environ.get("RESTORE_CONCURRENCY", "2"))  # Collections restored at once
+DUPLICATE_KEY_ERROR = 11000  # Only write error a merge restore tolerates
+MAX_INCREMENTAL_CHAIN = int(os.environ.get("MAX_INCREMENTAL_CHAIN", "7"))  # Incrementals before a new full backup
+# Collections an incremental captures by change; the others are dumped in full
+# (unchanged chunks deduplicate). Every update path of these sets updated_at,
+# and create_indexes.py indexes it.
+INCREMENTAL_COLLECTIONS = frozenset(filter(None, os.environ.get(
+    "BACKUP_INCREMENTAL_COLLECTIONS",
+    "email_templates,email_queue,transactions,push_subscriptions,"
+    "push_notification_queue,feature_toggles,notification_preferences"
+).split(",")))
+BACKUP_WORKERS = int(os.environ.get("BACKUP_WORKERS", str(min(8, (os.cpu_count() or 1) + 1))))
+
+# Content-addressed chunk store, shared (and deduplicated) across backups
+CHUNK_DIR_NAME = "chunks"
+CATALOG_FILE_NAME = "catalog.json"
+CATALOG_LOCK_FILE_NAME = "catalog.lock"  # flock'd by every worker around catalog and chunk changes
+HOLD_DIR_NAME = "chunk_holds"  # Chunk ids of in-flight backups, one file per backup
+CHUNK_AVG_DOCS = int(os.environ.get("BACKUP_CHUNK_AVG_DOCS", "256"))  # Average documents per chunk
+CHUNK_MAX_BYTES = int(os.environ.get("BACKUP_CHUNK_MAX_BYTES", str(4 * 1024 * 1024)))  # Hard cap, uncompressed
+ORPHAN_CHUNK_GRACE_SECONDS = 3600  # Unreferenced chunks younger than this may belong to a running backup
+
+CHUNK_EXTENSIONS = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# Per-backup collection files written before the chunk store: Extended-JSON lines and JSON arrays
+BACKUP_FILE_EXTENSIONS = {
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+}
+LEGACY_BACKUP_EXTENSION = ".json.gz"
+BACKUP_FILE_PATTERNS = ["*.jsonl.gz", "*.jsonl.zst", "*.json.gz"]
+
+# Compact encoder - the C encoder handles native types, json_util only BSON ones
+_line_encoder = json.JSONEncoder(default=json_util.default, separators=(",", ":"))
+
+# Serialization and compression run here so they never block the event loop.
+# zlib and zstd release the GIL while compressing, so collections scale with cores.
+_backup_executor = ThreadPoolExecutor(max_workers=BACKUP_WORKERS, thread_name_prefix="backup")
+
+backup_durations = metrics_registry.summary(
+    "backup_duration_seconds", "Backup run duration", labelnames=("mode", "status")
+)
+restore_durations = metrics_registry.summary(
+    "restore_duration_seconds", "Restore run duration", labelnames=("mode", "status")
+)
+
+
+def _resolve_compression(compression: Optional[str] = None) -> str:
+    """Pick the compression codec, falling back to gzip when zstd is unavailable"""
+    compression = compression or BACKUP_COMPRESSION
+    if compression == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed - falling back to gzip backups")
+        return "gzip"
+    if compression not in CHUNK_EXTENSIONS:
+        logger.warning(f"Unknown backup compression '{compression}' - using gzip")
+        return "gzip"
+    return compression
+
+
+def _open_backup_reader(path: Path):
+    """Open a binary, decompressing reader for a collection data file"""
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst backups")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return gzip.open(path, "rb")
+
+
+def _backup_data_files(backup_path: Path) -> List[Path]:
+    """All collection data files in a backup directory"""
+    files = []
+    for pattern in BACKUP_FILE_PATTERNS:
+        files.extend(backup_path.glob(pattern))
+    return files
+
+
+def _collection_backup_file(backup_path: Path, collection_name: str) -> Optional[Path]:
+    """Locate the data file of a collection, whichever format it was written in"""
+    for extension in list(BACKUP_FILE_EXTENSIONS.values()) + [LEGACY_BACKUP_EXTENSION]:
+        candidate = backup_path / f"{collection_name}{extension}"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _iter_file_documents(data_file: Path) -> Iterator[Dict[str, Any]]:
+    if data_file.name.endswith(LEGACY_BACKUP_EXTENSION):
+        with gzip.open(data_file, 'rt', encoding='utf-8') as f:
+            yield from json.loads(f.read(), object_hook=json_util.object_hook)
+        return
+
+    with _open_backup_reader(data_file) as raw:
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            if line.strip():
+                yield json_util.loads(line)
+
+
+def iter_backup_documents(data_files: List[Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield documents from the chunks (or legacy file) holding a collection
+
+    Extended-JSON line files are decoded one line at a time; legacy
+    JSON-array files have to be loaded in one piece.
+    """
+    for data_file in data_files:
+        yield from _iter_file_documents(data_file)
+
+
+def _next_batch(documents: Iterator[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    return list(itertools.islice(documents, size))
+
+
+async def iter_backup_batches(data_files: List[Path],
+                              batch_size: int = RESTORE_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Decode the data files of a collection in batches
+
+    Decompression and Extended-JSON decoding run on the backup pool, so only
+    ``batch_size`` documents are held at a time and the event loop stays free.
+    """
+    loop = asyncio.get_running_loop()
+    documents = iter_backup_documents(data_files)
+    try:
+        while True:
+            batch = await loop.run_in_executor(_backup_executor, _next_batch, documents, batch_size)
+            if not batch:
+                break
+            yield batch
+    finally:
+        documents.close()
+
+
+def count_backup_documents(data_files: List[Path]) -> int:
+    """Count documents without decoding them - one per line in .jsonl files"""
+    count = 0
+    for data_file in data_files:
+        if data_file.name.endswith(LEGACY_BACKUP_EXTENSION):
+            count += sum(1 for _ in _iter_file_documents(data_file))
+            continue
+        with _open_backup_reader(data_file) as raw:
+            for block in iter(lambda: raw.read(1024 * 1024), b""):
+                count += block.count(b"\n")
+    return count
+
+
+async def get_index_specs(collection) -> Dict[str, Dict[str, Any]]:
+    """Secondary index definitions of a collection, as stored in backup metadata"""
+    return {
+        name: {key: value for key, value in spec.items() if key not in ("v", "ns")}
+        for name, spec in (await collection.index_information()).items()
+        if name != "_id_"
+    }
+
+
+def _index_models(index_specs: Dict[str, Dict[str, Any]]) -> List[IndexModel]:
+    models = []
+    for name, spec in index_specs.items():
+        options = {key: value for key, value in spec.items() if key != "key"}
+        models.append(IndexModel([tuple(key) for key in spec["key"]], name=name, **options))
+    return models
+
+
+@contextmanager
+def _flock(path: Path, shared: bool = False):
+    """Advisory lock on a sidecar file, held across worker processes (blocking)"""
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ChunkStore:
+    """
+    Content-addressed store of compressed Extended-JSON line chunks
+
+    A chunk is named after the SHA-256 of its uncompressed content, so a
+    chunk that is identical in several backups is stored once.
+    
+    Chunks written or reused by a backup that is not in the catalog yet
+    are held (see hold/release) and never deleted while held. Holds are
+    files under ``hold_dir``, so they are seen by every worker process:
+    put() records a chunk under a shared lock on ``lock_path`` before it
+    checks whether the chunk exists, and deleters hold that lock
+    exclusively, so a chunk is either reused after a delete finished or
+    seen as held by it.
+    """
+    
+    def __init__(self, root: Path, hold_dir: Path, lock_path: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hold_dir = hold_dir
+        self.hold_dir.mkdir(parents=True, exist_ok=True)
+        self.lock_path = lock_path
+        self._lock = threading.Lock()  # put runs in the backup pool
+        self._holds: Dict[str, Set[str]] = {}  # hold token -> chunk ids recorded in its hold file
+    
+    def path(self, chunk_id: str) -> Path:
+        return self.root / chunk_id[:2] / chunk_id
+    
+    def _hold_path(self, token: str) -> Path:
+        return self.hold_dir / f"{os.getpid()}.{token}"
+    
+    def hold(self) -> str:
+        """Start holding the chunks of an in-flight backup; pass the token to put()"""
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._holds[token] = set()
+            self._hold_path(token).touch()
+        return token
+    
+    def release(self, token: str):
+        """Stop holding a backup's chunks (it is in the catalog, or it failed)"""
+        with self._lock:
+            self._holds.pop(token, None)
+            self._hold_path(token).unlink(missing_ok=True)
+    
+    def held(self) -> Set[str]:
+        """
+        Chunk ids held by in-flight backups of any worker.
+
+        Call with the lock on ``lock_path`` held exclusively. Hold files of
+        processes that died are removed.
+        """
+        chunk_ids = set()
+        for hold_path in self.hold_dir.iterdir():
+            pid = hold_path.name.split(".", 1)[0]
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                hold_path.unlink(missing_ok=True)
+                continue
+            try:
+                chunk_ids.update(line for line in hold_path.read_text().splitlines() if line)
+            except FileNotFoundError:
+                continue
+        return chunk_ids
+    
+    def put(self, data: bytes, compression: str, hold: Optional[str] = None) -> Dict[str, Any]:
+        """Store a chunk unless it already exists (runs in the backup pool)"""
+        chunk_id = hashlib.sha256(data).hexdigest() + CHUNK_EXTENSIONS[compression]
+        path = self.path(chunk_id)
+        with self._lock, _flock(self.lock_path, shared=True):
+            if hold is not None and chunk_id not in self._holds[hold]:
+                with open(self._hold_path(hold), "a") as hold_file:
+                    hold_file.write(chunk_id + "\n")
+                self._holds[hold].add(chunk_id)
+            if path.exists():
+                # Refresh mtime so other workers' orphan sweeps see it as in use
+                os.utime(path)
+                return {"id": chunk_id, "size": path.stat().st_size, "new": False}
+        
+        if compression == "zstd":
+            payload = zstandard.ZstdCompressor(level=3).compress(data)
+        else:
+            payload = gzip.compress(data, compresslevel=6, mtime=0)
+        
+        path.parent.mkdir(exist_ok=True)
+        # Unique per writer - concurrent dumps can produce the same new chunk
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            if not path.exists():
+                raise
+            # Another writer stored the same content first
+            tmp_path.unlink(missing_ok=True)
+        return {"id": chunk_id, "size": len(payload), "new": True}
+    
+    def delete(self, chunk_id: str, held: Set[str]) -> int:
+        """
+        Remove a chunk unless an in-flight backup holds it; returns bytes freed
+
+        Call with the lock on ``lock_path`` held exclusively, passing held().
+        """
+        if chunk_id in held:
+            return 0
+        path = self.path(chunk_id)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            return size
+        except FileNotFoundError:
+            return 0
+    
+    def missing(self, chunk_ids: Iterable[str]) -> List[str]:
+        return [chunk_id for chunk_id in chunk_ids if not self.path(chunk_id).exists()]
+    
+    def iter_chunk_files(self) -> Iterator[Path]:
+        for path in self.root.glob("*/*"):
+            if not path.name.endswith(".tmp"):
+                yield path
+
+
+class _ChunkBuilder:
+    """
+    Splits a stream of documents into content-defined chunks
+
+    Chunk boundaries are chosen from a hash of each document's ``_id`` (and
+    the cursor is sorted by ``_id``), so inserting, updating or deleting a
+    document only changes the chunk that contains it - the others hash the
+    same as in the previous backup and are deduplicated.
+    """
+    
+    def __init__(self, store: ChunkStore, compression: str, hold: Optional[str] = None):
+        self.store = store
+        self.compression = compression
+        self.hold = hold
+        self.lines: List[str] = []
+        self.pending_bytes = 0
+        self.chunks: List[str] = []
+        self.chunk_sizes: Dict[str, int] = {}
+        self.document_count = 0
+        self.uncompressed_bytes = 0
+        self.file_size_bytes = 0
+        self.stored_bytes = 0
+    
+    def add(self, documents: List[Dict[str, Any]]):
+        """Encode a batch and flush every completed chunk (runs in the backup pool)"""
+        for document in documents:
+            line = _line_encoder.encode(document)
+            self.lines.append(line)
+            self.pending_bytes += len(line) + 1
+            boundary = zlib.crc32(str(document.get("_id")).encode("utf-8")) % CHUNK_AVG_DOCS == 0
+            if boundary or self.pending_bytes >= CHUNK_MAX_BYTES:
+                self._flush()
+    
+    def finish(self):
+        if self.lines:
+            self._flush()
+    
+    def _flush(self):
+        data = ("\n".join(self.lines) + "\n").encode("utf-8")
+        chunk = self.store.put(data, self.compression, self.hold)
+        self.chunks.append(chunk["id"])
+        self.chunk_sizes[chunk["id"]] = chunk["size"]
+        self.document_count += len(self.lines)
+        self.uncompressed_bytes += len(data)
+        self.file_size_bytes += chunk["size"]
+        if chunk["new"]:
+            self.stored_bytes += chunk["size"]
+        self.lines = []
+        self.pending_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "document_count": self.document_count,
+            "uncompressed_bytes": self.uncompressed_bytes,
+            "file_size_bytes": self.file_size_bytes,
+            "stored_bytes": self.stored_bytes,
+            "chunks": self.chunks,
+            "chunk_sizes": self.chunk_sizes,
+        }
+
+
+async def write_collection_chunks(collection, store: ChunkStore, compression: str,
+                                  batch_size: int = BACKUP_BATCH_SIZE,
+                                  query: Optional[Dict[str, Any]] = None,
+                                  projection: Optional[Dict[str, Any]] = None,
+                                  hold: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Stream a collection into the chunk store
+
+    The cursor is consumed in batches of ``batch_size`` documents. Each
+    batch is handed to the backup thread pool for serialization, chunking
+    and compression while the next one is fetched, so memory stays bounded
+    by two batches and the event loop only drives the cursor. Chunks are
+    held under ``hold`` (from ChunkStore.hold) until the caller releases it.
+
+    Returns:
+        Dict with document count, byte counts and the ordered chunk ids
+    """
+    loop = asyncio.get_running_loop()
+    builder = _ChunkBuilder(store, compression, hold)
+    batch: List[Dict[str, Any]] = []
+    pending = None
+
+    try:
+        cursor = collection.find(query or {}, projection).sort("_id", 1).batch_size(batch_size)
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                # Chunks must stay in cursor order - wait for the previous batch
+                if pending is not None:
+                    await pending
+                pending = loop.run_in_executor(_backup_executor, builder.add, batch)
+                batch = []
+
+        if pending is not None:
+            await pending
+            pending = None
+
+        if batch:
+            await loop.run_in_executor(_backup_executor, builder.add, batch)
+        await loop.run_in_executor(_backup_executor, builder.finish)
+    finally:
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+
+    return builder.stats()
+
+
+def changed_since_query(since: datetime) -> Dict[str, Any]:
+    """
+    Filter matching documents inserted or updated after ``since``
+
+    Inserts are detected through the ObjectId timestamp of ``_id`` (always
+    indexed); updates through ``updated_at``, stored either as a datetime
+    or as an ISO string depending on the module that wrote it. Only sound
+    for INCREMENTAL_COLLECTIONS, which set and index ``updated_at``.
+    """
+    return {"$or": [
+        {"_id": {"$gt": ObjectId.from_datetime(since)}},
+        {"updated_at": {"$gt": since}},
+        {"updated_at": {"$gt": since.isoformat()}},
+    ]}
+
+
+def _read_metadata(metadata_file: Path) -> Dict[str, Any]:
+    """Load a metadata.json file, decoding Extended-JSON dates"""
+    with open(metadata_file, 'r') as f:
+        return json_util.loads(f.read())
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any], indent: Optional[int] = None):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, default=json_util.default, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def _chunk_ids(metadata: Dict[str, Any]) -> List[str]:
+    """Every chunk a backup references, data and _id listings alike"""
+    ids = []
+    for entry in metadata.get("collections", []):
+        ids.extend(entry.get("chunks", []))
+        ids.extend(entry.get("id_chunks", []))
+    return ids
+
+
+def _without_chunk_lists(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Backup metadata as returned by the API - chunk ids replaced by counts"""
+    public = dict(metadata)
+    public["collections"] = []
+    for entry in metadata.get("collections", []):
+        entry = dict(entry)
+        chunk_count = len(entry.pop("chunks", [])) + len(entry.pop("id_chunks", []))
+        if chunk_count:
+            entry["chunk_count"] = chunk_count
+        public["collections"].append(entry)
+    return public
+
+
+def _summarize(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Catalog entry of a backup - its metadata without per-chunk detail"""
+    summary = {
+        key: value for key, value in metadata.items()
+        if key not in ("collections", "backup_path", "files")
+    }
+    summary["collections"] = [
+        {key: entry[key] for key in ("name", "document_count", "error") if key in entry}
+        for entry in metadata.get("collections", [])
+    ]
+    return summary
+
+
+class BackupCatalog:
+    """
+    Single-file index of all backups and of chunk reference counts
+
+    Listing and statistics are served from memory; the file is only re-read
+    when another worker has rewritten it. Backups written before the chunk
+    store existed are indexed from their directories on first load.
+    
+    Every change (refresh, add/remove, save) and every chunk deletion is
+    made inside locked(), which excludes other tasks and other workers.
+    """
+    
+    def __init__(self, path: Path, backup_dir: Path, lock_path: Path):
+        self.path = path
+        self.backup_dir = backup_dir
+        self.lock_path = lock_path
+        self.backups: Dict[str, Dict[str, Any]] = {}
+        self.chunks: Dict[str, Dict[str, int]] = {}  # chunk id -> {"size", "refs"}
+        self._mtime_ns: Optional[int] = None
+        self.lock = asyncio.Lock()
+    
+    @asynccontextmanager
+    async def locked(self):
+        """Exclusive lock on the catalog across tasks and worker processes"""
+        async with self.lock:
+            # Default executor - backup pool threads may be waiting on this file lock
+            loop = asyncio.get_running_loop()
+            lock = _flock(self.lock_path)
+            acquiring = loop.run_in_executor(None, lock.__enter__)
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                acquiring.add_done_callback(lambda _: lock.__exit__(None, None, None))
+                raise
+            try:
+                yield
+            finally:
+                lock.__exit__(None, None, None)
+    
+    def refresh(self):
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.rebuild()
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        data = _read_metadata(self.path)
+        self.backups = data.get("backups", {})
+        self.chunks = data.get("chunks", {})
+        self._mtime_ns = mtime_ns
+    
+    def save(self):
+        _write_json_atomic(self.path, {"backups": self.backups, "chunks": self.chunks})
+        self._mtime_ns = self.path.stat().st_mtime_ns
+    
+    def rebuild(self):
+        """Re-index every backup directory (first start, or a lost catalog)"""
+        self.backups = {}
+        self.chunks = {}
+        chunk_root = self.backup_dir / CHUNK_DIR_NAME
+        for backup_path in self.backup_dir.glob("backup_*"):
+            metadata_file = backup_path / "metadata.json"
+            if not metadata_file.exists():
+                continue
+            try:
+                metadata = _read_metadata(metadata_file)
+                chunk_sizes = {}
+                for chunk_id in _chunk_ids(metadata):
+                    chunk_path = chunk_root / chunk_id[:2] / chunk_id
+                    chunk_sizes[chunk_id] = chunk_path.stat().st_size if chunk_path.exists() else 0
+                if "total_size_bytes" not in metadata:
+                    metadata["total_size_bytes"] = sum(f.stat().st_size for f in _backup_data_files(backup_path))
+                self.add(metadata, chunk_sizes)
+            except Exception as e:
+                logger.error(f"Error indexing backup {backup_path}: {e}")
+        self.save()
+        logger.info(f"Backup catalog rebuilt: {len(self.backups)} backups, {len(self.chunks)} chunks")
+    
+    def add(self, metadata: Dict[str, Any], chunk_sizes: Dict[str, int]):
+        summary = _summarize(metadata)
+        summary["storage"] = "chunks" if chunk_sizes else "files"
+        self.backups[metadata["backup_id"]] = summary
+        for chunk_id in set(_chunk_ids(metadata)):
+            chunk = self.chunks.setdefault(chunk_id, {"size": chunk_sizes.get(chunk_id, 0), "refs": 0})
+            chunk["refs"] += 1
+    
+    def remove(self, backup_id: str, metadata: Optional[Dict[str, Any]]) -> List[str]:
+        """Drop a backup; returns the chunks nothing references any more"""
+        self.backups.pop(backup_id, None)
+        unreferenced = []
+        for chunk_id in set(_chunk_ids(metadata or {})):
+            chunk = self.chunks.get(chunk_id)
+            if chunk is None:
+                continue
+            chunk["refs"] -= 1
+            if chunk["refs"] <= 0:
+                del self.chunks[chunk_id]
+                unreferenced.append(chunk_id)
+        return unreferenced
+    
+    def list(self) -> List[Dict[str, Any]]:
+        return [self.backups[backup_id] for backup_id in sorted(self.backups, reverse=True)]
 
 
 class BackupManager:
@@ -28,21 +632,106 @@ class BackupManager:
         self.db = db
         self.backup_dir = BACKUP_DIR
         self.backup_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.backup_dir / CATALOG_LOCK_FILE_NAME
+        self.chunk_store = ChunkStore(self.backup_dir / CHUNK_DIR_NAME, self.backup_dir / HOLD_DIR_NAME, lock_path)
+        self.catalog = BackupCatalog(self.backup_dir / CATALOG_FILE_NAME, self.backup_dir, lock_path)
+        with _flock(lock_path):
+            self.catalog.refresh()
         logger.info(f"BackupManager initialized. Backup directory: {self.backup_dir}")
     
-    async def create_backup(self, backup_type: str = "manual", include_collections: Optional[List[str]] = None) -> Dict[str, Any]:
+    async def _backup_collection(self, collection_name: str, compression: str,
+                                 semaphore: asyncio.Semaphore,
+                                 since: Optional[datetime] = None,
+                                 hold: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Dump one collection, waiting for a free concurrency slot first
+
+        With ``since`` only documents changed after that instant are written,
+        plus an ``_id`` listing of the whole collection so restores can
+        replay deletions.
+        """
+        async with semaphore:
+            try:
+                collection = self.db[collection_name]
+                
+                # Stream collection data into the chunk store in batches
+                query = changed_since_query(since) if since else None
+                stats = await write_collection_chunks(
+                    collection, self.chunk_store, compression, query=query, hold=hold
+                )
+                entry = {
+                    "name": collection_name,
+                    "incremental": since is not None,
+                    "indexes": await get_index_specs(collection),
+                    **stats
+                }
+                
+                if since is not None:
+                    # Index-only scan of _id - far cheaper than a full dump
+                    ids_stats = await write_collection_chunks(
+                        collection, self.chunk_store, compression, projection={"_id": 1}, hold=hold
+                    )
+                    entry["id_chunks"] = ids_stats["chunks"]
+                    entry["chunk_sizes"].update(ids_stats["chunk_sizes"])
+                    entry["total_document_count"] = ids_stats["document_count"]
+                    entry["file_size_bytes"] += ids_stats["file_size_bytes"]
+                    entry["stored_bytes"] += ids_stats["stored_bytes"]
+                
+                logger.info(
+                    f"Backed up collection '{collection_name}': {stats['document_count']} documents "
+                    f"({stats['uncompressed_bytes']} bytes -> {stats['file_size_bytes']} bytes, "
+                    f"{stats['stored_bytes']} bytes new)"
+                )
+                
+                return entry
+            
+            except Exception as e:
+                logger.error(f"Error backing up collection '{collection_name}': {e}")
+                return {
+                    "name": collection_name,
+                    "error": str(e)
+                }
+    
+    async def _latest_completed_backup(self) -> Optional[Dict[str, Any]]:
+        """Most recent backup that completed, used as parent of an incremental"""
+        for backup in await self.list_backups():
+            if backup.get("status") == "completed":
+                return backup
+        return None
+    
+    async def create_backup(self, backup_type: str = "manual", include_collections: Optional[List[str]] = None,
+                            compression: Optional[str] = None, concurrency: Optional[int] = None,
+                            incremental: bool = False) -> Dict[str, Any]:
         """
-        Create a complete database backup
+        Create a database backup
         
         Args:
             backup_type: Type of backup (manual, scheduled, pre-migration)
             include_collections: List of collections to backup (None = all)
+            compression: gzip or zstd (defaults to BACKUP_COMPRESSION)
+            concurrency: Collections dumped in parallel (defaults to BACKUP_CONCURRENCY)
+            incremental: Only capture documents changed since the latest backup.
+                Falls back to a full backup when there is no completed parent
+                or the chain already holds MAX_INCREMENTAL_CHAIN incrementals.
+                Collections outside INCREMENTAL_COLLECTIONS are still dumped
+                in full and listed under full_dump_collections.
         
         Returns:
             Dict with backup metadata
         """
+        run_started = time.monotonic()
+        # Chunks this backup writes or reuses must survive concurrent deletes until it is cataloged
+        hold = self.chunk_store.hold()
         try:
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            compression = _resolve_compression(compression)
+            started_at = datetime.utcnow()
+            
+            parent = await self._latest_completed_backup() if incremental else None
+            if parent is not None and parent.get("chain_length", 0) >= MAX_INCREMENTAL_CHAIN:
+                logger.info("Incremental chain limit reached - taking a full backup")
+                parent = None
+            
+            timestamp = started_at.strftime("%Y%m%d_%H%M%S")
             backup_id = f"backup_{timestamp}"
             backup_path = self.backup_dir / backup_id
             backup_path.mkdir(parents=True, exist_ok=True)
@@ -57,92 +746,102 @@ class BackupManager:
                 "backup_id": backup_id,
                 "timestamp": datetime.utcnow(),
                 "backup_type": backup_type,
+                "mode": "incremental" if parent else "full",
+                "started_at": started_at,
+                "parent_backup_id": parent["backup_id"] if parent else None,
+                "base_backup_id": (parent.get("base_backup_id") or parent["backup_id"]) if parent else None,
+                "chain_length": parent.get("chain_length", 0) + 1 if parent else 0,
+                "format": "chunked-jsonl",
+                "compression": compression,
                 "collections": [],
                 "total_documents": 0,
+                "total_uncompressed_bytes": 0,
+                "total_stored_bytes": 0,
                 "status": "in_progress",
                 "error": None
             }
             
-            # Backup each collection
-            for collection_name in collections:
-                try:
-                    collection = self.db[collection_name]
-                    documents = await collection.find().to_list(length=None)
-                    
-                    # Save collection data
-                    collection_file = backup_path / f"{collection_name}.json.gz"
-                    collection_data = json.dumps(documents, default=json_util.default, indent=2)
-                    
-                    with gzip.open(collection_file, 'wt', encoding='utf-8') as f:
-                        f.write(collection_data)
-                    
-                    doc_count = len(documents)
-                    backup_metadata["collections"].append({
-                        "name": collection_name,
-                        "document_count": doc_count,
-                        "file_size_bytes": collection_file.stat().st_size
-                    })
-                    backup_metadata["total_documents"] += doc_count
-                    
-                    logger.info(f"Backed up collection '{collection_name}': {doc_count} documents")
-                
-                except Exception as e:
-                    logger.error(f"Error backing up collection '{collection_name}': {e}")
-                    backup_metadata["collections"].append({
-                        "name": collection_name,
-                        "error": str(e)
-                    })
-            
-            # Save metadata
-            backup_metadata["status"] = "completed"
-            backup_metadata["completed_at"] = datetime.utcnow()
+            # Backup collections concurrently, bounded by the semaphore
+            semaphore = asyncio.Semaphore(max(1, concurrency or BACKUP_CONCURRENCY))
             
-            metadata_file = backup_path / "metadata.json"
-            with open(metadata_file, 'w') as f:
-                json.dump(backup_metadata, f, default=json_util.default, indent=2)
+            # Collections missing from the parent, or without a maintained
+            # updated_at, are dumped in full
+            parent_collections = {
+                c["name"] for c in parent["collections"] if "error" not in c
+            } if parent else set()
+            since = parent.get("started_at") or parent.get("timestamp") if parent else None
+            if parent:
+                backup_metadata["full_dump_collections"] = sorted(
+                    name for name in collections if name not in INCREMENTAL_COLLECTIONS
+                )
             
-            # Calculate total backup size
-            total_size = sum(f.stat().st_size for f in backup_path.glob("*.json.gz"))
+            backup_metadata["collections"] = list(await asyncio.gather(*[
+                self._backup_collection(
+                    collection_name, compression, semaphore,
+                    since=since if (
+                        collection_name in parent_collections and collection_name in INCREMENTAL_COLLECTIONS
+                    ) else None,
+                    hold=hold
+                )
+                for collection_name in collections
+            ]))
+            chunk_sizes = {}
+            for collection_stats in backup_metadata["collections"]:
+                chunk_sizes.update(collection_stats.pop("chunk_sizes", {}))
+                backup_metadata["total_documents"] += collection_stats.get("document_count", 0)
+                backup_metadata["total_uncompressed_bytes"] += collection_stats.get("uncompressed_bytes", 0)
+                backup_metadata["total_stored_bytes"] += collection_stats.get("stored_bytes", 0)
+            
+            # Logical size - what the backup would take without deduplication
+            total_size = sum(c.get("file_size_bytes", 0) for c in backup_metadata["collections"])
             backup_metadata["total_size_bytes"] = total_size
             backup_metadata["total_size_mb"] = round(total_size / (1024 * 1024), 2)
             
-            logger.info(f"✅ Backup completed: {backup_id} ({backup_metadata['total_size_mb']} MB)")
+            # Save the manifest, then index it in the catalog
+            backup_metadata["status"] = "completed"
+            backup_metadata["completed_at"] = datetime.utcnow()
+            
+            async with self.catalog.locked():
+                # Safety net - held chunks are never deleted, so none should be missing
+                missing = self.chunk_store.missing(set(_chunk_ids(backup_metadata)))
+                if missing:
+                    raise RuntimeError(f"{len(missing)} chunks were deleted while the backup ran")
+                _write_json_atomic(backup_path / "metadata.json", backup_metadata, indent=2)
+                self.catalog.refresh()
+                self.catalog.add(backup_metadata, chunk_sizes)
+                self.catalog.save()
+            
+            logger.info(
+                f"✅ Backup completed: {backup_id} ({backup_metadata['mode']}, {backup_metadata['total_size_mb']} MB)"
+            )
+            backup_durations.observe(time.monotonic() - run_started, mode=backup_metadata["mode"], status="completed")
             
             # Cleanup old backups
             await self.cleanup_old_backups()
             
-            return backup_metadata
+            return _without_chunk_lists(backup_metadata)
         
         except Exception as e:
             logger.error(f"Backup failed: {e}")
+            backup_durations.observe(time.monotonic() - run_started, mode="incremental" if incremental else "full", status="failed")
             return {
                 "backup_id": None,
                 "status": "failed",
                 "error": str(e),
                 "timestamp": datetime.utcnow()
             }
+        finally:
+            self.chunk_store.release(hold)
     
     async def list_backups(self) -> List[Dict[str, Any]]:
-        """List all available backups"""
+        """List all available backups, newest first, from the catalog"""
+        self.catalog.refresh()
         backups = []
-        
-        for backup_path in sorted(self.backup_dir.glob("backup_*"), reverse=True):
-            metadata_file = backup_path / "metadata.json"
-            
-            if metadata_file.exists():
-                try:
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    # Calculate backup size
-                    total_size = sum(f.stat().st_size for f in backup_path.glob("*.json.gz"))
-                    metadata["total_size_mb"] = round(total_size / (1024 * 1024), 2)
-                    metadata["backup_path"] = str(backup_path)
-                    
-                    backups.append(metadata)
-                except Exception as e:
-                    logger.error(f"Error reading backup metadata from {backup_path}: {e}")
-        
+        for summary in self.catalog.list():
+            backup = dict(summary)
+            backup["total_size_mb"] = round(backup.get("total_size_bytes", 0) / (1024 * 1024), 2)
+            backup["backup_path"] = str(self.backup_dir / backup["backup_id"])
+            backups.append(backup)
         return backups
     
     async def get_backup_details(self, backup_id: str) -> Optional[Dict[str, Any]]:
@@ -154,38 +853,286 @@ class BackupManager:
             return None
         
         try:
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
+            metadata = _read_metadata(metadata_file)
             
-            # Add file listing
+            # Per-collection storage, taken from the manifest rather than stat() calls
             metadata["files"] = []
-            for file in backup_path.glob("*.json.gz"):
+            for entry in metadata.get("collections", []):
+                if "error" in entry:
+                    continue
+                size = entry.get("file_size_bytes", 0)
                 metadata["files"].append({
-                    "name": file.name,
-                    "size_bytes": file.stat().st_size,
-                    "size_mb": round(file.stat().st_size / (1024 * 1024), 2)
+                    "name": entry.get("file", entry["name"]),
+                    "chunks": len(entry.get("chunks", [])) + len(entry.get("id_chunks", [])),
+                    "size_bytes": size,
+                    "size_mb": round(size / (1024 * 1024), 2)
                 })
             
-            return metadata
+            return _without_chunk_lists(metadata)
         except Exception as e:
             logger.error(f"Error reading backup details: {e}")
             return None
     
+    def _resolve_chain(self, backup_id: str) -> List[Dict[str, Any]]:
+        """Metadata of a backup and its ancestors, oldest (the full backup) first"""
+        chain = []
+        current_id = backup_id
+        while current_id:
+            metadata_file = self.backup_dir / current_id / "metadata.json"
+            if not metadata_file.exists():
+                raise FileNotFoundError(f"Backup '{current_id}' in the incremental chain of '{backup_id}' is missing")
+            metadata = _read_metadata(metadata_file)
+            chain.append(metadata)
+            current_id = metadata.get("parent_backup_id")
+        chain.reverse()
+        return chain
+    
+    @staticmethod
+    def _collection_steps(collection_name: str, chain: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Backups that must be applied to rebuild a collection: the most recent
+        full dump of it followed by every later incremental
+        """
+        steps = []
+        for backup in chain:
+            entry = next(
+                (c for c in backup.get("collections", []) if c["name"] == collection_name and "error" not in c),
+                None
+            )
+            if entry is None:
+                continue
+            if not entry.get("incremental"):
+                steps = []
+            steps.append({"backup_id": backup["backup_id"], "entry": entry})
+        return steps
+    
+    def _entry_files(self, backup_id: str, entry: Dict[str, Any], ids: bool = False) -> Optional[List[Path]]:
+        """Data files of a collection entry - chunk paths, or a pre-chunk-store file"""
+        chunk_key, file_key = ("id_chunks", "ids_file") if ids else ("chunks", "file")
+        if chunk_key in entry:
+            return [self.chunk_store.path(chunk_id) for chunk_id in entry[chunk_key]]
+        backup_path = self.backup_dir / backup_id
+        if ids:
+            return [backup_path / entry[file_key]] if entry.get(file_key) else None
+        collection_file = _collection_backup_file(backup_path, entry["name"])
+        return [collection_file] if collection_file else None
+    
+    async def _load_documents(self, collection, data_files: List[Path], merge: bool = False,
+                              only_ids: Optional[Set[Any]] = None) -> Dict[str, int]:
+        """
+        Insert a full dump in unordered batches
+
+        In merge mode documents whose _id already exists are skipped. Any
+        other write error (validation, document too large, a duplicate on
+        a replace) fails the collection instead of being counted as skipped.
+        """
+        inserted = 0
+        duplicates = 0
+        async for batch in iter_backup_batches(data_files):
+            if only_ids is not None:
+                batch = [document for document in batch if document["_id"] in only_ids]
+                if not batch:
+                    continue
+            try:
+                result = await collection.insert_many(batch, ordered=False)
+                inserted += len(result.inserted_ids)
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                failures = [
+                    error for error in write_errors
+                    if not merge or error.get("code") != DUPLICATE_KEY_ERROR
+                ]
+                if failures:
+                    raise RuntimeError(
+                        f"{len(failures)} documents could not be restored: {failures[0].get('errmsg')}"
+                    ) from e
+                # merge mode - existing _ids are kept, the rest of the batch still lands
+                inserted += e.details.get("nInserted", 0)
+                duplicates += len(write_errors)
+        return {"inserted": inserted, "duplicates": duplicates}
+    
+    async def _apply_incremental(self, collection, data_files: List[Path], merge: bool = False,
+                                 only_ids: Optional[Set[Any]] = None) -> int:
+        """
+        Upsert the changed documents of an incremental backup by _id
+
+        In merge mode live documents win - backed-up versions are only
+        inserted where no document with that _id exists.
+        """
+        applied = 0
+        async for batch in iter_backup_batches(data_files):
+            if only_ids is not None:
+                batch = [document for document in batch if document["_id"] in only_ids]
+                if not batch:
+                    continue
+            if merge:
+                operations = [
+                    UpdateOne({"_id": document["_id"]}, {"$setOnInsert": document}, upsert=True)
+                    for document in batch
+                ]
+            else:
+                operations = [
+                    ReplaceOne({"_id": document["_id"]}, document, upsert=True)
+                    for document in batch
+                ]
+            result = await collection.bulk_write(operations, ordered=False)
+            # Merge only counts documents it actually added
+            applied += result.upserted_count if merge else len(operations)
+        return applied
+    
+    @staticmethod
+    async def _backup_id_set(ids_files: List[Path]) -> Set[Any]:
+        """_ids a collection held when an incremental was taken"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _backup_executor,
+            lambda: {document["_id"] for document in iter_backup_documents(ids_files)}
+        )
+    
+    async def _apply_deletions(self, collection, ids_files: List[Path]) -> int:
+        """Remove documents that no longer existed when the incremental was taken"""
+        live_ids = await self._backup_id_set(ids_files)
+        deleted = 0
+        stale = []
+        async for document in collection.find({}, {"_id": 1}).batch_size(RESTORE_BATCH_SIZE):
+            if document["_id"] not in live_ids:
+                stale.append(document["_id"])
+            if len(stale) >= RESTORE_BATCH_SIZE:
+                result = await collection.delete_many({"_id": {"$in": stale}})
+                deleted += result.deleted_count
+                stale = []
+        if stale:
+            result = await collection.delete_many({"_id": {"$in": stale}})
+            deleted += result.deleted_count
+        return deleted
+    
+    async def _restore_collection(self, collection_name: str, chain: List[Dict[str, Any]],
+                                  mode: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Rebuild one collection from its full dump plus any incrementals"""
+        async with semaphore:
+            try:
+                return await self._restore_collection_steps(collection_name, chain, mode)
+            except Exception as e:
+                logger.error(f"Error restoring collection '{collection_name}': {e}")
+                return {
+                    "name": collection_name,
+                    "status": "failed",
+                    "error": str(e)
+                }
+    
+    async def _restore_collection_steps(self, collection_name: str, chain: List[Dict[str, Any]],
+                                        mode: str) -> Dict[str, Any]:
+        steps = self._collection_steps(collection_name, chain)
+        if not steps:
+            return {
+                "name": collection_name,
+                "status": "skipped",
+                "error": "Backup file not found"
+            }
+        
+        files = []
+        for step in steps:
+            data_files = self._entry_files(step["backup_id"], step["entry"])
+            if data_files is None or not all(f.exists() for f in data_files):
+                return {
+                    "name": collection_name,
+                    "status": "skipped",
+                    "error": f"Backup file not found in '{step['backup_id']}'"
+                }
+            files.append(data_files)
+        
+        last_entry = steps[-1]["entry"]
+        loop = asyncio.get_running_loop()
+        
+        if mode == "preview":
+            # Preview mode - don't actually restore, and don't decode either
+            document_count = last_entry.get("total_document_count", last_entry.get("document_count"))
+            if document_count is None:
+                document_count = await loop.run_in_executor(_backup_executor, count_backup_documents, files[0])
+            return {
+                "name": collection_name,
+                "status": "preview",
+                "document_count": document_count,
+                "incrementals": len(steps) - 1
+            }
+        
+        collection = self.db[collection_name]
+        index_specs = last_entry.get("indexes")
+        
+        if mode == "replace":
+            if index_specs is None:
+                # Older backups carry no index definitions - keep the current ones
+                index_specs = await get_index_specs(collection)
+            # Drop existing collection
+            await collection.drop()
+            logger.info(f"Dropped collection '{collection_name}'")
+        
+        ids_files = self._entry_files(steps[-1]["backup_id"], last_entry, ids=True) \
+            if last_entry.get("incremental") else None
+        docs_upserted = 0
+        docs_deleted = 0
+        
+        if mode == "merge":
+            # Keep existing data: live documents are neither overwritten nor
+            # deleted, backup documents are only added where missing. Newest
+            # copies go first so older ones hit existing _ids, and documents
+            # already deleted at backup time are not brought back.
+            backup_ids = await self._backup_id_set(ids_files) if ids_files else None
+            for data_files in reversed(files[1:]):
+                docs_upserted += await self._apply_incremental(
+                    collection, data_files, merge=True, only_ids=backup_ids
+                )
+            load = await self._load_documents(collection, files[0], merge=True, only_ids=backup_ids)
+        else:
+            # Base: the full dump, loaded before any secondary index exists
+            load = await self._load_documents(collection, files[0])
+            # Replay incrementals in order, then deletions as of the latest one
+            for data_files in files[1:]:
+                docs_upserted += await self._apply_incremental(collection, data_files)
+            if ids_files:
+                docs_deleted = await self._apply_deletions(collection, ids_files)
+        
+        # Build indexes once, after the bulk load (merge keeps the ones that exist)
+        existing_indexes = await collection.index_information()
+        missing_indexes = {
+            name: spec for name, spec in (index_specs or {}).items() if name not in existing_indexes
+        }
+        if missing_indexes:
+            await collection.create_indexes(_index_models(missing_indexes))
+        
+        logger.info(
+            f"Restored collection '{collection_name}': {load['inserted']} documents, "
+            f"{docs_upserted} incremental changes, {docs_deleted} deletions"
+        )
+        
+        return {
+            "name": collection_name,
+            "status": "success",
+            "documents_restored": load["inserted"] + docs_upserted,
+            "duplicates_skipped": load["duplicates"],
+            "incremental_changes": docs_upserted,
+            "documents_deleted": docs_deleted,
+            "indexes_built": len(missing_indexes)
+        }
+    
     async def restore_backup(self, backup_id: str, collections: Optional[List[str]] = None, 
-                           mode: str = "replace") -> Dict[str, Any]:
+                           mode: str = "replace", concurrency: Optional[int] = None) -> Dict[str, Any]:
         """
         Restore database from backup
         
+        Incremental backups are restored by composing the full backup they
+        are based on with every incremental up to and including this one.
+        
         Args:
             backup_id: ID of backup to restore
             collections: Specific collections to restore (None = all)
             mode: 'replace' (drop existing), 'merge' (keep existing), 'preview' (dry run)
+            concurrency: Collections restored in parallel (defaults to RESTORE_CONCURRENCY)
         
         Returns:
             Dict with restore results
         """
-        backup_path = self.backup_dir / backup_id
-        metadata_file = backup_path / "metadata.json"
+        metadata_file = self.backup_dir / backup_id / "metadata.json"
         
         if not metadata_file.exists():
             return {
@@ -193,13 +1140,15 @@ class BackupManager:
                 "error": f"Backup '{backup_id}' not found"
             }
         
+        run_started = time.monotonic()
         try:
-            with open(metadata_file, 'r') as f:
-                backup_metadata = json.load(f)
+            chain = self._resolve_chain(backup_id)
+            backup_metadata = chain[-1]
             
             restore_results = {
                 "backup_id": backup_id,
                 "restore_mode": mode,
+                "backup_chain": [b["backup_id"] for b in chain],
                 "started_at": datetime.utcnow(),
                 "collections": [],
                 "total_documents_restored": 0,
@@ -211,71 +1160,27 @@ class BackupManager:
                 c["name"] for c in backup_metadata["collections"] if "error" not in c
             ]
             
-            for collection_name in collections_to_restore:
-                collection_file = backup_path / f"{collection_name}.json.gz"
-                
-                if not collection_file.exists():
-                    restore_results["collections"].append({
-                        "name": collection_name,
-                        "status": "skipped",
-                        "error": "Backup file not found"
-                    })
-                    continue
-                
-                try:
-                    # Read backup data
-                    with gzip.open(collection_file, 'rt', encoding='utf-8') as f:
-                        documents = json.loads(f.read(), object_hook=json_util.object_hook)
-                    
-                    if mode == "preview":
-                        # Preview mode - don't actually restore
-                        restore_results["collections"].append({
-                            "name": collection_name,
-                            "status": "preview",
-                            "document_count": len(documents)
-                        })
-                        restore_results["total_documents_restored"] += len(documents)
-                    else:
-                        collection = self.db[collection_name]
-                        
-                        if mode == "replace":
-                            # Drop existing collection
-                            await collection.drop()
-                            logger.info(f"Dropped collection '{collection_name}'")
-                        
-                        if documents:
-                            # Insert documents
-                            result = await collection.insert_many(documents)
-                            docs_inserted = len(result.inserted_ids)
-                        else:
-                            docs_inserted = 0
-                        
-                        restore_results["collections"].append({
-                            "name": collection_name,
-                            "status": "success",
-                            "documents_restored": docs_inserted
-                        })
-                        restore_results["total_documents_restored"] += docs_inserted
-                        
-                        logger.info(f"Restored collection '{collection_name}': {docs_inserted} documents")
-                
-                except Exception as e:
-                    logger.error(f"Error restoring collection '{collection_name}': {e}")
-                    restore_results["collections"].append({
-                        "name": collection_name,
-                        "status": "failed",
-                        "error": str(e)
-                    })
+            semaphore = asyncio.Semaphore(max(1, concurrency or RESTORE_CONCURRENCY))
+            restore_results["collections"] = list(await asyncio.gather(*[
+                self._restore_collection(collection_name, chain, mode, semaphore)
+                for collection_name in collections_to_restore
+            ]))
+            for result in restore_results["collections"]:
+                restore_results["total_documents_restored"] += result.get(
+                    "document_count" if mode == "preview" else "documents_restored", 0
+                )
             
             restore_results["status"] = "completed"
             restore_results["completed_at"] = datetime.utcnow()
             
             logger.info(f"✅ Restore completed: {backup_id} ({restore_results['total_documents_restored']} documents)")
+            restore_durations.observe(time.monotonic() - run_started, mode=mode, status="completed")
             
             return restore_results
         
         except Exception as e:
             logger.error(f"Restore failed: {e}")
+            restore_durations.observe(time.monotonic() - run_started, mode=mode, status="failed")
             return {
                 "status": "failed",
                 "error": str(e),
@@ -283,7 +1188,7 @@ class BackupManager:
             }
     
     async def delete_backup(self, backup_id: str) -> Dict[str, Any]:
-        """Delete a specific backup"""
+        """Delete a specific backup and the chunks only it referenced"""
         backup_path = self.backup_dir / backup_id
         
         if not backup_path.exists():
@@ -293,12 +1198,25 @@ class BackupManager:
             }
         
         try:
+            metadata_file = backup_path / "metadata.json"
+            metadata = _read_metadata(metadata_file) if metadata_file.exists() else None
+            
+            # Chunks are deleted under the catalog lock of every worker, so a
+            # backup cannot be cataloged with, or reuse, a chunk being removed
+            loop = asyncio.get_running_loop()
+            async with self.catalog.locked():
+                self.catalog.refresh()
+                unreferenced = self.catalog.remove(backup_id, metadata)
+                self.catalog.save()
+                freed = await loop.run_in_executor(None, self._delete_chunks, unreferenced)
             shutil.rmtree(backup_path)
-            logger.info(f"Deleted backup: {backup_id}")
+            logger.info(f"Deleted backup: {backup_id} ({len(unreferenced)} chunks, {freed} bytes freed)")
             
             return {
                 "status": "success",
                 "backup_id": backup_id,
+                "chunks_deleted": len(unreferenced),
+                "bytes_freed": freed,
                 "deleted_at": datetime.utcnow()
             }
         except Exception as e:
@@ -308,37 +1226,65 @@ class BackupManager:
                 "error": str(e)
             }
     
+    def _delete_chunks(self, chunk_ids: List[str]) -> int:
+        """Delete chunks not held by an in-flight backup; returns bytes freed (catalog lock held)"""
+        held = self.chunk_store.held()
+        return sum(self.chunk_store.delete(chunk_id, held) for chunk_id in chunk_ids)
+    
+    def _sweep_orphan_chunks(self) -> int:
+        """Delete chunks no backup references, e.g. left behind by a failed backup"""
+        cutoff = time.time() - ORPHAN_CHUNK_GRACE_SECONDS
+        held = self.chunk_store.held()
+        removed = 0
+        for path in self.chunk_store.iter_chunk_files():
+            if path.name not in self.catalog.chunks and path.stat().st_mtime < cutoff:
+                if self.chunk_store.delete(path.name, held):
+                    removed += 1
+        return removed
+    
     async def cleanup_old_backups(self) -> Dict[str, Any]:
         """Remove old backups based on retention policy"""
         try:
             backups = await self.list_backups()
             deleted = []
             
-            # Delete backups older than retention period
+            # Delete backups older than retention period, and beyond the max count
             cutoff_date = datetime.utcnow() - timedelta(days=BACKUP_RETENTION_DAYS)
+            expired = {
+                backup["backup_id"] for index, backup in enumerate(backups)
+                if index >= MAX_BACKUPS or backup.get("timestamp", cutoff_date) < cutoff_date
+            }
             
+            # Full/incremental backups still needed by a retained incremental are kept
+            parents = {b["backup_id"]: b.get("parent_backup_id") for b in backups}
+            protected = set()
             for backup in backups:
-                backup_date = datetime.fromisoformat(backup["timestamp"].replace('Z', '+00:00'))
-                
-                if backup_date < cutoff_date:
+                if backup["backup_id"] in expired:
+                    continue
+                parent_id = backup.get("parent_backup_id")
+                while parent_id and parent_id not in protected:
+                    protected.add(parent_id)
+                    parent_id = parents.get(parent_id)
+            
+            for backup in backups:
+                if backup["backup_id"] in expired and backup["backup_id"] not in protected:
                     result = await self.delete_backup(backup["backup_id"])
                     if result["status"] == "success":
                         deleted.append(backup["backup_id"])
             
-            # Also enforce max backup count
-            if len(backups) > MAX_BACKUPS:
-                backups_to_delete = backups[MAX_BACKUPS:]
-                for backup in backups_to_delete:
-                    result = await self.delete_backup(backup["backup_id"])
-                    if result["status"] == "success" and backup["backup_id"] not in deleted:
-                        deleted.append(backup["backup_id"])
+            # Garbage-collect chunks that are not referenced by any backup
+            loop = asyncio.get_running_loop()
+            async with self.catalog.locked():
+                self.catalog.refresh()
+                orphans_removed = await loop.run_in_executor(None, self._sweep_orphan_chunks)
             
-            logger.info(f"Cleanup: Deleted {len(deleted)} old backups")
+            logger.info(f"Cleanup: Deleted {len(deleted)} old backups, {orphans_removed} orphaned chunks")
             
             return {
                 "status": "success",
                 "deleted_count": len(deleted),
-                "deleted_backups": deleted
+                "deleted_backups": deleted,
+                "orphaned_chunks_removed": orphans_removed
             }
         
         except Exception as e:
@@ -349,19 +1295,28 @@ class BackupManager:
             }
     
     def get_backup_statistics(self) -> Dict[str, Any]:
-        """Get backup system statistics"""
+        """Get backup system statistics from the catalog"""
         try:
-            backup_dirs = list(self.backup_dir.glob("backup_*"))
-            total_size = sum(
-                sum(f.stat().st_size for f in backup_path.glob("*.json.gz"))
-                for backup_path in backup_dirs
+            self.catalog.refresh()
+            backups = self.catalog.backups.values()
+            total_size = sum(b.get("total_size_bytes", 0) for b in backups)
+            
+            # Physical usage - each chunk once, plus pre-chunk-store backup files
+            stored_size = sum(chunk["size"] for chunk in self.catalog.chunks.values()) + sum(
+                b.get("total_size_bytes", 0) for b in backups if b.get("storage") == "files"
             )
             
             return {
-                "total_backups": len(backup_dirs),
+                "total_backups": len(self.catalog.backups),
+                "full_backups": sum(1 for b in backups if b.get("mode", "full") == "full"),
+                "incremental_backups": sum(1 for b in backups if b.get("mode") == "incremental"),
                 "total_size_bytes": total_size,
                 "total_size_mb": round(total_size / (1024 * 1024), 2),
                 "total_size_gb": round(total_size / (1024 * 1024 * 1024), 2),
+                "stored_size_bytes": stored_size,
+                "stored_size_mb": round(stored_size / (1024 * 1024), 2),
+                "deduplication_ratio": round(total_size / stored_size, 2) if stored_size else None,
+                "total_chunks": len(self.catalog.chunks),
                 "backup_directory": str(self.backup_dir),
                 "retention_days": BACKUP_RETENTION_DAYS,
                 "max_backups": MAX_BACKUPS
@@ -7,19 +7,15 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 import logging
-import os
 
 from api.admin.permissions import get_current_admin, require_admin_or_above
 
 logger = logging.getLogger(__name__)
 
 # Get MongoDB connection
-from motor.motor_asyncio import AsyncIOMotorClient
+from db_clients import motor_database
 
-mongo_url = os.environ['MONGO_URL']
-db_name = os.environ['DB_NAME']
-client = AsyncIOMotorClient(mongo_url)
-db = client[db_name]
+db = motor_database()  # Shared client, created on first query
 
 
 # ============= PYDANTIC MODELS =============
@@ -3,24 +3,27 @@ Phase 14.7 - Final Go-Live Hardening
 Security audit, error analysis, performance review, and production readiness checks
 """
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 import logging
-import os
 import asyncio
 
 from api.admin.permissions import get_current_admin, require_super_admin
+from api.admin.audit_rollups import read_rollups
+from api.admin.audit_partitions import AuditLogPartitions
+from mongo_monitoring import SLOW_QUERY_THRESHOLD_MS, command_monitor, explain_shape
+from sampling_profiler import PROFILE_FORMATS, sampling_profiler
 
 logger = logging.getLogger(__name__)
 
 # Get MongoDB connection
-from motor.motor_asyncio import AsyncIOMotorClient
+from db_clients import motor_database
 
-mongo_url = os.environ['MONGO_URL']
-db_name = os.environ['DB_NAME']
-client = AsyncIOMotorClient(mongo_url)
-db = client[db_name]
+db = motor_database()  # Shared client, created on first query
+
+SLOW_QUERY_EXPLAIN_LIMIT = 5  # Worst query shapes explained per request
 
 
 # ============= PYDANTIC MODELS =============
@@ -30,6 +33,13 @@ class OptimizationRequest(BaseModel):
     dry_run: bool = True
 
 
+class ProfilerStartRequest(BaseModel):
+    duration_seconds: int = 30  # Capped at PROFILE_MAX_DURATION
+    interval_ms: float = 10.0
+    path_prefix: Optional[str] = None  # Only sample requests under this path
+    header: Optional[str] = None  # Only sample requests carrying this header ("name" or "name: value")
+
+
 # ============= SECURITY AUDIT FUNCTIONS =============
 
 async def run_security_audit() -> Dict[str, Any]:
@@ -104,9 +114,7 @@ async def run_security_audit() -> Dict[str, Any]:
             audit_results["warnings"].append("Less than 50% of admins have 2FA enabled")
         
         # Check 5: Audit log coverage
-        recent_logs = await db.admin_logs.count_documents({
-            "created_at": {"$gte": datetime.utcnow() - timedelta(days=7)}
-        })
+        recent_logs = await AuditLogPartitions(db).count(since=datetime.utcnow() - timedelta(days=7))
         
         audit_results["checks"].append({
             "check": "Audit Logging",
@@ -168,39 +176,36 @@ async def analyze_error_patterns(days: int = 7) -> Dict[str, Any]:
     try:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get failed actions from audit logs
-        failed_actions = await db.admin_logs.find({
-            "created_at": {"$gte": cutoff_date},
-            "action": {"$regex": "failed", "$options": "i"}
-        }).to_list(length=1000)
+        # Failed actions per day come from the pre-aggregated audit rollups
+        daily_rollups = await read_rollups(db, "day", since=cutoff_date)
         
         # Analyze patterns
         error_types = {}
         error_timeline = {}
         
-        for log in failed_actions:
-            action = log.get("action", "unknown")
-            error_types[action] = error_types.get(action, 0) + 1
-            
-            # Group by date
-            date_key = log.get("created_at").strftime("%Y-%m-%d") if log.get("created_at") else "unknown"
-            if date_key not in error_timeline:
-                error_timeline[date_key] = 0
-            error_timeline[date_key] += 1
+        for rollup in daily_rollups:
+            failed = rollup.get("failed", {})
+            if not failed:
+                continue
+            for action, count in failed.items():
+                error_types[action] = error_types.get(action, 0) + count
+            error_timeline[rollup["bucket"].strftime("%Y-%m-%d")] = sum(failed.values())
+        
+        total_errors = sum(error_types.values())
         
         # Sort error types by frequency
         sorted_errors = sorted(error_types.items(), key=lambda x: x[1], reverse=True)
         
         return {
             "analysis_period_days": days,
-            "total_errors": len(failed_actions),
+            "total_errors": total_errors,
             "unique_error_types": len(error_types),
             "most_common_errors": [
                 {"error_type": err[0], "count": err[1]}
                 for err in sorted_errors[:10]
             ],
             "error_timeline": error_timeline,
-            "average_errors_per_day": len(failed_actions) / days,
+            "average_errors_per_day": total_errors / days,
             "recommendations": [
                 "Investigate recurring errors with high frequency",
                 "Implement better error handling for common failure points",
@@ -307,39 +312,35 @@ async def review_performance_metrics() -> Dict[str, Any]:
 async def detect_slow_queries(threshold_ms: int = 100) -> Dict[str, Any]:
     """
     Detect slow database queries
+    
+    Reads the in-process command monitor: recent operations slower than the
+    threshold, the heaviest query shapes, and query plans for the worst
+    offenders.
     """
     try:
-        # In production, this would query MongoDB's profiling data
-        # For now, we'll return a mock structure
-        
-        slow_queries = [
-            {
-                "query_type": "aggregate",
-                "collection": "admin_logs",
-                "duration_ms": 150,
-                "timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                "recommendation": "Add index on 'created_at' field"
-            },
-            {
-                "query_type": "find",
-                "collection": "session_bookings",
-                "duration_ms": 120,
-                "timestamp": (datetime.utcnow() - timedelta(hours=5)).isoformat(),
-                "recommendation": "Add compound index on 'status' and 'created_at'"
-            }
-        ]
+        slow_operations = command_monitor.slow_operations(threshold_ms)
+        
+        offenders = command_monitor.worst_offenders(threshold_ms, limit=SLOW_QUERY_EXPLAIN_LIMIT)
+        worst_offenders = await asyncio.gather(*[explain_shape(db.client, stats) for stats in offenders])
+        
+        recommendations = sorted({
+            f"{offender['collection']}: {offender['recommendation']}"
+            for offender in worst_offenders
+            if "Collection scan" in offender.get("recommendation", "") or "In-memory sort" in offender.get("recommendation", "")
+        })
+        if threshold_ms < SLOW_QUERY_THRESHOLD_MS:
+            recommendations.append(
+                f"Operations are only logged above SLOW_QUERY_THRESHOLD_MS ({SLOW_QUERY_THRESHOLD_MS} ms)"
+            )
         
         return {
             "threshold_ms": threshold_ms,
-            "slow_queries_detected": len(slow_queries),
-            "queries": slow_queries,
-            "recommendations": [
-                "Enable MongoDB query profiler in production",
-                "Set up monitoring for slow queries",
-                "Regularly review and optimize frequently run queries",
-                "Consider using explain() to analyze query execution plans"
-            ],
-            "note": "This is a mock implementation. Enable MongoDB profiling for actual slow query detection."
+            "slow_queries_detected": len(slow_operations),
+            "queries": slow_operations,
+            "worst_offenders": worst_offenders,
+            "heaviest_query_shapes": command_monitor.shape_summaries(),
+            "monitor": command_monitor.get_stats(),
+            "recommendations": recommendations
         }
     except Exception as e:
         logger.error(f"Error detecting slow queries: {str(e)}")
@@ -693,3 +694,85 @@ async def run_optimization(
     except Exception as e:
         logger.error(f"Optimization failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============= SAMPLING PROFILER =============
+
+@router.post("/profiler/start")
+async def start_profiler(
+    request: ProfilerStartRequest,
+    admin = Depends(require_super_admin)
+):
+    """
+    Start an on-demand sampling profiling session
+    Samples the event loop for a time window, optionally only while requests
+    matching a path prefix or header are running
+    """
+    try:
+        session = sampling_profiler.start(
+            duration=request.duration_seconds,
+            interval_ms=request.interval_ms,
+            path_prefix=request.path_prefix,
+            header=request.header,
+            started_by=admin.email
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"Profiling session {session['profile_id']} started by {admin.email}")
+    return {"status": "started", "session": session}
+
+
+@router.post("/profiler/stop")
+async def stop_profiler(
+    admin = Depends(require_super_admin)
+):
+    """
+    Stop the running profiling session early (it is saved as usual)
+    """
+    session = sampling_profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session is running")
+    return {"status": "stopping", "session": session}
+
+
+@router.get("/profiler/status")
+async def profiler_status(
+    admin = Depends(require_super_admin)
+):
+    """
+    Get the running profiling session, if any
+    """
+    return sampling_profiler.status()
+
+
+@router.get("/profiler/profiles")
+async def list_profiles(
+    admin = Depends(require_super_admin)
+):
+    """
+    List stored profiles, newest first
+    """
+    try:
+        profiles = await asyncio.to_thread(sampling_profiler.list_profiles)
+        return {"profiles": profiles, "total": len(profiles)}
+    except Exception as e:
+        logger.error(f"Listing profiles failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/profiler/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = "speedscope",
+    admin = Depends(require_super_admin)
+):
+    """
+    Download a stored profile
+    format: 'speedscope' (open at speedscope.app) or 'collapsed' (flamegraph.pl)
+    """
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(PROFILE_FORMATS)}")
+    path = sampling_profiler.profile_path(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type=PROFILE_FORMATS[format][1], filename=path.name)
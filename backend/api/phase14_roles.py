@@ -7,20 +7,18 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from pydantic import BaseModel
 import logging
-import os
 
 from api.admin.permissions import get_current_admin, require_super_admin
+from api.admin.permission_bits import permission_registry, has_permissions, ALL_PERMISSIONS
 from api.admin.utils import log_admin_action
+from api.admin.auth import invalidate_admin_principal
 
 logger = logging.getLogger(__name__)
 
 # Get MongoDB connection
-from motor.motor_asyncio import AsyncIOMotorClient
+from db_clients import motor_database
 
-mongo_url = os.environ['MONGO_URL']
-db_name = os.environ['DB_NAME']
-client = AsyncIOMotorClient(mongo_url)
-db = client[db_name]
+db = motor_database()  # Shared client, created on first query
 
 
 # ============= EXTENDED ROLE DEFINITIONS =============
@@ -106,6 +104,12 @@ PERMISSION_DESCRIPTIONS = {
     "view_audit_logs": "View audit logs and activity history"
 }
 
+# Compile role permission lists into bitmasks once, at startup
+permission_registry.register_roles({
+    role: role_data["permissions"] for role, role_data in ROLE_PERMISSIONS.items()
+})
+VIEW_AUDIT_LOGS_PERMISSION = permission_registry.mask(["view_audit_logs"])
+
 
 # ============= PYDANTIC MODELS =============
 
@@ -120,16 +124,7 @@ def check_permission(admin_role: str, required_permission: str) -> bool:
     """
     Check if admin role has required permission
     """
-    if admin_role not in ROLE_PERMISSIONS:
-        return False
-    
-    role_perms = ROLE_PERMISSIONS[admin_role]["permissions"]
-    
-    # Super admin has all permissions
-    if "*" in role_perms:
-        return True
-    
-    return required_permission in role_perms
+    return has_permissions(permission_registry.role_mask(admin_role), permission_registry.mask([required_permission]))
 
 
 def get_role_level(role: str) -> int:
@@ -148,27 +143,30 @@ def can_assign_role(assigner_role: str, target_role: str) -> bool:
     return assigner_level >= target_level
 
 
+def get_role_effective_permissions(role: str) -> List[str]:
+    """
+    Get effective permissions granted by a role
+    """
+    if role not in ROLE_PERMISSIONS:
+        return []
+    
+    # Wildcard roles hold every bit
+    if permission_registry.role_mask(role) == ALL_PERMISSIONS:
+        return list(PERMISSION_DESCRIPTIONS.keys())
+    
+    return ROLE_PERMISSIONS[role]["permissions"]
+
+
 async def get_admin_effective_permissions(admin_id: str) -> List[str]:
     """
     Get effective permissions for an admin based on their role
     """
     try:
-        admin = await db.admins.find_one({"id": admin_id})
+        admin = await db.admins.find_one({"id": admin_id}, {"role": 1})
         if not admin:
             return []
         
-        role = admin.get("role", "viewer")
-        
-        if role not in ROLE_PERMISSIONS:
-            return []
-        
-        permissions = ROLE_PERMISSIONS[role]["permissions"]
-        
-        # If has wildcard, return all possible permissions
-        if "*" in permissions:
-            return list(PERMISSION_DESCRIPTIONS.keys())
-        
-        return permissions
+        return get_role_effective_permissions(admin.get("role", "viewer"))
     except Exception as e:
         logger.error(f"Error getting admin permissions: {str(e)}")
         return []
@@ -295,6 +293,7 @@ async def assign_role_to_admin(
                 }
             }
         )
+        invalidate_admin_principal(target_admin["email"])
         
         # Log admin action
         await log_admin_action(
@@ -308,8 +307,7 @@ async def assign_role_to_admin(
                 "old_role": old_role,
                 "new_role": request.role,
                 "reason": request.reason
-            },
-            db=db
+            }
         )
         
         logger.info(f"Role assigned: {request.role} to admin {admin_id} by {current_admin['email']}")
@@ -338,17 +336,16 @@ async def get_admin_permissions(
     """
     try:
         # Check if requesting own permissions or if has permission to view others
-        if admin_id != admin["id"] and not check_permission(admin["role"], "view_audit_logs"):
+        if admin_id != admin.id and not has_permissions(admin.permission_mask, VIEW_AUDIT_LOGS_PERMISSION):
             raise HTTPException(status_code=403, detail="You can only view your own permissions")
         
-        permissions = await get_admin_effective_permissions(admin_id)
-        
         # Get admin details
         target_admin = await db.admins.find_one({"id": admin_id})
         if not target_admin:
             raise HTTPException(status_code=404, detail="Admin not found")
         
         role = target_admin.get("role", "viewer")
+        permissions = get_role_effective_permissions(role)
         role_data = ROLE_PERMISSIONS.get(role, {})
         
         # Build detailed permission list
@@ -486,13 +483,15 @@ async def get_role_statistics(
 
 # ============= PERMISSION CHECKING UTILITY =============
 
-async def require_permission(permission: str):
+def require_permission(permission: str):
     """
     Dependency to check if admin has specific permission
     Usage: admin = Depends(require_permission("create_blog"))
     """
+    required = permission_registry.mask([permission])
+    
     async def permission_checker(admin = Depends(get_current_admin)):
-        if not check_permission(admin["role"], permission):
+        if not has_permissions(admin.permission_mask, required):
             raise HTTPException(
                 status_code=403,
                 detail=f"You don't have permission: {permission}"
@@ -20,6 +20,11 @@ from api.phase14_scalability import (
 )
 from api.phase14_backup import BackupManager
 from cache import cache
+from password_hashing import password_hashing_pool
+from load_shedding import concurrency_limiter
+from metrics_registry import metrics_registry
+from mongo_monitoring import command_monitor
+from query_tracking import n_plus_one_detector
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +38,7 @@ db_name = os.environ['DB_NAME']
 
 # Initialize connection pool (will be used by dependency injection)
 db_pool = DatabaseConnectionPool(mongo_url, db_name, max_pool_size=50, min_pool_size=10)
+metrics_registry.register("database_pool", db_pool.collect_metrics)
 
 # Initialize backup manager
 backup_manager = None
@@ -237,14 +243,21 @@ async def optimize_database_indexes(
 
 @router.get("/scalability/performance/metrics")
 async def get_performance_metrics(
+    window: str = "5m",
     admin = Depends(require_super_admin)
 ):
     """
     Get application performance metrics
-    Returns request stats, response times, and error rates
+    Returns request stats, latency percentiles (overall and per route), status
+    codes, in-flight requests and error rates. Per-route stats cover the
+    sliding window given by `window` (1m, 5m or 15m).
     """
     try:
-        metrics = performance_monitor.get_metrics()
+        metrics = performance_monitor.get_metrics(window)
+        metrics["password_hashing"] = password_hashing_pool.get_stats()
+        metrics["load_shedding"] = concurrency_limiter.get_stats()
+        metrics["mongo_commands"] = command_monitor.get_stats()
+        metrics["db_per_request"] = n_plus_one_detector.get_stats()
         return metrics
     except Exception as e:
         logger.error(f"Performance metrics error: {str(e)}")
@@ -417,14 +430,18 @@ async def create_database_backup(
     background_tasks: BackgroundTasks,
     backup_type: str = "manual",
     collections: Optional[List[str]] = None,
+    concurrency: Optional[int] = None,
+    incremental: bool = False,
     admin = Depends(require_super_admin),
     backup_mgr = Depends(get_backup_manager)
 ):
     """
-    Create a complete database backup
+    Create a database backup
     
     - **backup_type**: Type of backup (manual, scheduled, pre-migration)
     - **collections**: Optional list of specific collections to backup
+    - **concurrency**: Optional number of collections to dump in parallel
+    - **incremental**: Only capture documents changed since the latest backup
     
     Returns backup metadata including backup ID and size
     """
@@ -432,7 +449,9 @@ async def create_database_backup(
         # Run backup in background for large databases
         result = await backup_mgr.create_backup(
             backup_type=backup_type,
-            include_collections=collections
+            include_collections=collections,
+            concurrency=concurrency,
+            incremental=incremental
         )
         
         if result.get("status") == "failed":
@@ -506,18 +525,20 @@ async def restore_database_backup(
     backup_id: str,
     collections: Optional[List[str]] = None,
     mode: str = "replace",
+    concurrency: Optional[int] = None,
     admin = Depends(require_super_admin),
     backup_mgr = Depends(get_backup_manager)
 ):
     """
     Restore database from a backup
     
-    - **backup_id**: ID of backup to restore
+    - **backup_id**: ID of backup to restore (incremental backups are composed with their full base)
     - **collections**: Optional list of specific collections to restore
     - **mode**: Restore mode
         - `replace`: Drop existing data and restore (default)
         - `merge`: Keep existing data, add backup data
         - `preview`: Preview what would be restored without actually restoring
+    - **concurrency**: Optional number of collections to restore in parallel
     
     ⚠️ **Warning**: `replace` mode will delete existing data!
     """
@@ -531,7 +552,8 @@ async def restore_database_backup(
         result = await backup_mgr.restore_backup(
             backup_id=backup_id,
             collections=collections,
-            mode=mode
+            mode=mode,
+            concurrency=concurrency
         )
         
         if result.get("status") == "failed":
@@ -5,10 +5,16 @@ Enhanced caching, connection pooling, and performance optimizations
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from fastapi import HTTPException
 import logging
 import asyncio
+import time
 from cache import cache, generate_cache_key
+from request_metrics import METRICS_WINDOWS, WindowedHistogram, status_summary
+from metrics_registry import COUNTER, GAUGE, SUMMARY, MetricFamily, counter, gauge, metrics_registry
+from mongo_monitoring import PoolStatsListener
+from api.admin.bulk_engine import BulkWriteEngine
 
 logger = logging.getLogger(__name__)
 
@@ -33,23 +39,41 @@ class DatabaseConnectionPool:
             max_pool_size: Maximum number of connections
             min_pool_size: Minimum number of connections to maintain
         """
-        self.client = AsyncIOMotorClient(
-            mongo_url,
-            maxPoolSize=max_pool_size,
-            minPoolSize=min_pool_size,
-            maxIdleTimeMS=45000,  # Close idle connections after 45s
-            serverSelectionTimeoutMS=5000,  # 5s timeout for server selection
-            connectTimeoutMS=10000,  # 10s connection timeout
-            socketTimeoutMS=20000,  # 20s socket timeout
-            retryWrites=True,
-            retryReads=True
-        )
-        self.db = self.client[db_name]
         self._stats = {
             "total_queries": 0,
             "failed_queries": 0,
-            "avg_query_time": 0
+            "avg_query_time": 0  # Seconds
         }
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self._client: Optional[AsyncIOMotorClient] = None
+        self._db = None
+    
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        """Motor client, created on first use rather than at import"""
+        if self._client is None:
+            self._client = AsyncIOMotorClient(
+                self.mongo_url,
+                maxPoolSize=self.max_pool_size,
+                minPoolSize=self.min_pool_size,
+                maxIdleTimeMS=45000,  # Close idle connections after 45s
+                serverSelectionTimeoutMS=5000,  # 5s timeout for server selection
+                connectTimeoutMS=10000,  # 10s connection timeout
+                socketTimeoutMS=20000,  # 20s socket timeout
+                retryWrites=True,
+                retryReads=True,
+                event_listeners=[PoolStatsListener(self._stats)]  # Keeps _stats current
+            )
+        return self._client
+    
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = self.client[self.db_name]
+        return self._db
     
     async def health_check(self) -> Dict[str, Any]:
         """Check connection pool health"""
@@ -61,8 +85,8 @@ class DatabaseConnectionPool:
             return {
                 "status": "healthy",
                 "response_time_ms": round(response_time, 2),
-                "max_pool_size": 50,
-                "min_pool_size": 10,
+                "max_pool_size": self.max_pool_size,
+                "min_pool_size": self.min_pool_size,
                 "stats": self._stats
             }
         except Exception as e:
@@ -77,9 +101,18 @@ class DatabaseConnectionPool:
         """Get database instance"""
         return self.db
     
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Pool metrics for the metrics registry"""
+        return [
+            counter("db_queries_total", "Database commands run", self._stats["total_queries"]),
+            counter("db_failed_queries_total", "Database commands that failed", self._stats["failed_queries"]),
+            gauge("db_avg_query_seconds", "Average database command time", self._stats["avg_query_time"])
+        ]
+    
     async def close(self):
         """Close all connections"""
-        self.client.close()
+        if self._client is not None:
+            self._client.close()
         logger.info("Database connection pool closed")
 
 
@@ -220,29 +253,17 @@ class BatchOperations:
         if not updates:
             return 0
         
-        total_modified = 0
+        engine = BulkWriteEngine(chunk_size=batch_size)
+        operations = [UpdateOne(filter_doc, update_doc) for filter_doc, update_doc in updates]
+        result = await engine.execute(collection, operations)
         
-        # Process in batches
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i + batch_size]
-            
-            # Use bulk write for efficiency
-            operations = [
-                {"updateOne": {"filter": filter_doc, "update": update_doc}}
-                for filter_doc, update_doc in batch
-            ]
-            
-            try:
-                result = await collection.bulk_write([
-                    {"updateOne": op["updateOne"]} for op in operations
-                ])
-                total_modified += result.modified_count
-                logger.debug(f"Batch update: {result.modified_count} documents modified")
-            except Exception as e:
-                logger.error(f"Batch update error: {str(e)}")
-                raise
+        if result["failed_count"]:
+            first_error = next(iter(result["errors"].values()))
+            logger.error(f"Batch update error: {result['failed_count']} operations failed ({first_error})")
+            raise RuntimeError(f"Batch update failed for {result['failed_count']} operations: {first_error}")
         
-        return total_modified
+        logger.debug(f"Batch update: {result['modified_count']} documents modified")
+        return result["modified_count"]
 
 
 # ============= QUERY OPTIMIZER =============
@@ -439,46 +460,118 @@ class BackgroundTasks:
 # ============= PERFORMANCE MONITORING =============
 
 class PerformanceMonitor:
-    """Monitor and track application performance metrics"""
+    """
+    Monitor and track application performance metrics
+
+    Fed by request_metrics.RequestTimingMiddleware: per-route latency
+    histograms, status code counters and in-flight gauges, since startup
+    and over sliding windows.
+    """
     
     def __init__(self):
-        self._metrics = {
-            "total_requests": 0,
-            "avg_response_time": 0,
-            "cache_hit_rate": 0,
-            "error_rate": 0
-        }
+        self._overall = WindowedHistogram()
+        self._routes: Dict[str, WindowedHistogram] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+    
+    def request_started(self):
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+    
+    def request_finished(self, endpoint: str, response_time: float, status_code: int):
+        self.in_flight -= 1
+        self.record_request(endpoint, response_time, status_code)
     
     def record_request(self, endpoint: str, response_time: float, status_code: int):
-        """Record request metrics"""
-        self._metrics["total_requests"] += 1
-        
-        # Update average response time
-        current_avg = self._metrics["avg_response_time"]
-        total = self._metrics["total_requests"]
-        self._metrics["avg_response_time"] = (
-            (current_avg * (total - 1) + response_time) / total
-        )
-        
-        # Track errors
-        if status_code >= 400:
-            self._metrics["error_rate"] = (
-                self._metrics.get("errors", 0) + 1
-            ) / total
+        """
+        Record request metrics
+        
+        Args:
+            endpoint: Route template, e.g. "GET /api/events/{event_id}"
+            response_time: Seconds
+            status_code: Response status code
+        """
+        micros = int(response_time * 1_000_000)
+        now = time.monotonic()
+        self._overall.record(micros, status_code, now)
+        route = self._routes.get(endpoint)
+        if route is None:
+            route = self._routes[endpoint] = WindowedHistogram()
+        route.record(micros, status_code, now)
     
-    def get_metrics(self) -> Dict[str, Any]:
-        """Get current performance metrics"""
-        cache_stats = cache.get_stats()
+    def get_metrics(self, window: str = "5m") -> Dict[str, Any]:
+        """
+        Get current performance metrics
         
+        Args:
+            window: Sliding window for the per-route breakdown (see METRICS_WINDOWS)
+        """
+        cache_stats = cache.get_stats()
+        now = time.monotonic()
+        window_seconds = METRICS_WINDOWS.get(window, METRICS_WINDOWS["5m"])
+        lifetime = self._overall.lifetime
+        
+        windows = {}
+        for name, seconds in METRICS_WINDOWS.items():
+            histogram, statuses = self._overall.window(seconds, now)
+            windows[name] = {**histogram.summary(), **status_summary(statuses)}
+        
+        routes = {}
+        for endpoint, route in self._routes.items():
+            histogram, statuses = route.window(window_seconds, now)
+            if histogram.total:
+                routes[endpoint] = {
+                    **histogram.summary(),
+                    **status_summary(statuses),
+                    "lifetime_count": route.lifetime.total
+                }
+        
+        lifetime_statuses = status_summary(self._overall.statuses)
         return {
-            **self._metrics,
+            "total_requests": lifetime.total,
+            "avg_response_time": lifetime.sum / lifetime.total / 1_000_000 if lifetime.total else 0,
+            "cache_hit_rate": cache_stats.get("hit_rate", 0),
+            "error_rate": lifetime_statuses["error_rate"],
+            "latency": lifetime.summary(),
+            "status_codes": lifetime_statuses["status_codes"],
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "windows": windows,
+            "routes_window": window if window in METRICS_WINDOWS else "5m",
+            "routes": dict(sorted(routes.items(), key=lambda item: item[1]["count"], reverse=True)),
             "cache_stats": cache_stats,
             "timestamp": datetime.utcnow().isoformat()
         }
+    
+    def collect_metrics(self) -> List[MetricFamily]:
+        """
+        HTTP metrics for the metrics registry
+        
+        Quantiles cover the 5 minute window; counts and sums are since startup.
+        """
+        now = time.monotonic()
+        requests = MetricFamily("http_requests_total", COUNTER, "HTTP requests by route and status code")
+        durations = MetricFamily("http_request_duration_seconds", SUMMARY, "HTTP request latency by route")
+        for endpoint, route in list(self._routes.items()):
+            for status_code, count in route.statuses.items():
+                requests.add(count, {"route": endpoint, "status": status_code})
+            histogram, _ = route.window(METRICS_WINDOWS["5m"], now)
+            if histogram.total:
+                for p, micros in histogram.percentiles().items():
+                    durations.add(micros / 1_000_000, {"route": endpoint, "quantile": p / 100})
+            durations.add(route.lifetime.total, {"route": endpoint}, "_count")
+            durations.add(route.lifetime.sum / 1_000_000, {"route": endpoint}, "_sum")
+        return [
+            requests,
+            durations,
+            MetricFamily("http_requests_in_flight", GAUGE, "HTTP requests being handled").add(self.in_flight)
+        ]
 
 
 # Global performance monitor instance
 performance_monitor = PerformanceMonitor()
+metrics_registry.register("http", performance_monitor.collect_metrics)
 
 
 # ============= SCALABILITY UTILITIES =============
@@ -5,9 +5,19 @@ Backend infrastructure for push notifications (disabled by default, admin toggle
 
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import asyncio
 from bson import ObjectId
 from pymongo import ASCENDING, DESCENDING
-from ..models import get_db
+from db_clients import sync_database
+from metrics_registry import GAUGE, MetricFamily, metrics_registry
+
+_db = sync_database()  # Shared client, created on first query
+
+
+def get_db():
+    """Database handle used by the push notification managers"""
+    return _db
+
 
 # ========================================
 # Push Notification Subscription Manager
@@ -383,3 +393,27 @@ def get_push_notification_stats() -> Dict[str, Any]:
             "total": queued + sent + failed
         }
     }
+
+
+def get_push_queue_depths() -> Dict[str, int]:
+    """Queued notifications per status, in a single aggregation"""
+    db = get_db()
+    return {
+        item["_id"]: item["count"]
+        for item in db.push_notification_queue.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ])
+    }
+
+
+async def collect_push_queue_metrics() -> List[MetricFamily]:
+    """Push queue depths for the metrics registry (sync driver - runs on a thread)"""
+    depths = await asyncio.to_thread(get_push_queue_depths)
+    family = MetricFamily("push_queue_notifications", GAUGE, "Push notifications in the queue by status")
+    for queue_status, count in depths.items():
+        family.add(count, {"status": queue_status})
+    return [family]
+
+
+# Scraped at most every 30s - each collection is a database aggregation
+metrics_registry.register("push_queue", collect_push_queue_metrics, cache_seconds=30)
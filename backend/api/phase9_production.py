@@ -6,7 +6,6 @@ import sys
 import logging
 from datetime import datetime
 from typing import Dict, Any
-import pkg_resources
 
 logger = logging.getLogger(__name__)
 
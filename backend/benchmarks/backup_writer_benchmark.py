@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Backup Writer Benchmark (Phase 14.2)
+Compares the original to_list + json.dumps(indent=2) backup path with the
+streaming, chunked Extended-JSON lines writer on a synthetic collection.
+
+Usage:
+    python benchmarks/backup_writer_benchmark.py [document_count]
+
+Runs without MongoDB - the collection is simulated by an async cursor that
+yields generated documents in batches, like Motor does.
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import json_util, ObjectId
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from api.phase14_backup import ChunkStore, write_collection_chunks  # noqa: E402
+
+
+def make_document(i: int) -> dict:
+    """Generate a session-booking shaped document"""
+    return {
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "full_name": f"Client {i}",
+        "email": f"client{i}@example.com",
+        "phone": "+91 98765 43210",
+        "therapy_type": "individual",
+        "concerns": ["anxiety", "stress"],
+        "message": "Looking for weekly sessions in the evening.",
+        "status": "pending",
+        "consent": True,
+        "created_at": datetime(2025, 1, 1) + timedelta(minutes=i),
+    }
+
+
+class FakeCursor:
+    """Async cursor yielding generated documents"""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for i in range(self.count):
+            yield make_document(i)
+
+    async def to_list(self, length=None):
+        return [doc async for doc in self._iterate()]
+
+
+class FakeCollection:
+    def __init__(self, count: int):
+        self.count = count
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.count)
+
+
+async def legacy_backup(collection, collection_file: Path):
+    """The original create_backup serialization path"""
+    documents = await collection.find().to_list(length=None)
+    collection_data = json.dumps(documents, default=json_util.default, indent=2)
+    with gzip.open(collection_file, 'wt', encoding='utf-8') as f:
+        f.write(collection_data)
+    return len(documents)
+
+
+async def measure(name: str, coro_factory):
+    # Timed run first - tracemalloc slows allocation-heavy code considerably
+    start = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await coro_factory()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {elapsed:>8.2f} s   peak memory {peak / (1024 * 1024):>9.1f} MB")
+    return elapsed, peak
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    collection = FakeCollection(count)
+
+    print(f"📦 Backing up {count:,} synthetic documents\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        legacy_file = tmp_path / "legacy.json.gz"
+        stores = []
+
+        def streaming_backup():
+            # Fresh store per run - documents are regenerated, nothing to deduplicate
+            run = tmp_path / f"run_{len(stores)}"
+            stores.append(ChunkStore(run / "chunks", run / "chunk_holds", tmp_path / "catalog.lock"))
+            return write_collection_chunks(collection, stores[-1], "gzip")
+
+        legacy_time, legacy_peak = await measure(
+            "legacy", lambda: legacy_backup(collection, legacy_file)
+        )
+        streaming_time, streaming_peak = await measure(
+            "streaming", streaming_backup
+        )
+        streaming_size = sum(f.stat().st_size for f in stores[-1].iter_chunk_files())
+
+        print()
+        print(f"File size    legacy {legacy_file.stat().st_size / (1024 * 1024):.1f} MB, "
+              f"streaming {streaming_size / (1024 * 1024):.1f} MB")
+        print(f"Speedup      {legacy_time / streaming_time:.2f}x")
+        print(f"Peak memory  {legacy_peak / max(streaming_peak, 1):.1f}x lower")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
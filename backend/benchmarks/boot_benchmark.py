@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Boot Time Benchmark and Import Profile (Phase 14.1)
+Starts fresh interpreters that import server.py (building the app with all
+routers) and reports:
+
+    boot        median wall time of `import server`, and of the whole process
+    side effects threads running, Mongo clients built and SDKs loaded at import
+    profile     -X importtime: slowest first-party modules (cumulative) and
+                the third-party packages boot time goes to (self time)
+
+Usage:
+    python benchmarks/boot_benchmark.py [runs] [top]
+
+Runs without MongoDB - clients are created lazily, so nothing connects
+during import. MONGO_URL / DB_NAME default to a local placeholder.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).parent.parent
+
+HEAVY_MODULES = ("razorpay", "emergentintegrations", "requests")  # SDKs that should load on first use
+
+BOOT_PROBE = f"""
+import json, sys, threading, time
+start = time.perf_counter()
+import server
+import_ms = (time.perf_counter() - start) * 1000
+import db_clients
+print(json.dumps({{
+    "import_ms": import_ms,
+    "routes": len(server.app.routes),
+    "threads": threading.active_count(),
+    "motor_client": db_clients._motor_client is not None,
+    "sync_client": db_clients._sync_client is not None,
+    "heavy_modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+}}))
+"""
+
+
+def first_party_roots() -> set:
+    return {path.stem for path in ROOT_DIR.glob("*.py")} | {"api"}
+
+
+def run_python(args: List[str]) -> Tuple[subprocess.CompletedProcess, float]:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "boot_benchmark")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"import server failed:\n{result.stderr[-2000:]}")
+    return result, elapsed
+
+
+def measure_boot(runs: int) -> Dict[str, Any]:
+    probes = []
+    process_ms = []
+    for _ in range(runs):
+        result, elapsed = run_python(["-c", BOOT_PROBE])
+        probes.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        process_ms.append(elapsed * 1000)
+    return {
+        "import_ms": statistics.median(probe["import_ms"] for probe in probes),
+        "process_ms": statistics.median(process_ms),
+        "last": probes[-1]
+    }
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for each line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def import_profile(top: int) -> Dict[str, Any]:
+    result, _ = run_python(["-X", "importtime", "-c", "import server"])
+    entries = parse_importtime(result.stderr)
+    roots = first_party_roots()
+
+    first_party = sorted(
+        (entry for entry in entries if entry[0].split(".")[0] in roots),
+        key=lambda entry: entry[2], reverse=True
+    )
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in entries:
+        root = name.split(".")[0]
+        if root not in roots:
+            packages[root] += self_us
+    return {
+        "total_ms": sum(self_us for _, self_us, _ in entries) / 1000,
+        "modules": len(entries),
+        "first_party": first_party[:top],
+        "packages": sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    print(f"🚀 Booting server.py {runs} times\n")
+    boot = measure_boot(runs)
+    last = boot["last"]
+    print(f"import server   median {boot['import_ms']:>7.1f} ms   ({last['routes']} routes)")
+    print(f"whole process   median {boot['process_ms']:>7.1f} ms   (interpreter start + import + exit)")
+    print(f"after import    {last['threads']} thread(s), "
+          f"motor client {'built' if last['motor_client'] else 'deferred'}, "
+          f"sync client {'built' if last['sync_client'] else 'deferred'}, "
+          f"SDKs loaded: {', '.join(last['heavy_modules']) or 'none'}")
+
+    profile = import_profile(top)
+    print(f"\n📦 -X importtime: {profile['modules']} modules, {profile['total_ms']:.1f} ms self time in total\n")
+    print("Slowest first-party modules (cumulative, includes what they import first):")
+    for name, self_us, cumulative_us in profile["first_party"]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {self_us / 1000:>7.1f} ms self  {name}")
+    print("\nThird-party packages by self time:")
+    for name, self_us in profile["packages"]:
+        print(f"  {self_us / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+JSON Serialization Benchmark (Phase 13.1)
+Times a list endpoint returning 1000 validated Event models, like a cache
+hit on GET /api/events, through three response paths:
+
+    stdlib      response_model validation + jsonable_encoder + json.dumps
+    orjson      response_model validation + jsonable_encoder + orjson
+    trusted     trusted_list_response - pydantic-core dumps the models directly
+
+Usage:
+    python benchmarks/json_serialization_benchmark.py [items] [requests]
+
+Runs in-process: requests are sent straight to the ASGI app.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from json_responses import DefaultJSONResponse, trusted_list_response  # noqa: E402
+from models import Event  # noqa: E402
+
+
+def make_events(count: int) -> List[Event]:
+    return [
+        Event(
+            title=f"Community Circle {i}",
+            description="A safe space to share experiences and learn coping strategies together. " * 3,
+            event_type="circle",
+            date="2025-03-15",
+            time="18:00",
+            price="Free",
+            is_paid=False,
+            schedule="Monthly",
+            features=["Guided discussion", "Breathing exercises", "Peer support"]
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(events: List[Event], path: str) -> FastAPI:
+    app = FastAPI(default_response_class=DefaultJSONResponse if path == "orjson" else JSONResponse)
+
+    if path == "trusted":
+        @app.get("/events", response_model=List[Event])
+        async def get_events():
+            return trusted_list_response(Event, events)
+    else:
+        @app.get("/events", response_model=List[Event])
+        async def get_events():
+            return events
+
+    return app
+
+
+async def asgi_get(app, path: str = "/events") -> bytes:
+    """Call the app directly over ASGI and return the response body"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80)
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(name: str, app, requests: int) -> float:
+    await asgi_get(app)  # Warm up
+    start = time.perf_counter()
+    for _ in range(requests):
+        await asgi_get(app)
+    per_request = (time.perf_counter() - start) / requests * 1000
+    print(f"{name:<10} {per_request:>8.2f} ms/request")
+    return per_request
+
+
+async def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    events = make_events(items)
+    apps = {path: build_app(events, path) for path in ("stdlib", "orjson", "trusted")}
+
+    # All paths must produce the same document
+    bodies = {path: json.loads(await asgi_get(app)) for path, app in apps.items()}
+    assert bodies["stdlib"] == bodies["orjson"] == bodies["trusted"]
+
+    print(f"📄 GET /events returning {items:,} Event models, {requests} requests\n")
+    timings = {path: await measure(path, app, requests) for path, app in apps.items()}
+
+    print()
+    print(f"orjson       {timings['stdlib'] / timings['orjson']:.2f}x faster than stdlib")
+    print(f"trusted      {timings['stdlib'] / timings['trusted']:.2f}x faster than stdlib")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
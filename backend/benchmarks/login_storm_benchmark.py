@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Login Storm Benchmark (Phase 14.1)
+Measures the latency of a cheap endpoint while a burst of logins is being
+verified, with bcrypt run inline on the event loop (the original login
+path) and on the bounded password hashing pool.
+
+Usage:
+    python benchmarks/login_storm_benchmark.py [logins] [bcrypt_rounds]
+
+Runs without MongoDB - a small FastAPI app with a login endpoint and a
+health endpoint is called in-process through its ASGI interface.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bcrypt
+from fastapi import FastAPI, HTTPException
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from password_hashing import PasswordHashingPool  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.01  # Seconds between health probes
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def build_app(hashed_password: str, pool: PasswordHashingPool = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if pool is None:
+            valid = verify_password(PASSWORD, hashed_password)
+        else:
+            valid = await pool.run(verify_password, PASSWORD, hashed_password)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def asgi_request(app: FastAPI, method: str, path: str) -> int:
+    """Call the app directly over ASGI and return the response status"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80)
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return response["status"]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def storm(app: FastAPI, logins: int):
+    """Fire `logins` concurrent logins while probing /health until they finish"""
+    probe_latencies = []
+    login_latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        # Latency counts from when the probe was due, so time spent waiting
+        # on a blocked event loop shows up as it would for a real client
+        due = time.perf_counter()
+        while True:
+            assert await asgi_request(app, "GET", "/health") == 200
+            probe_latencies.append((time.perf_counter() - due) * 1000)
+            if done.is_set():
+                break
+            due = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    async def login():
+        start = time.perf_counter()
+        status = await asgi_request(app, "POST", "/login")
+        login_latencies.append((time.perf_counter() - start) * 1000)
+        return status
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(PROBE_INTERVAL * 5)  # Baseline probes before the storm
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*[login() for _ in range(logins)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    return {
+        "elapsed": elapsed,
+        "ok": statuses.count(200),
+        "probes": len(probe_latencies),
+        "probe_p50": statistics.median(probe_latencies),
+        "probe_p99": percentile(probe_latencies, 0.99),
+        "probe_max": max(probe_latencies),
+        "login_p50": statistics.median(login_latencies)
+    }
+
+
+def report(name: str, result: dict):
+    print(f"{name:<8} logins ok {result['ok']:>4}  in {result['elapsed']:>6.2f} s   "
+          f"/health p50 {result['probe_p50']:>7.1f} ms  p99 {result['probe_p99']:>7.1f} ms  "
+          f"max {result['probe_max']:>7.1f} ms  ({result['probes']} probes)   "
+          f"login p50 {result['login_p50']:>7.1f} ms")
+
+
+async def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    hashed_password = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+    pool = PasswordHashingPool()
+    print(f"🔐 {logins} concurrent logins, bcrypt cost {rounds}, {pool.workers} hashing workers\n")
+
+    inline = await storm(build_app(hashed_password), logins)
+    report("inline", inline)
+    pooled = await storm(build_app(hashed_password, pool), logins)
+    report("pooled", pooled)
+    pool.shutdown()
+
+    stats = pool.get_stats()
+    print()
+    print(f"Pool         peak queue depth {stats['peak_queue_depth']}, "
+          f"avg wait {stats['avg_wait_ms']} ms, avg run {stats['avg_run_ms']} ms")
+    print(f"/health p99  {inline['probe_p99'] / max(pooled['probe_p99'], 0.001):.1f}x lower during the storm")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Security Headers Middleware Benchmark (Phase 9.7)
+Compares requests per second on a trivial endpoint with the original
+BaseHTTPMiddleware security headers middleware and the pure ASGI one.
+
+Usage:
+    python benchmarks/security_headers_benchmark.py [requests]
+
+Runs in-process: requests are sent straight to the ASGI app, so the
+numbers reflect middleware overhead rather than network or server costs.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from security_headers import SECURITY_HEADERS, SecurityHeadersMiddleware, encode_headers  # noqa: E402
+
+CONCURRENCY = 50
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The original server.py middleware"""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+        response.headers["Content-Security-Policy"] = (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://www.googletagmanager.com https://www.google-analytics.com; "
+            "style-src 'self' 'unsafe-inline'; "
+            "img-src 'self' data: https:; "
+            "font-src 'self' data:; "
+            "connect-src 'self' https://www.google-analytics.com;"
+        )
+        return response
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def asgi_request(app, path: str = "/ping") -> list:
+    """Call the app directly over ASGI and return the response headers"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80)
+    }
+    response = {}
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # Like a server: the request body once, then nothing until disconnect
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["headers"] = message["headers"]
+
+    await app(scope, receive, send)
+    return response["headers"]
+
+
+async def measure(name: str, app, requests: int) -> float:
+    await asyncio.gather(*[asgi_request(app) for _ in range(CONCURRENCY)])  # Warm up
+
+    async def worker(count: int):
+        for _ in range(count):
+            await asgi_request(app)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(requests // CONCURRENCY) for _ in range(CONCURRENCY)])
+    elapsed = time.perf_counter() - start
+    rps = (requests // CONCURRENCY) * CONCURRENCY / elapsed
+    print(f"{name:<16} {rps:>10,.0f} req/s")
+    return rps
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    legacy_app = build_app(LegacySecurityHeadersMiddleware)
+    asgi_app = build_app(SecurityHeadersMiddleware)
+    # Both must send the same security headers
+    expected = encode_headers(SECURITY_HEADERS)
+    for app in (legacy_app, asgi_app):
+        headers = await asgi_request(app)
+        assert all(pair in headers for pair in expected)
+
+    print(f"🛡️  {requests:,} requests to a trivial endpoint, {CONCURRENCY} concurrent\n")
+    baseline = await measure("no middleware", build_app(), requests)
+    legacy = await measure("BaseHTTP", legacy_app, requests)
+    pure = await measure("pure ASGI", asgi_app, requests)
+
+    print()
+    print(f"Speedup      {pure / legacy:.2f}x over BaseHTTPMiddleware")
+    print(f"Overhead     {100 * (1 - legacy / baseline):.0f}% -> {100 * (1 - pure / baseline):.0f}% of no-middleware throughput")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
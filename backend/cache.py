@@ -2,11 +2,15 @@
 Simple in-memory caching system for FastAPI
 Phase 13.1 - Performance Optimization
 """
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List
 from datetime import datetime, timedelta
 import logging
 import json
 import hashlib
+import os
+import time
+
+from metrics_registry import MetricFamily, counter, gauge, metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +109,16 @@ class InMemoryCache:
             "cache_size": len(self._cache)
         }
     
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Cache metrics for the metrics registry"""
+        return [
+            counter("cache_hits_total", "Response cache hits", self._stats["hits"]),
+            counter("cache_misses_total", "Response cache misses", self._stats["misses"]),
+            counter("cache_sets_total", "Response cache writes", self._stats["sets"]),
+            counter("cache_deletes_total", "Response cache deletions", self._stats["deletes"]),
+            gauge("cache_entries", "Entries in the response cache", len(self._cache))
+        ]
+    
     def cleanup_expired(self):
         """Remove all expired entries"""
         expired_keys = [
@@ -118,6 +132,147 @@ class InMemoryCache:
             logger.info(f"Cache CLEANUP: {len(expired_keys)} expired entries removed")
 
 
+class PrincipalCache:
+    """
+    Short-TTL cache of authenticated principals (admins, users).
+    
+    Principals are keyed by (namespace, token subject, token iat). Verified
+    tokens are remembered too, so a repeat request with the same bearer
+    token costs two dict lookups instead of a JWT decode plus a database
+    read. Entries live for at most `ttl` seconds and are dropped at once by
+    invalidate() when the principal changes (role, password, deactivation).
+    Invalidation is per process; the TTL bounds staleness across workers.
+    
+    Invalidations are numbered. A load records the current number and its
+    result is only cached if the subject has not been invalidated since.
+    Invalidation records are kept only for subjects with cached principals
+    once there are more than `max_entries`; loads that started before a
+    dropped record are not cached.
+    """
+    
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._principals: Dict[tuple, tuple] = {}   # (ns, subject, iat) -> (cached_until, principal)
+        self._tokens: Dict[str, tuple] = {}         # token -> ((ns, subject, iat), token exp)
+        self._subjects: Dict[tuple, set] = {}       # (ns, subject) -> principal keys
+        self._generations: Dict[tuple, int] = {}    # (ns, subject) -> number of its last invalidation
+        self._generation = 0                        # number of the last invalidation
+        self._pruned_generation = 0                 # newest invalidation whose record was dropped
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0
+        }
+    
+    def get(self, namespace: str, token: str) -> Optional[Any]:
+        """Return the cached principal for a previously verified token"""
+        entry = self._tokens.get(token)
+        if entry is not None:
+            key, token_expires = entry
+            if token_expires is not None and time.time() >= token_expires:
+                del self._tokens[token]
+            elif key[0] == namespace:
+                cached = self._principals.get(key)
+                if cached is not None and time.monotonic() < cached[0]:
+                    self._stats["hits"] += 1
+                    return cached[1]
+        self._stats["misses"] += 1
+        return None
+    
+    def subject(self, token: str) -> Optional[tuple]:
+        """(namespace, subject) of a verified, unexpired token, without touching hit stats"""
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        key, token_expires = entry
+        if token_expires is not None and time.time() >= token_expires:
+            return None
+        return key[0], key[1]
+    
+    def generation(self, namespace: str, subject: str) -> int:
+        """Read before loading a principal; pass to set() so stale loads are discarded"""
+        return self._generation
+    
+    def set(
+        self,
+        namespace: str,
+        token: str,
+        subject: str,
+        issued_at: Optional[float],
+        token_expires: Optional[float],
+        principal: Any,
+        generation: int
+    ):
+        """Cache a principal loaded for a verified token"""
+        if self._generations.get((namespace, subject), self._pruned_generation) > generation:
+            # Invalidated (or possibly invalidated) while the principal was being loaded
+            return
+        key = (namespace, subject, issued_at)
+        if len(self._tokens) >= self.max_entries:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._tokens.pop(next(iter(self._tokens)))
+        if key not in self._principals and len(self._principals) >= self.max_entries:
+            self._evict_principal(next(iter(self._principals)))
+        self._principals[key] = (time.monotonic() + self.ttl, principal)
+        self._tokens[token] = (key, token_expires)
+        self._subjects.setdefault((namespace, subject), set()).add(key)
+    
+    def _evict_principal(self, key: tuple):
+        self._principals.pop(key, None)
+        subject_key = (key[0], key[1])
+        keys = self._subjects.get(subject_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._subjects[subject_key]
+    
+    def _prune_generations(self):
+        """Drop invalidation records of subjects with nothing cached"""
+        for subject_key in [k for k in self._generations if k not in self._subjects]:
+            self._pruned_generation = max(self._pruned_generation, self._generations.pop(subject_key))
+    
+    def invalidate(self, namespace: str, subject: str):
+        """Drop every cached principal for a subject"""
+        subject_key = (namespace, subject)
+        self._generation += 1
+        self._generations[subject_key] = self._generation
+        for key in self._subjects.pop(subject_key, ()):
+            self._principals.pop(key, None)
+        if len(self._generations) > self.max_entries:
+            self._prune_generations()
+        self._stats["invalidations"] += 1
+        logger.debug(f"Principal cache INVALIDATE: {namespace}:{subject}")
+    
+    def clear(self):
+        """Clear all cached principals"""
+        self._principals.clear()
+        self._tokens.clear()
+        self._subjects.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get principal cache statistics"""
+        total_requests = self._stats["hits"] + self._stats["misses"]
+        hit_rate = (self._stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+        
+        return {
+            **self._stats,
+            "hit_rate": round(hit_rate, 2),
+            "principals": len(self._principals),
+            "tokens": len(self._tokens),
+            "ttl_seconds": self.ttl
+        }
+    
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Principal cache metrics for the metrics registry"""
+        return [
+            counter("principal_cache_hits_total", "Authenticated principal cache hits", self._stats["hits"]),
+            counter("principal_cache_misses_total", "Authenticated principal cache misses", self._stats["misses"]),
+            counter("principal_cache_invalidations_total", "Authenticated principal invalidations", self._stats["invalidations"]),
+            gauge("principal_cache_entries", "Cached authenticated principals", len(self._principals))
+        ]
+
+
 def generate_cache_key(prefix: str, **params) -> str:
     """
     Generate a consistent cache key from parameters
@@ -138,6 +293,15 @@ def generate_cache_key(prefix: str, **params) -> str:
 # Global cache instance
 cache = InMemoryCache()
 
+# Global authenticated-principal cache
+principal_cache = PrincipalCache(
+    ttl=float(os.environ.get("PRINCIPAL_CACHE_TTL", "30")),
+    max_entries=int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+)
+
+metrics_registry.register("cache", cache.collect_metrics)
+metrics_registry.register("principal_cache", principal_cache.collect_metrics)
+
 
 # Cache decorator for FastAPI routes
 def cached(ttl: int = 300, key_prefix: str = ""):
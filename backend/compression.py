@@ -0,0 +1,314 @@
+"""
+Response compression with Accept-Encoding negotiation
+Phase 13.1 - Performance Optimization
+
+CompressionMiddleware picks the best codec the client accepts - Brotli,
+then zstd, then gzip - and compresses eligible responses. Large bodies are
+compressed on a worker thread (zlib, brotli and zstd release the GIL) so
+they never stall the event loop; small ones are compressed inline, where a
+thread hop would cost more than it saves. Bodies already compressed
+(images, archives, fonts, ...) or carrying a Content-Encoding are passed
+through untouched.
+
+PrecompressedStaticFiles serves a file's .br or .gz sibling, when one
+exists, to clients accepting that encoding.
+
+Brotli and zstd are optional - without the packages only gzip is offered.
+"""
+import asyncio
+import gzip
+import logging
+import os
+import stat
+import sys
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional - gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", "500"))  # Bytes
+COMPRESSION_OFFLOAD_SIZE = int(os.environ.get("COMPRESSION_OFFLOAD_SIZE", str(64 * 1024)))  # Larger bodies compress off-loop
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "4"))  # 4-5 suits dynamic responses; 11 is for build-time assets
+ZSTD_LEVEL = int(os.environ.get("ZSTD_LEVEL", "3"))
+
+# Server preference, best first
+AVAILABLE_ENCODINGS = tuple(
+    encoding for encoding, module in (("br", brotli), ("zstd", zstandard), ("gzip", zlib))
+    if module is not None
+)
+
+# Media types that are already compressed - compressing again only costs CPU
+INCOMPRESSIBLE_TYPES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip", "application/zstd",
+    "application/x-7z-compressed", "application/x-rar-compressed", "application/x-bzip2",
+    "application/pdf", "application/octet-stream"
+)
+
+# Precompressed sibling suffixes for static files, best first
+PRECOMPRESSED_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+@lru_cache(maxsize=256)
+def _accepted_encodings(accept_encoding: str) -> Tuple[frozenset, frozenset]:
+    """Codings of an Accept-Encoding header with a non-zero q-value, and those refused with q=0"""
+    accepted = set()
+    refused = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        coding = coding.strip()
+        if coding:
+            (accepted if q > 0 else refused).add(coding)
+    return frozenset(accepted), frozenset(refused)
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Tuple[str, ...] = AVAILABLE_ENCODINGS) -> Optional[str]:
+    """Best available encoding the client accepts, or None"""
+    if not accept_encoding:
+        return None
+    accepted, refused = _accepted_encodings(accept_encoding)
+    for encoding in encodings:
+        # An explicit q=0 refuses a coding even when "*" accepts the rest
+        if encoding in accepted or ("*" in accepted and encoding not in refused):
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    return not content_type.lower().startswith(INCOMPRESSIBLE_TYPES)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body"""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor for streaming responses"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress = self._compressor.process
+            self._finish = self._compressor.finish
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._compress = self._compressor.compress
+            self._finish = self._compressor.flush
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses with the negotiated encoding"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE, offload_size: int = COMPRESSION_OFFLOAD_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await CompressionResponder(self.app, encoding, self.minimum_size, self.offload_size)(scope, receive, send)
+
+
+class CompressionResponder:
+    """Compresses one response; decides on the first body message"""
+
+    def __init__(self, app, encoding: str, minimum_size: int, offload_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.send = None
+        self.initial_message = None
+        self.passthrough = False
+        self.started = False
+        self.stream: Optional[StreamCompressor] = None
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until the first body shows how to send it
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if not more_body:
+                # Complete body in one message
+                if len(body) < self.minimum_size:
+                    await self.send(self.initial_message)
+                    await self.send(message)
+                    return
+                if len(body) >= self.offload_size:
+                    compressed = await asyncio.get_running_loop().run_in_executor(None, compress, body, self.encoding)
+                else:
+                    compressed = compress(body, self.encoding)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(compressed))
+                headers.add_vary_header("Accept-Encoding")
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming response - compress chunk by chunk
+            self.stream = StreamCompressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(self.initial_message)
+
+        if self.stream is None:
+            # Response already finished or sent uncompressed
+            await self.send(message)
+            return
+
+        data = self.stream.compress(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles serving precompressed .br/.gz siblings when the client accepts them"""
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code != 200 or not isinstance(response, FileResponse):
+            return response
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        accepted = _accepted_encodings(accept_encoding)[0] if accept_encoding else frozenset()
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                return FileResponse(
+                    full_path,
+                    stat_result=stat_result,
+                    media_type=response.media_type,
+                    headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+                )
+
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+
+def precompress_directory(directory: Path, min_size: int = COMPRESSION_MINIMUM_SIZE) -> Dict[str, int]:
+    """
+    Write .br (when Brotli is installed) and .gz siblings for compressible files.
+
+    Siblings are only rewritten when the source file is newer, and kept only
+    if they are actually smaller than the source.
+
+    Returns:
+        Count of siblings written per encoding
+    """
+    import mimetypes
+
+    written = {"br": 0, "gzip": 0}
+    suffixes = tuple(suffix for _, suffix in PRECOMPRESSED_SUFFIXES)
+    for path in Path(directory).rglob("*"):
+        if not path.is_file() or path.suffix in suffixes or path.stat().st_size < min_size:
+            continue
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if not is_compressible(content_type):
+            continue
+        data = None
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+            if encoding == "br" and brotli is None:
+                continue
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and sibling.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            data = data if data is not None else path.read_bytes()
+            compressed = brotli.compress(data, quality=11) if encoding == "br" else gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                sibling.write_bytes(compressed)
+                written[encoding] += 1
+    return written
+
+
+if __name__ == "__main__":
+    # Usage: python compression.py <directory>
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "static"
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Precompressed {precompress_directory(target)} files under {target}")
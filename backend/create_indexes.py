@@ -6,9 +6,14 @@ import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
+from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
 
+from api.admin.audit_partitions import AuditLogPartitions, partition_name, LEGACY_COLLECTION
+from api.admin.refresh_tokens import ensure_refresh_token_indexes, migrate_legacy_tokens
+from api.phase14_backup import INCREMENTAL_COLLECTIONS
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -91,36 +96,40 @@ async def create_indexes():
         await db.admins.create_index("is_active")
         logger.info("✓ admins indexes created")
         
-        # Admin Logs Collection
-        logger.info("Creating indexes for admin_logs...")
-        await db.admin_logs.create_index("id", unique=True)
-        await db.admin_logs.create_index("admin_id")
-        await db.admin_logs.create_index("admin_email")
-        await db.admin_logs.create_index("action")
-        await db.admin_logs.create_index("entity")
-        await db.admin_logs.create_index([("timestamp", -1)])
-        # Compound index for common queries
-        await db.admin_logs.create_index([("admin_email", 1), ("timestamp", -1)])
-        await db.admin_logs.create_index([("entity", 1), ("action", 1)])
-        logger.info("✓ admin_logs indexes created")
+        # Admin Logs (monthly partitions admin_logs_YYYY_MM)
+        logger.info("Creating indexes for admin_logs partitions...")
+        audit_partitions = AuditLogPartitions(db)
+        await audit_partitions.ensure_partition(partition_name(datetime.utcnow()))
+        for partition in await audit_partitions.list_partitions():
+            if partition != LEGACY_COLLECTION:
+                await audit_partitions.ensure_partition(partition)
+        logger.info("✓ admin_logs partition indexes created")
+        
+        # Admin Log Rollups Collection (hourly/daily audit counters)
+        logger.info("Creating indexes for admin_log_rollups...")
+        await db.admin_log_rollups.create_index([("granularity", 1), ("bucket", 1)])
+        logger.info("✓ admin_log_rollups indexes created")
         
         # Refresh Tokens Collection
         logger.info("Creating indexes for refresh_tokens...")
-        await db.refresh_tokens.create_index("id", unique=True)
-        await db.refresh_tokens.create_index("admin_id")
-        await db.refresh_tokens.create_index("token")
-        await db.refresh_tokens.create_index("expires_at")
-        await db.refresh_tokens.create_index([("is_revoked", 1), ("expires_at", -1)])
+        await migrate_legacy_tokens(db)
+        await ensure_refresh_token_indexes(db)  # Hashed token key + TTL on expires_at
         logger.info("✓ refresh_tokens indexes created")
         
+        # updated_at on collections backed up incrementally (changed-since queries)
+        logger.info("Creating updated_at indexes for incremental backups...")
+        for collection_name in sorted(INCREMENTAL_COLLECTIONS):
+            await db[collection_name].create_index([("updated_at", 1)])
+        logger.info("✓ updated_at indexes created")
+        
         logger.info("\n✅ All indexes created successfully!")
         
         # List all indexes for verification
         logger.info("\n📊 Index Summary:")
         collections = [
             "session_bookings", "events", "blogs", "careers", "volunteers",
-            "psychologists", "contact_forms", "admins", "admin_logs", "refresh_tokens"
-        ]
+            "psychologists", "contact_forms", "admins", "admin_log_rollups", "refresh_tokens"
+        ] + sorted(INCREMENTAL_COLLECTIONS) + [name for name in await audit_partitions.list_partitions() if name != LEGACY_COLLECTION]
         
         for collection_name in collections:
             indexes = await db[collection_name].list_indexes().to_list(None)
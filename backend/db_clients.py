@@ -0,0 +1,135 @@
+"""
+Shared, lazily created MongoDB clients
+Phase 14.1 - Scalability
+
+Router modules used to build their own client at import time. A sync
+MongoClient starts its monitor threads and connects as soon as it is
+constructed, and with mongodb+srv URLs every client (Motor included)
+resolves DNS records in its constructor - so importing server.py did a
+dozen network round trips before the app could start.
+
+get_motor_client() / get_sync_client() create one client per process on
+first call. LazyDatabase and LazyCollection stand in for the module-level
+`db = client[DB_NAME]` / `things = db["things"]` globals: they resolve the
+real object on first use, so binding them at import costs nothing.
+
+    db = motor_database()                      # no client yet
+    await db.events.find_one({"id": event_id})  # client created here
+"""
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+_lock = threading.Lock()
+_motor_client: Optional[AsyncIOMotorClient] = None
+_sync_client: Optional[MongoClient] = None
+
+
+def _mongo_url() -> str:
+    # Read at first use, after server.py has loaded .env; a missing setting
+    # fails here rather than silently pointing at another server
+    return os.environ['MONGO_URL']
+
+
+def get_motor_client() -> AsyncIOMotorClient:
+    """Process-wide Motor client, created on first call"""
+    global _motor_client
+    if _motor_client is None:
+        with _lock:
+            if _motor_client is None:
+                _motor_client = AsyncIOMotorClient(_mongo_url())
+    return _motor_client
+
+
+def get_sync_client() -> MongoClient:
+    """Process-wide PyMongo client, created on first call (connects on first operation)"""
+    global _sync_client
+    if _sync_client is None:
+        with _lock:
+            if _sync_client is None:
+                _sync_client = MongoClient(_mongo_url(), connect=False)
+    return _sync_client
+
+
+class LazyDatabase:
+    """Database handle that creates its client on first attribute or item access"""
+
+    __slots__ = ("_get_client", "_name", "_database")
+
+    def __init__(self, get_client: Callable[[], Any], name: Optional[str] = None):
+        self._get_client = get_client
+        self._name = name
+        self._database = None
+
+    def resolve(self):
+        """The real Database, creating the client if needed"""
+        database = self._database
+        if database is None:
+            name = self._name or os.environ['DB_NAME']
+            database = self._database = self._get_client()[name]
+        return database
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+    def __getitem__(self, name: str):
+        return self.resolve()[name]
+
+    def __repr__(self) -> str:
+        return f"LazyDatabase({self._name or 'DB_NAME'!r}, resolved={self._database is not None})"
+
+
+class LazyCollection:
+    """Collection handle for module-level bindings, resolved on first use"""
+
+    __slots__ = ("_database", "_name", "_collection")
+
+    def __init__(self, database: LazyDatabase, name: str):
+        self._database = database
+        self._name = name
+        self._collection = None
+
+    def resolve(self):
+        collection = self._collection
+        if collection is None:
+            collection = self._collection = self._database[self._name]
+        return collection
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+    def __getitem__(self, name: str):
+        return self.resolve()[name]
+
+    def __repr__(self) -> str:
+        return f"LazyCollection({self._name!r}, resolved={self._collection is not None})"
+
+
+def motor_database(name: Optional[str] = None) -> LazyDatabase:
+    """
+    Lazy handle on a database of the shared Motor client.
+
+    Args:
+        name: Database name (default: DB_NAME from the environment at first use)
+
+    Returns:
+        LazyDatabase usable wherever a Motor database is
+    """
+    return LazyDatabase(get_motor_client, name)
+
+
+def sync_database(name: Optional[str] = None) -> LazyDatabase:
+    """Lazy handle on a database of the shared PyMongo client"""
+    return LazyDatabase(get_sync_client, name)
+
+
+def close_clients():
+    """Close whichever shared clients were created (on shutdown)"""
+    with _lock:
+        if _motor_client is not None:
+            _motor_client.close()
+        if _sync_client is not None:
+            _sync_client.close()
@@ -0,0 +1,66 @@
+"""
+Fast JSON responses
+Phase 13.1 - Performance Optimization
+
+DefaultJSONResponse renders with orjson (falling back to the stdlib json
+response when orjson is not installed) and is the application's default
+response class.
+
+Returning a model or list of models from a handler with a response_model
+makes FastAPI validate it again and walk it through jsonable_encoder before
+rendering. Handlers that already hold validated models can instead return
+trusted_model_response / trusted_list_response: the models are serialized
+straight to JSON bytes by pydantic-core, skipping the second validation.
+Keep response_model on the route - it still documents the schema.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Type
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - stdlib json is always available
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+class TrustedJSONResponse(Response):
+    """Response whose content is already-serialized JSON bytes"""
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def trusted_model_response(instance: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a validated model without re-validating it"""
+    return TrustedJSONResponse(instance.model_dump_json(), status_code=status_code)
+
+
+def trusted_list_response(model: Type[BaseModel], items: Iterable, status_code: int = 200) -> Response:
+    """
+    Serialize a list of validated models without re-validating them.
+
+    Items that are not instances of the model (e.g. raw documents put in the
+    cache by CacheWarmer) are validated first, as response_model would.
+
+    Args:
+        model: Model class of the items (the route's response_model item type)
+        items: Models or raw documents
+        status_code: Response status code
+
+    Returns:
+        Response with the JSON array as its body
+    """
+    adapter = _list_adapter(model)
+    items = items if isinstance(items, list) else list(items)
+    if not all(type(item) is model for item in items):
+        # Model instances pass through as-is; only raw documents are validated
+        items = adapter.validate_python(items)
+    return TrustedJSONResponse(adapter.dump_json(items), status_code=status_code)
@@ -0,0 +1,228 @@
+"""
+Adaptive concurrency limiting and load shedding
+Phase 14.1 - Scalability
+
+An ASGI middleware that keeps the number of in-flight requests under a
+limit that adapts to observed latency (gradient style: the limit shrinks
+when short-term latency rises above the unloaded baseline and grows
+additively while latency stays flat and the capacity is actually used).
+
+Requests are classified into priority classes. Each class may only use a
+share of the limit, so when the server is saturated public traffic is
+shed first - immediately, with 503 and Retry-After - while the remaining
+capacity stays available for health checks, authentication and admin
+writes.
+"""
+import json
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, List
+
+from cache import principal_cache
+from metrics_registry import COUNTER, MetricFamily, gauge, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+LOAD_SHEDDING_ENABLED = os.environ.get("LOAD_SHEDDING_ENABLED", "true").lower() == "true"
+CONCURRENCY_INITIAL_LIMIT = int(os.environ.get("CONCURRENCY_INITIAL_LIMIT", "100"))  # Starting in-flight limit
+CONCURRENCY_MIN_LIMIT = int(os.environ.get("CONCURRENCY_MIN_LIMIT", "10"))
+CONCURRENCY_MAX_LIMIT = int(os.environ.get("CONCURRENCY_MAX_LIMIT", "1000"))
+CONCURRENCY_LATENCY_TOLERANCE = float(os.environ.get("CONCURRENCY_LATENCY_TOLERANCE", "2.0"))  # Latency/baseline ratio tolerated before backing off
+CONCURRENCY_ADJUST_INTERVAL = 0.25  # Seconds between limit adjustments
+SHED_RETRY_AFTER = int(os.environ.get("SHED_RETRY_AFTER", "2"))  # Seconds
+
+# Priority classes and the share of the limit each may fill
+PRIORITY_CRITICAL = "critical"  # Health checks, authentication, admin writes with a verified token
+PRIORITY_NORMAL = "normal"      # Other requests with a verified token
+PRIORITY_LOW = "low"            # Public endpoints and requests without a verified token
+PRIORITY_SHARES = {
+    PRIORITY_CRITICAL: 1.0,
+    PRIORITY_NORMAL: 0.9,
+    PRIORITY_LOW: 0.75
+}
+
+AUTH_PATH_PREFIXES = ("/api/admin/auth", "/api/phase12/users/login", "/api/phase12/users/refresh")
+ADMIN_PATH_PREFIXES = ("/api/admin", "/api/phase14")
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Short-term latency reacts within a few requests. The baseline follows its
+# lowest value and drifts up slowly, so it tracks unloaded latency but
+# accepts a genuine, lasting change (roughly doubling over half a minute)
+SHORT_EWMA_ALPHA = 0.1
+BASELINE_DRIFT = 0.005  # Per adjustment
+LIMIT_SMOOTHING = 0.2
+
+
+def _has_verified_token(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+            return (
+                authorization[:7].lower() == "bearer "
+                and principal_cache.subject(authorization[7:]) is not None
+            )
+    return False
+
+
+def classify_request(scope) -> str:
+    """Priority class of a request from its path, method and credentials"""
+    path = scope["path"]
+    if path.endswith("/health") or "/health/" in path or path.startswith(AUTH_PATH_PREFIXES):
+        return PRIORITY_CRITICAL
+    # Classified before authentication: only a bearer token this worker has
+    # already verified counts as credentials, anything else is public traffic.
+    # The auth endpoints above are the only ones prioritised without them.
+    if not _has_verified_token(scope):
+        return PRIORITY_LOW
+    if path.startswith(ADMIN_PATH_PREFIXES) and scope["method"] in WRITE_METHODS:
+        return PRIORITY_CRITICAL
+    return PRIORITY_NORMAL
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    In-flight request limit driven by latency.
+
+    Latency is measured to the start of the response, so long streaming
+    bodies (exports) do not look like overload.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = CONCURRENCY_INITIAL_LIMIT,
+        min_limit: int = CONCURRENCY_MIN_LIMIT,
+        max_limit: int = CONCURRENCY_MAX_LIMIT,
+        tolerance: float = CONCURRENCY_LATENCY_TOLERANCE
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self._peak_in_flight = 0
+        self._short_latency = None
+        self._baseline_latency = None
+        self._last_adjust = time.monotonic()
+        self._stats = {
+            cls: {"admitted": 0, "shed": 0} for cls in PRIORITY_SHARES
+        }
+
+    def try_acquire(self, priority: str) -> bool:
+        """Admit a request if its class still has room under the limit"""
+        if self.in_flight >= self.limit * PRIORITY_SHARES[priority]:
+            self._stats[priority]["shed"] += 1
+            return False
+        self.in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+        self._stats[priority]["admitted"] += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    def record_latency(self, seconds: float):
+        """Feed a response latency sample and adjust the limit periodically"""
+        if self._short_latency is None:
+            self._short_latency = self._baseline_latency = seconds
+        else:
+            self._short_latency += SHORT_EWMA_ALPHA * (seconds - self._short_latency)
+
+        now = time.monotonic()
+        if now - self._last_adjust >= CONCURRENCY_ADJUST_INTERVAL:
+            self._last_adjust = now
+            self._adjust()
+
+    def _adjust(self):
+        self._baseline_latency = min(self._baseline_latency * (1 + BASELINE_DRIFT), self._short_latency)
+        # Gradient < 1 when short-term latency exceeds the tolerated baseline
+        gradient = max(0.5, min(1.0, self.tolerance * self._baseline_latency / max(self._short_latency, 1e-6)))
+        new_limit = self.limit * gradient
+        if gradient >= 1.0 and self._peak_in_flight >= self.limit / 2:
+            # Additive increase, only while the current limit is actually used
+            new_limit += math.sqrt(self.limit)
+        self.limit = min(self.max_limit, max(self.min_limit, self.limit * (1 - LIMIT_SMOOTHING) + new_limit * LIMIT_SMOOTHING))
+        self._peak_in_flight = self.in_flight
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        return {
+            "enabled": LOAD_SHEDDING_ENABLED,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "short_latency_ms": round(self._short_latency * 1000, 2) if self._short_latency is not None else None,
+            "baseline_latency_ms": round(self._baseline_latency * 1000, 2) if self._baseline_latency is not None else None,
+            "classes": {
+                cls: {**counts, "max_in_flight": int(self.limit * PRIORITY_SHARES[cls])}
+                for cls, counts in self._stats.items()
+            }
+        }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Limiter metrics for the metrics registry"""
+        admitted = MetricFamily("load_shedding_admitted_total", COUNTER, "Requests admitted by priority class")
+        shed = MetricFamily("load_shedding_shed_total", COUNTER, "Requests shed by priority class")
+        for cls, counts in self._stats.items():
+            admitted.add(counts["admitted"], {"class": cls})
+            shed.add(counts["shed"], {"class": cls})
+        return [
+            gauge("load_shedding_limit", "Adaptive in-flight request limit", int(self.limit)),
+            gauge("load_shedding_in_flight", "Requests admitted and not yet finished", self.in_flight),
+            gauge(
+                "load_shedding_short_latency_seconds", "Short-term response latency average",
+                self._short_latency
+            ),
+            gauge(
+                "load_shedding_baseline_latency_seconds", "Unloaded response latency baseline",
+                self._baseline_latency
+            ),
+            admitted,
+            shed
+        ]
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware admitting requests through the concurrency limiter"""
+
+    def __init__(self, app, limiter: AdaptiveConcurrencyLimiter = None):
+        self.app = app
+        self.limiter = limiter or concurrency_limiter
+        self._shed_body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+        self._shed_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._shed_body)).encode()),
+            (b"retry-after", str(SHED_RETRY_AFTER).encode())
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not LOAD_SHEDDING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        priority = classify_request(scope)
+        if not limiter.try_acquire(priority):
+            await send({"type": "http.response.start", "status": 503, "headers": self._shed_headers})
+            await send({"type": "http.response.body", "body": self._shed_body})
+            return
+
+        start = time.monotonic()
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                limiter.record_latency(time.monotonic() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release()
+
+
+# Global concurrency limiter
+concurrency_limiter = AdaptiveConcurrencyLimiter()
+metrics_registry.register("load_shedding", concurrency_limiter.collect_metrics)
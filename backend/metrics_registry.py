@@ -0,0 +1,219 @@
+"""
+Metrics registry and Prometheus text exposition
+Phase 14.1 - Scalability
+
+Subsystems register a collector - a function returning MetricFamily
+objects built from the stats they already keep - and the registry calls
+them when /metrics is scraped. Nothing is added to request hot paths, and
+no locks are taken: collectors only read counters their owners update.
+
+For values no subsystem tracks yet, the registry also hands out simple
+instruments (Counter, Summary) that are exported automatically.
+
+Collectors may be coroutine functions (e.g. queue depths read from
+MongoDB); their results can be cached for a few seconds so frequent scrapes
+do not turn into database load.
+"""
+import asyncio
+import inspect
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "acube")
+METRICS_COLLECT_TIMEOUT = float(os.environ.get("METRICS_COLLECT_TIMEOUT", "2.0"))  # Seconds per async collector
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+COUNTER = "counter"
+GAUGE = "gauge"
+SUMMARY = "summary"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricFamily:
+    """One metric name with its type, help text and samples"""
+
+    __slots__ = ("name", "type", "help", "samples")
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = f"{METRICS_NAMESPACE}_{name}" if METRICS_NAMESPACE else name
+        self.type = metric_type
+        self.help = help_text
+        self.samples: List[Tuple[str, Dict[str, str], float]] = []
+
+    def add(self, value: Optional[float], labels: Optional[Dict[str, Any]] = None, suffix: str = "") -> "MetricFamily":
+        """Add a sample; None values are skipped"""
+        if value is not None:
+            self.samples.append((suffix, labels or {}, value))
+        return self
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples:
+            if labels:
+                label_str = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{self.name}{suffix}{{{label_str}}} {_format_value(value)}")
+            else:
+                lines.append(f"{self.name}{suffix} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+def counter(name: str, help_text: str, value: Optional[float] = None, labels: Optional[Dict[str, Any]] = None) -> MetricFamily:
+    return MetricFamily(name, COUNTER, help_text).add(value, labels)
+
+
+def gauge(name: str, help_text: str, value: Optional[float] = None, labels: Optional[Dict[str, Any]] = None) -> MetricFamily:
+    return MetricFamily(name, GAUGE, help_text).add(value, labels)
+
+
+class Counter:
+    """Monotonic counter instrument, optionally labelled"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[MetricFamily]:
+        family = MetricFamily(self.name, COUNTER, self.help)
+        for key, value in list(self._values.items()):
+            family.add(value, dict(zip(self.labelnames, key)))
+        return [family]
+
+
+class Summary:
+    """Count and sum of observations (e.g. durations), optionally labelled"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        totals = self._values.get(key)
+        if totals is None:
+            totals = self._values[key] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += value
+
+    def collect(self) -> List[MetricFamily]:
+        family = MetricFamily(self.name, SUMMARY, self.help)
+        for key, (count, total) in list(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            family.add(count, labels, "_count")
+            family.add(total, labels, "_sum")
+        return [family]
+
+
+class MetricsRegistry:
+    """Named collectors scraped together into one exposition"""
+
+    def __init__(self):
+        self._collectors: Dict[str, Tuple[Callable, float]] = {}
+        self._cached: Dict[str, Tuple[float, List[MetricFamily]]] = {}
+
+    def register(self, name: str, collector: Callable, cache_seconds: float = 0):
+        """
+        Register (or replace) a collector.
+
+        Args:
+            name: Unique collector name, usually the subsystem
+            collector: Function or coroutine function returning MetricFamily objects
+            cache_seconds: Reuse the last result for this long (for collectors hitting the database)
+        """
+        self._collectors[name] = (collector, cache_seconds)
+        self._cached.pop(name, None)
+
+    def unregister(self, name: str):
+        self._collectors.pop(name, None)
+        self._cached.pop(name, None)
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        instrument = Counter(name, help_text, labelnames)
+        self.register(f"instrument:{name}", instrument.collect)
+        return instrument
+
+    def summary(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Summary:
+        instrument = Summary(name, help_text, labelnames)
+        self.register(f"instrument:{name}", instrument.collect)
+        return instrument
+
+    async def _run(self, name: str, collector: Callable, cache_seconds: float) -> List[MetricFamily]:
+        now = time.monotonic()
+        cached = self._cached.get(name)
+        if cached is not None and now - cached[0] < cache_seconds:
+            return cached[1]
+        try:
+            result = collector()
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, METRICS_COLLECT_TIMEOUT)
+            families = list(result)
+        except Exception as e:
+            logger.warning(f"Metrics collector {name} failed: {str(e)}")
+            return cached[1] if cached is not None else []
+        if cache_seconds:
+            self._cached[name] = (now, families)
+        return families
+
+    async def collect(self) -> List[MetricFamily]:
+        """Run every collector (async ones concurrently)"""
+        results = await asyncio.gather(*[
+            self._run(name, collector, cache_seconds)
+            for name, (collector, cache_seconds) in list(self._collectors.items())
+        ])
+        return [family for families in results for family in families]
+
+    async def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4) of every collector"""
+        families = await self.collect()
+        return "\n".join(family.render() for family in families) + "\n"
+
+
+def collect_stats(prefix: str, stats: Dict[str, Any], help_prefix: str, counters: Iterable[str] = (),
+                  labels: Optional[Dict[str, Any]] = None) -> List[MetricFamily]:
+    """
+    Metric families for the numeric values of a get_stats() dict.
+
+    Keys listed in ``counters`` are exported as counters (with a _total
+    suffix), every other numeric value as a gauge.
+    """
+    counters = set(counters)
+    families = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            families.append(counter(f"{prefix}_{key}_total", f"{help_prefix}: {key.replace('_', ' ')}", value, labels))
+        else:
+            families.append(gauge(f"{prefix}_{key}", f"{help_prefix}: {key.replace('_', ' ')}", value, labels))
+    return families
+
+
+# Global metrics registry
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,414 @@
+"""
+MongoDB command monitoring
+Phase 14.1 - Scalability
+
+A pymongo CommandListener registered globally, so it sees the commands of
+every Motor client the application creates. For each CRUD command it
+records the latency into a histogram keyed by (collection, command, query
+shape) - the filter with every value replaced by "?", so queries that differ
+only in their parameters share one series.
+
+Operations slower than SLOW_QUERY_THRESHOLD_MS go into a ring buffer with
+their normalized filter. The slowest raw command of each shape is kept (in
+memory only) so explain_shape() can ask the server for its query plan.
+
+Each command is also reported to the QueryTracker of the request that
+issued it (see query_tracking), for per-request counts and N+1 detection.
+
+pymongo invokes listeners from the threads Motor runs it on, so state is
+guarded by a lock held only for dictionary updates.
+"""
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from pymongo import monitoring
+
+from metrics_registry import COUNTER, SUMMARY, MetricFamily, metrics_registry
+from query_tracking import current_query_tracker
+from request_metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+MONGO_COMMAND_MONITORING = os.environ.get("MONGO_COMMAND_MONITORING", "true").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get("SLOW_QUERY_LOG_SIZE", "200"))  # Slow operations kept
+MAX_QUERY_SHAPES = int(os.environ.get("MAX_QUERY_SHAPES", "1000"))  # Further shapes share one series per command
+OTHER_SHAPE = "<other>"
+
+# Commands worth timing - handshakes, auth and cluster chatter are ignored
+MONITORED_COMMANDS = {
+    "find", "getMore", "aggregate", "count", "distinct",
+    "insert", "update", "delete", "findAndModify"
+}
+# Commands the server can explain
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Fields that belong to the session/transport, not the operation
+TRANSPORT_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern", "cursor"}
+
+
+def normalize_filter(value: Any) -> Any:
+    """Replace every value in a filter with "?", keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: normalize_filter(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            # $and / $or / $nor branches
+            return [normalize_filter(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def _pipeline_shape(pipeline: List[Dict[str, Any]]) -> List[Any]:
+    shape = []
+    for stage in pipeline or []:
+        for name, spec in stage.items():
+            if name == "$match":
+                shape.append({name: normalize_filter(spec)})
+            elif name == "$sort":
+                shape.append({name: dict(spec)})
+            else:
+                shape.append(name)
+    return shape
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Any:
+    """Normalized description of what a command looks for"""
+    if command_name == "find":
+        shape = {"filter": normalize_filter(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        return shape
+    if command_name == "aggregate":
+        return {"pipeline": _pipeline_shape(command.get("pipeline"))}
+    if command_name in ("count", "findAndModify"):
+        return {"filter": normalize_filter(command.get("query", {}))}
+    if command_name == "distinct":
+        return {"key": command.get("key"), "filter": normalize_filter(command.get("query", {}))}
+    if command_name == "update":
+        updates = command.get("updates") or [{}]
+        return {"filter": normalize_filter(updates[0].get("q", {}))}
+    if command_name == "delete":
+        deletes = command.get("deletes") or [{}]
+        return {"filter": normalize_filter(deletes[0].get("q", {}))}
+    return {}
+
+
+def _collection_of(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", "?"))
+    collection = command.get(command_name)
+    return collection if isinstance(collection, str) else "<database>"
+
+
+class _ShapeStats:
+    __slots__ = ("collection", "command", "shape", "histogram", "failures", "slowest_micros", "slowest_command", "database")
+
+    def __init__(self, collection: str, command: str, shape: str):
+        self.collection = collection
+        self.command = command
+        self.shape = shape
+        self.histogram = LatencyHistogram()
+        self.failures = 0
+        self.slowest_micros = 0
+        self.slowest_command = None
+        self.database = None
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Latency per (collection, command, query shape) and a slow operation log"""
+
+    def __init__(self, slow_threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+                 slow_log_size: int = SLOW_QUERY_LOG_SIZE, max_shapes: int = MAX_QUERY_SHAPES):
+        self.slow_threshold_micros = int(slow_threshold_ms * 1000)
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[_ShapeStats, Dict[str, Any], str, Any]] = {}
+        self._shapes: Dict[Tuple[str, str, str], _ShapeStats] = {}
+        self._slow_log: deque = deque(maxlen=slow_log_size)
+        self._stats = {"commands": 0, "failures": 0, "slow": 0}
+
+    def started(self, event):
+        if event.command_name not in MONITORED_COMMANDS:
+            return
+        command = event.command
+        collection = _collection_of(event.command_name, command)
+        shape = "" if event.command_name == "getMore" else json.dumps(
+            command_shape(event.command_name, command), sort_keys=True, default=str
+        )
+        key = (collection, event.command_name, shape)
+        tracker = current_query_tracker()
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    key = (collection, event.command_name, OTHER_SHAPE)
+                    stats = self._shapes.get(key)
+                if stats is None:
+                    stats = self._shapes[key] = _ShapeStats(*key)
+            self._pending[(event.connection_id, event.request_id)] = (stats, command, event.database_name, tracker)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        if event.command_name not in MONITORED_COMMANDS:
+            return
+        micros = event.duration_micros
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        stats, command, database, tracker = pending
+        if tracker is not None:
+            tracker.record((stats.collection, stats.command, stats.shape), micros)
+        with self._lock:
+            stats.histogram.record(micros)
+            self._stats["commands"] += 1
+            if failed:
+                stats.failures += 1
+                self._stats["failures"] += 1
+            if micros < self.slow_threshold_micros:
+                return
+            self._stats["slow"] += 1
+            if micros > stats.slowest_micros:
+                stats.slowest_micros = micros
+                stats.slowest_command = command
+                stats.database = database
+            self._slow_log.append({
+                "collection": stats.collection,
+                "command": stats.command,
+                "query_shape": stats.shape,
+                "duration_ms": round(micros / 1000, 2),
+                "failed": failed,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+
+    def slow_operations(self, threshold_ms: float = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow operations, newest first"""
+        with self._lock:
+            entries = list(self._slow_log)
+        entries = [entry for entry in reversed(entries) if entry["duration_ms"] >= threshold_ms]
+        return entries[:limit]
+
+    def shape_summaries(self, sort_by: str = "total_ms", limit: int = 20) -> List[Dict[str, Any]]:
+        """Query shapes with their latency percentiles, heaviest first"""
+        with self._lock:
+            shapes = [
+                (stats, stats.histogram.summary(), stats.histogram.sum)
+                for stats in self._shapes.values() if stats.histogram.total
+            ]
+        summaries = [
+            {
+                "collection": stats.collection,
+                "command": stats.command,
+                "query_shape": stats.shape,
+                **summary,
+                "total_ms": round(total / 1000, 2),
+                "failures": stats.failures
+            }
+            for stats, summary, total in shapes
+        ]
+        summaries.sort(key=lambda item: item[sort_by], reverse=True)
+        return summaries[:limit]
+
+    def worst_offenders(self, threshold_ms: float, limit: int = 5) -> List[Dict[str, Any]]:
+        """Snapshots of the shapes whose slowest run exceeded the threshold, slowest first"""
+        with self._lock:
+            offenders = [
+                {
+                    "collection": stats.collection,
+                    "command": stats.command,
+                    "query_shape": stats.shape,
+                    "slowest_ms": round(stats.slowest_micros / 1000, 2),
+                    "p99_ms": stats.histogram.summary()["p99_ms"],
+                    "count": stats.histogram.total,
+                    "database": stats.database,
+                    "slowest_command": stats.slowest_command
+                }
+                for stats in self._shapes.values()
+                if stats.slowest_command is not None and stats.slowest_micros >= threshold_ms * 1000
+            ]
+        offenders.sort(key=lambda offender: offender["slowest_ms"], reverse=True)
+        return offenders[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "query_shapes": len(self._shapes),
+                "slow_log_size": len(self._slow_log),
+                "slow_threshold_ms": self.slow_threshold_micros / 1000
+            }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Per (collection, command) latency for the metrics registry"""
+        merged: Dict[Tuple[str, str], List[Any]] = {}
+        with self._lock:
+            for stats in self._shapes.values():
+                entry = merged.setdefault((stats.collection, stats.command), [LatencyHistogram(), 0])
+                entry[0].merge(stats.histogram)
+                entry[1] += stats.failures
+            slow = self._stats["slow"]
+        durations = MetricFamily("mongo_command_duration_seconds", SUMMARY, "MongoDB command latency by collection and command")
+        failures = MetricFamily("mongo_command_failures_total", COUNTER, "Failed MongoDB commands by collection and command")
+        for (collection, command), (histogram, failed) in merged.items():
+            labels = {"collection": collection, "command": command}
+            for p, micros in histogram.percentiles().items():
+                durations.add(micros / 1_000_000, {**labels, "quantile": p / 100})
+            durations.add(histogram.total, labels, "_count")
+            durations.add(histogram.sum / 1_000_000, labels, "_sum")
+            failures.add(failed, labels)
+        slow_total = MetricFamily("mongo_slow_commands_total", COUNTER, "MongoDB commands slower than the slow query threshold").add(slow)
+        return [durations, failures, slow_total]
+
+
+class PoolStatsListener(monitoring.CommandListener):
+    """Keeps a DatabaseConnectionPool's query counters up to date"""
+
+    def __init__(self, stats: Dict[str, Any]):
+        self.stats = stats
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event.command_name, event.duration_micros, failed=False)
+
+    def failed(self, event):
+        self._record(event.command_name, event.duration_micros, failed=True)
+
+    def _record(self, command_name: str, micros: int, failed: bool):
+        if command_name not in MONITORED_COMMANDS:
+            return
+        stats = self.stats
+        total = stats["total_queries"] + 1
+        stats["avg_query_time"] += (micros / 1_000_000 - stats["avg_query_time"]) / total
+        stats["total_queries"] = total
+        if failed:
+            stats["failed_queries"] += 1
+
+
+def _explain_command(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """The recorded command without session and transport fields"""
+    explain = {}
+    for key, value in command.items():
+        if key.startswith("$") or key in TRANSPORT_FIELDS:
+            continue
+        explain[key] = value
+    if command_name == "aggregate":
+        explain["cursor"] = {}
+    return explain
+
+
+def _find_key(document: Any, key: str) -> Any:
+    """First value stored under key anywhere in a nested explain document"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def summarize_plan(plan: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Stages of a winning plan (innermost first) and the indexes it uses"""
+    stages, indexes = [], []
+
+    def walk(node):
+        if not isinstance(node, dict):
+            return
+        for child in ([node["inputStage"]] if "inputStage" in node else []) + node.get("inputStages", []):
+            walk(child)
+        if "queryPlan" in node:
+            walk(node["queryPlan"])
+        if "stage" in node:
+            stages.append(node["stage"])
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+
+    walk(plan)
+    return stages, indexes
+
+
+async def explain_shape(client, offender: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Query plan of the slowest recorded run of a shape.
+
+    Uses queryPlanner verbosity, so the server plans the query without
+    executing it again.
+
+    Args:
+        client: Motor client to run explain on
+        offender: Snapshot from CommandMonitor.worst_offenders
+
+    Returns:
+        The offender (without its raw command) with plan stages, indexes
+        used and a recommendation
+    """
+    offender = dict(offender)
+    command_name = offender["command"]
+    raw_command = offender.pop("slowest_command")
+    database = offender.pop("database")
+    result = offender
+    if command_name not in EXPLAINABLE_COMMANDS:
+        result["recommendation"] = "Not explainable - review the calling code"
+        return result
+
+    try:
+        explain = await client[database].command(
+            "explain", _explain_command(command_name, raw_command), verbosity="queryPlanner"
+        )
+    except Exception as e:
+        logger.warning(f"Explain failed for {result['collection']}.{command_name}: {str(e)}")
+        result["explain_error"] = str(e)
+        return result
+
+    stages, indexes = summarize_plan(_find_key(explain, "winningPlan") or {})
+    result["plan"] = " -> ".join(stages)
+    result["indexes_used"] = indexes
+    if "COLLSCAN" in stages:
+        shape = result["query_shape"]
+        fields = sorted(json.loads(shape).get("filter", {}).keys()) if shape.startswith("{") else []
+        fields = [field for field in fields if not field.startswith("$")]
+        result["recommendation"] = (
+            f"Collection scan - add an index on {', '.join(fields)}" if fields
+            else "Collection scan - add an index matching the filter"
+        )
+    elif "SORT" in stages:
+        result["recommendation"] = "In-memory sort - extend the index with the sort keys"
+    else:
+        result["recommendation"] = f"Uses index {', '.join(indexes)}" if indexes else "No obvious plan issue"
+    return result
+
+
+_installed = False
+
+
+def install_command_monitoring():
+    """Register the command monitor for every client created from now on"""
+    global _installed
+    if _installed or not MONGO_COMMAND_MONITORING:
+        return
+    monitoring.register(command_monitor)
+    _installed = True
+    logger.info(f"MongoDB command monitoring enabled (slow threshold {SLOW_QUERY_THRESHOLD_MS} ms)")
+
+
+# Global command monitor
+command_monitor = CommandMonitor()
+metrics_registry.register("mongo", command_monitor.collect_metrics)
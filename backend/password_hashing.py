@@ -0,0 +1,160 @@
+"""
+Bounded worker pool for password hashing
+Phase 14.1 - Scalability
+
+bcrypt is deliberately slow (tens to hundreds of milliseconds per call).
+Run inline in an async handler it blocks the event loop, so a burst of
+logins stalls every other request. Hashing and verification run here
+instead, on a dedicated thread pool (bcrypt releases the GIL while it
+works) with a fixed number of workers and a cap on waiting jobs.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from metrics_registry import MetricFamily, collect_stats, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))  # Concurrent hashes
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "256"))  # Running + queued before rejecting
+PASSWORD_HASH_RETRY_AFTER = 1  # Seconds suggested to rejected callers
+
+
+class PasswordHashingPool:
+    """
+    Thread pool dedicated to password hashing.
+
+    At most `workers` hashes run at once; further jobs wait in the pool's
+    queue. Once `max_pending` jobs are running or queued, new ones are
+    rejected with 503 instead of growing the queue (and everyone's wait)
+    without bound.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "peak_queue_depth": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_run_ms": 0.0
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _execute(self, func: Callable[..., Any], args: tuple, queued_at: float) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            wait_ms = (started - queued_at) * 1000
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._stats["total_run_ms"] += (time.perf_counter() - started) * 1000
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run a hashing function on the pool.
+
+        Args:
+            func: Blocking hash or verify function
+            *args: Its arguments
+
+        Returns:
+            The function's result
+
+        Raises:
+            HTTPException: 503 when the pool already has max_pending jobs
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                reject = True
+            else:
+                self._pending += 1
+                self._stats["submitted"] += 1
+                self._stats["peak_queue_depth"] = max(self._stats["peak_queue_depth"], self._pending - self._running)
+                reject = False
+        if reject:
+            logger.warning("Password hashing pool saturated, rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is temporarily busy, please retry",
+                headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)}
+            )
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), self._execute, func, args, time.perf_counter())
+            with self._lock:
+                self._stats["completed"] += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self):
+        """Stop the worker threads (call on shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+            running = self._running
+            pending = self._pending
+        finished = stats["completed"] + stats["failed"]
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": running,
+            "queue_depth": max(0, pending - running),
+            "submitted": stats["submitted"],
+            "completed": stats["completed"],
+            "failed": stats["failed"],
+            "rejected": stats["rejected"],
+            "peak_queue_depth": stats["peak_queue_depth"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / finished, 2) if finished else 0,
+            "max_wait_ms": round(stats["max_wait_ms"], 2),
+            "avg_run_ms": round(stats["total_run_ms"] / finished, 2) if finished else 0
+        }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Pool metrics for the metrics registry"""
+        return collect_stats(
+            "password_hash", self.get_stats(), "Password hashing pool",
+            counters=("submitted", "completed", "failed", "rejected")
+        )
+
+
+# Global password hashing pool
+password_hashing_pool = PasswordHashingPool()
+metrics_registry.register("password_hashing", password_hashing_pool.collect_metrics)
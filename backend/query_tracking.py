@@ -0,0 +1,211 @@
+"""
+Per-request database query tracking and N+1 detection
+Phase 14.1 - Scalability
+
+QueryTrackingMiddleware gives every HTTP request a QueryTracker through a
+context variable. mongo_monitoring.CommandMonitor reports each command to
+the tracker of the request that issued it (Motor copies the context into
+the threads it runs pymongo on), so the tracker ends up with the request's
+round trips, total database time and query shapes.
+
+A shape repeated N_PLUS_ONE_THRESHOLD times within one request is almost
+always a query issued per item in a loop; those requests are logged and
+counted per route. In debug mode (SERVER_TIMING_ENABLED) the counts are
+also returned in a Server-Timing header.
+
+track_queries / assert_max_queries do the same outside HTTP, for tests:
+
+    async with assert_max_queries(3):
+        await get_user_events(user_id)
+"""
+import contextvars
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics_registry import COUNTER, MetricFamily, metrics_registry
+from request_metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "5"))  # Same shape this often in one request
+SERVER_TIMING_ENABLED = os.environ.get(
+    "SERVER_TIMING_ENABLED",
+    "true" if os.environ.get("ENVIRONMENT", "production") == "development" else "false"
+).lower() == "true"
+N_PLUS_ONE_LOG_SIZE = 50  # Most recent detections kept per route
+
+_current_tracker: contextvars.ContextVar[Optional["QueryTracker"]] = contextvars.ContextVar(
+    "query_tracker", default=None
+)
+
+
+def current_query_tracker() -> Optional["QueryTracker"]:
+    """Tracker of the request (or tracked block) running in this context"""
+    return _current_tracker.get()
+
+
+class QueryTracker:
+    """Database round trips, time and query shapes of one request"""
+
+    __slots__ = ("queries", "total_micros", "shapes", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.total_micros = 0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()  # Commands of concurrent gathers finish on different threads
+
+    def record(self, shape_key: Tuple[str, str, str], micros: int):
+        with self._lock:
+            self.queries += 1
+            self.total_micros += micros
+            self.shapes[shape_key] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_micros / 1000
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Dict[str, Any]]:
+        """Shapes run at least threshold times - N+1 candidates"""
+        return [
+            {"collection": collection, "command": command, "query_shape": shape, "count": count}
+            for (collection, command, shape), count in self.shapes.most_common()
+            if count >= threshold and command != "getMore"
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.1f};desc="{self.queries} queries"'
+
+
+class NPlusOneDetector:
+    """Per-route query counts and N+1 detections"""
+
+    def __init__(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, route: str, tracker: QueryTracker):
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = {
+                "requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0,
+                "n_plus_one_requests": 0, "n_plus_one_shapes": {}
+            }
+        stats["requests"] += 1
+        stats["queries"] += tracker.queries
+        stats["db_ms"] += tracker.total_ms
+        stats["max_queries"] = max(stats["max_queries"], tracker.queries)
+
+        repeated = tracker.repeated_shapes(self.threshold)
+        if not repeated:
+            return
+        stats["n_plus_one_requests"] += 1
+        for item in repeated:
+            shape_key = f"{item['collection']}.{item['command']} {item['query_shape']}"
+            shapes = stats["n_plus_one_shapes"]
+            if shape_key in shapes or len(shapes) < N_PLUS_ONE_LOG_SIZE:
+                shapes[shape_key] = max(shapes.get(shape_key, 0), item["count"])
+            logger.warning(
+                f"N+1 query on {route}: {item['collection']}.{item['command']} "
+                f"ran {item['count']} times with shape {item['query_shape']}"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Routes by average queries per request, N+1 offenders first"""
+        routes = {
+            route: {
+                "requests": stats["requests"],
+                "avg_queries": round(stats["queries"] / stats["requests"], 2),
+                "max_queries": stats["max_queries"],
+                "avg_db_ms": round(stats["db_ms"] / stats["requests"], 2),
+                "n_plus_one_requests": stats["n_plus_one_requests"],
+                "n_plus_one_shapes": dict(stats["n_plus_one_shapes"])
+            }
+            for route, stats in list(self._routes.items())
+        }
+        return {
+            "threshold": self.threshold,
+            "routes": dict(sorted(
+                routes.items(),
+                key=lambda item: (item[1]["n_plus_one_requests"], item[1]["avg_queries"]),
+                reverse=True
+            ))
+        }
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Per-route query counts for the metrics registry"""
+        queries = MetricFamily("http_db_queries_total", COUNTER, "Database round trips issued by HTTP requests, by route")
+        n_plus_one = MetricFamily("http_n_plus_one_requests_total", COUNTER, "Requests that repeated a query shape N+1 style, by route")
+        for route, stats in list(self._routes.items()):
+            queries.add(stats["queries"], {"route": route})
+            if stats["n_plus_one_requests"]:
+                n_plus_one.add(stats["n_plus_one_requests"], {"route": route})
+        return [queries, n_plus_one]
+
+
+class QueryTrackingMiddleware:
+    """Pure ASGI middleware tracking the database queries of each HTTP request"""
+
+    def __init__(self, app, detector: NPlusOneDetector = None, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.detector = detector or n_plus_one_detector
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker()
+        token = _current_tracker.set(tracker)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                message["headers"] = list(message.get("headers") or []) + [
+                    (b"server-timing", tracker.server_timing().encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper if self.server_timing else send)
+        finally:
+            _current_tracker.reset(token)
+            self.detector.observe(route_label(scope), tracker)
+
+
+@contextmanager
+def track_queries():
+    """Track the queries issued inside the block; yields the QueryTracker"""
+    tracker = QueryTracker()
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@asynccontextmanager
+async def assert_max_queries(max_queries: int):
+    """
+    Test helper: fail if the block issues more than max_queries round trips.
+
+    Requires command monitoring (mongo_monitoring.install_command_monitoring)
+    to be installed before the client under test is created.
+    """
+    with track_queries() as tracker:
+        yield tracker
+    if tracker.queries > max_queries:
+        shapes = "\n".join(
+            f"  {count}x {collection}.{command} {shape}"
+            for (collection, command, shape), count in tracker.shapes.most_common()
+        )
+        raise AssertionError(f"Expected at most {max_queries} queries, got {tracker.queries}:\n{shapes}")
+
+
+# Global N+1 detector
+n_plus_one_detector = NPlusOneDetector()
+metrics_registry.register("db_per_request", n_plus_one_detector.collect_metrics)
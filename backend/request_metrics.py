@@ -0,0 +1,207 @@
+"""
+Request latency histograms and timing middleware
+Phase 14.1 - Scalability
+
+LatencyHistogram is an HDR-style log-linear histogram: values are bucketed
+by power of two, and each power of two is split into 64 linear sub-buckets,
+so any recorded latency is reported within ~1.5% while the histogram stays
+a small sparse dict no matter how many samples it holds.
+
+WindowedHistogram keeps one histogram per time slot in a ring, so
+percentiles can be read over sliding windows (last minute, 5 minutes, ...)
+as well as since startup.
+
+RequestTimingMiddleware times every HTTP request and hands the duration,
+route template and status code to a recorder (PerformanceMonitor).
+"""
+import os
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+SUB_BUCKET_BITS = 7  # 128 exact buckets, then 64 sub-buckets per power of two
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF_COUNT = SUB_BUCKET_COUNT // 2
+
+METRICS_SLOT_SECONDS = int(os.environ.get("METRICS_SLOT_SECONDS", "10"))  # Sliding window granularity
+METRICS_WINDOWS = {  # Window name -> seconds
+    "1m": 60,
+    "5m": 300,
+    "15m": 900
+}
+PERCENTILES = (50, 90, 99)
+
+UNMATCHED_ROUTE = "unmatched"  # Requests no route matched (404s), kept as one series
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift + 1) * SUB_BUCKET_HALF_COUNT + (value >> shift) - SUB_BUCKET_HALF_COUNT
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """Highest value recorded into a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = index // SUB_BUCKET_HALF_COUNT - 1
+    sub_bucket = index % SUB_BUCKET_HALF_COUNT + SUB_BUCKET_HALF_COUNT
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies in microseconds"""
+
+    __slots__ = ("counts", "total", "sum", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, micros: int):
+        index = _bucket_index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum += micros
+        if micros > self.max:
+            self.max = micros
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[float, int]:
+        """Value at or below which each percentile of samples falls"""
+        results = {}
+        if not self.total:
+            return {p: 0 for p in percentiles}
+        pending = sorted(percentiles)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while pending and seen >= self.total * pending[0] / 100:
+                results[pending.pop(0)] = min(_bucket_upper_bound(index), self.max)
+            if not pending:
+                break
+        for p in pending:
+            results[p] = self.max
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        """Count and latency percentiles in milliseconds"""
+        summary = {"count": self.total}
+        for p, value in self.percentiles().items():
+            summary[f"p{p}_ms"] = round(value / 1000, 3)
+        summary["max_ms"] = round(self.max / 1000, 3)
+        summary["avg_ms"] = round(self.sum / self.total / 1000, 3) if self.total else 0
+        return summary
+
+
+class _Slot:
+    __slots__ = ("start", "histogram", "statuses")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.histogram = LatencyHistogram()
+        self.statuses: Counter = Counter()
+
+
+class WindowedHistogram:
+    """Latency histogram and status counts since startup and over sliding windows"""
+
+    def __init__(self, slot_seconds: int = METRICS_SLOT_SECONDS, max_window: int = max(METRICS_WINDOWS.values())):
+        self.slot_seconds = slot_seconds
+        self.lifetime = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self._slots: deque = deque(maxlen=max_window // slot_seconds + 1)
+
+    def record(self, micros: int, status_code: int, now: Optional[float] = None):
+        self.lifetime.record(micros)
+        self.statuses[status_code] += 1
+
+        slot_start = int((now if now is not None else time.monotonic()) // self.slot_seconds)
+        if not self._slots or self._slots[-1].start != slot_start:
+            self._slots.append(_Slot(slot_start))
+        slot = self._slots[-1]
+        slot.histogram.record(micros)
+        slot.statuses[status_code] += 1
+
+    def window(self, seconds: int, now: Optional[float] = None) -> Tuple[LatencyHistogram, Counter]:
+        """Merged histogram and status counts of the slots inside the window"""
+        oldest = int((now if now is not None else time.monotonic()) // self.slot_seconds) - seconds // self.slot_seconds
+        histogram = LatencyHistogram()
+        statuses: Counter = Counter()
+        for slot in reversed(self._slots):
+            if slot.start <= oldest:
+                break
+            histogram.merge(slot.histogram)
+            statuses.update(slot.statuses)
+        return histogram, statuses
+
+
+def status_summary(statuses: Counter) -> Dict[str, Any]:
+    """Status code counts with client/server error rates"""
+    total = sum(statuses.values())
+    client_errors = sum(count for code, count in statuses.items() if 400 <= code < 500)
+    server_errors = sum(count for code, count in statuses.items() if code >= 500)
+    return {
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "error_rate": (client_errors + server_errors) / total if total else 0,
+        "server_error_rate": server_errors / total if total else 0
+    }
+
+
+def route_label(scope) -> str:
+    """Route template of a handled request, e.g. 'GET /api/events/{event_id}'"""
+    route = scope.get("route")
+    if route is not None:
+        return f"{scope['method']} {route.path}"
+    if "endpoint" in scope:
+        # Mounted app (static files) - one series per mount
+        return f"{scope['method']} {scope.get('root_path', '')}/{{path}}"
+    return UNMATCHED_ROUTE
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request end to end.
+
+    The route template is read from the scope after the router has matched
+    it, so parameterised paths share one series per template. Latency ends
+    with the last body message - background tasks Starlette runs after the
+    response is sent are not counted.
+    """
+
+    def __init__(self, app, recorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = self.recorder
+        start = time.perf_counter()
+        finished = None
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+
+        recorder.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            recorder.request_finished(route_label(scope), (finished or time.perf_counter()) - start, status_code)
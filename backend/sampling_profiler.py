@@ -0,0 +1,339 @@
+"""
+On-demand sampling profiler
+Phase 14.7 - Go-Live Hardening
+
+A background thread samples the event loop thread's Python stack every
+few milliseconds (sys._current_frames) for a bounded window, so the
+overhead is one stack walk per interval and nothing at all while no
+session is running. Samples where the loop is idle in its selector are
+counted but not stored.
+
+A session can be restricted to requests whose path starts with a prefix
+or that carry a header: ProfilingMiddleware marks the asyncio tasks of
+matching requests, and only samples taken while one of those tasks is
+running are kept. Time spent awaiting I/O does not show up in a sampling
+profile - see the slow query log and Server-Timing for database time.
+
+Finished sessions are written to PROFILE_DIR as a collapsed-stack file
+(flamegraph.pl / speedscope) and a speedscope JSON file. The directory is
+pruned to PROFILE_MAX_FILES sessions and PROFILE_MAX_BYTES.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "/app/backend/profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "20"))  # Sessions kept
+PROFILE_MAX_BYTES = int(os.environ.get("PROFILE_MAX_BYTES", str(50 * 1024 * 1024)))
+PROFILE_MAX_DURATION = 300  # Seconds
+PROFILE_MIN_INTERVAL_MS = 1.0
+PROFILE_MAX_STACK_DEPTH = 128
+
+PROFILE_FORMATS = {
+    "speedscope": (".speedscope.json", "application/json"),
+    "collapsed": (".collapsed.txt", "text/plain")
+}
+PROFILE_ID_PATTERN = re.compile(r"^profile_\d{8}_\d{6}_[0-9a-f]{6}$")
+
+# Innermost frame of an idle loop: the selector wait (asyncio) or the loop runner (uvloop runs its loop in C)
+IDLE_FILES = ("selectors.py", os.path.join("asyncio", "runners.py"))
+
+
+def _frame_label(code) -> Tuple[str, str, int]:
+    return code.co_name, code.co_filename, code.co_firstlineno
+
+
+def capture_stack(frame) -> Tuple[Tuple[str, str, int], ...]:
+    """Stack of a frame, outermost first"""
+    stack = []
+    while frame is not None and len(stack) < PROFILE_MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def to_collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format: one 'a;b;c count' line per stack"""
+    lines = []
+    for stack, count in stacks.most_common():
+        lines.append(";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack) + f" {count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(stacks: Counter, name: str, interval_ms: float) -> Dict[str, Any]:
+    """Speedscope sampled profile; identical stacks are merged into one weighted sample"""
+    frames: List[Dict[str, Any]] = []
+    frame_index: Dict[Tuple[str, str, int], int] = {}
+    samples, weights = [], []
+    for stack, count in stacks.most_common():
+        indexes = []
+        for frame in stack:
+            index = frame_index.get(frame)
+            if index is None:
+                index = frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indexes.append(index)
+        samples.append(indexes)
+        weights.append(count * interval_ms)
+    total = sum(weights)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": total,
+            "samples": samples,
+            "weights": weights
+        }],
+        "name": name,
+        "exporter": "sampling_profiler"
+    }
+
+
+class ProfileSession:
+    """One profiling window and the stacks sampled during it"""
+
+    def __init__(self, duration: float, interval_ms: float, path_prefix: Optional[str],
+                 header: Optional[Tuple[bytes, Optional[bytes]]], started_by: Optional[str]):
+        now = datetime.utcnow()
+        self.profile_id = f"profile_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.started_at = now
+        self.duration = duration
+        self.interval_ms = interval_ms
+        self.path_prefix = path_prefix
+        self.header = header
+        self.started_by = started_by
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.filtered_out = 0
+        self.target_tasks: set = set()
+        self.stop_event = threading.Event()
+
+    @property
+    def filtered(self) -> bool:
+        return self.path_prefix is not None or self.header is not None
+
+    def matches(self, scope) -> bool:
+        if self.path_prefix is not None and not scope["path"].startswith(self.path_prefix):
+            return False
+        if self.header is not None:
+            name, value = self.header
+            for header_name, header_value in scope["headers"]:
+                if header_name == name and (value is None or header_value == value):
+                    return True
+            return False
+        return True
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": self.duration,
+            "interval_ms": self.interval_ms,
+            "path_prefix": self.path_prefix,
+            "header": (
+                f"{self.header[0].decode('latin-1')}: {self.header[1].decode('latin-1')}"
+                if self.header and self.header[1] is not None
+                else self.header[0].decode("latin-1") if self.header else None
+            ),
+            "started_by": self.started_by,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "filtered_out_samples": self.filtered_out,
+            "unique_stacks": len(self.stacks)
+        }
+
+
+class SamplingProfiler:
+    """Runs at most one profiling session at a time and stores its output"""
+
+    def __init__(self, profile_dir: Path = PROFILE_DIR):
+        self.profile_dir = profile_dir
+        self.session: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None
+
+    def start(self, duration: float, interval_ms: float = 10.0, path_prefix: Optional[str] = None,
+              header: Optional[str] = None, started_by: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start sampling the running event loop; call from the loop thread.
+
+        Args:
+            duration: Seconds to sample (at most PROFILE_MAX_DURATION)
+            interval_ms: Sampling interval
+            path_prefix: Only sample requests whose path starts with this
+            header: Only sample requests carrying this header ("name" or "name: value")
+            started_by: Admin starting the session, stored with the profile
+
+        Returns:
+            Session metadata
+
+        Raises:
+            RuntimeError: A session is already running
+        """
+        header_filter = None
+        if header:
+            name, _, value = header.partition(":")
+            header_filter = (name.strip().lower().encode("latin-1"), value.strip().encode("latin-1") if value.strip() else None)
+
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError(f"Profiling session {self.session.profile_id} is already running")
+            session = ProfileSession(
+                duration=min(max(duration, 1), PROFILE_MAX_DURATION),
+                interval_ms=max(interval_ms, PROFILE_MIN_INTERVAL_MS),
+                path_prefix=path_prefix or None,
+                header=header_filter,
+                started_by=started_by
+            )
+            self.session = session
+
+        loop = asyncio.get_running_loop()
+        thread = threading.Thread(
+            target=self._sample, args=(session, loop, threading.get_ident()),
+            name=f"profiler-{session.profile_id}", daemon=True
+        )
+        thread.start()
+        logger.info(f"Profiling session {session.profile_id} started ({session.duration}s, {session.interval_ms}ms)")
+        return session.metadata()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """End the running session early; it is saved as usual"""
+        session = self.session
+        if session is None:
+            return None
+        session.stop_event.set()
+        return session.metadata()
+
+    def status(self) -> Dict[str, Any]:
+        session = self.session
+        return {
+            "active": session is not None,
+            "session": session.metadata() if session is not None else None
+        }
+
+    def _sample(self, session: ProfileSession, loop, loop_thread_id: int):
+        interval = session.interval_ms / 1000
+        deadline = time.monotonic() + session.duration
+        try:
+            while not session.stop_event.wait(interval) and time.monotonic() < deadline:
+                frame = sys._current_frames().get(loop_thread_id)
+                if frame is None:
+                    break
+                if frame.f_code.co_filename.endswith(IDLE_FILES):
+                    session.idle_samples += 1
+                    continue
+                if session.filtered and asyncio.current_task(loop) not in session.target_tasks:
+                    session.filtered_out += 1
+                    continue
+                session.stacks[capture_stack(frame)] += 1
+                session.samples += 1
+                del frame
+        except Exception as e:
+            logger.error(f"Profiling session {session.profile_id} failed: {str(e)}")
+        finally:
+            try:
+                self._save(session)
+            except Exception as e:
+                logger.error(f"Saving profile {session.profile_id} failed: {str(e)}")
+            with self._lock:
+                self.session = None
+
+    def _save(self, session: ProfileSession):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        base = self.profile_dir / session.profile_id
+        metadata = session.metadata()
+        metadata["completed_at"] = datetime.utcnow().isoformat()
+
+        base.with_name(base.name + PROFILE_FORMATS["collapsed"][0]).write_text(to_collapsed(session.stacks))
+        speedscope = to_speedscope(session.stacks, session.profile_id, session.interval_ms)
+        base.with_name(base.name + PROFILE_FORMATS["speedscope"][0]).write_text(json.dumps(speedscope))
+        base.with_name(base.name + ".meta.json").write_text(json.dumps(metadata, indent=2))
+        logger.info(f"Profile {session.profile_id} saved: {session.samples} samples, {len(session.stacks)} stacks")
+        self._prune()
+
+    def _files_of(self, profile_id: str) -> List[Path]:
+        return [
+            self.profile_dir / f"{profile_id}{suffix}"
+            for suffix in [suffix for suffix, _ in PROFILE_FORMATS.values()] + [".meta.json"]
+        ]
+
+    def _prune(self):
+        """Drop the oldest profiles beyond PROFILE_MAX_FILES / PROFILE_MAX_BYTES"""
+        profiles = self.list_profiles()  # Newest first
+        total = 0
+        for index, profile in enumerate(profiles):
+            total += profile["size_bytes"]
+            if index >= PROFILE_MAX_FILES or total > PROFILE_MAX_BYTES:
+                for path in self._files_of(profile["profile_id"]):
+                    path.unlink(missing_ok=True)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first"""
+        if not self.profile_dir.exists():
+            return []
+        profiles = []
+        for meta_file in self.profile_dir.glob("profile_*.meta.json"):
+            try:
+                metadata = json.loads(meta_file.read_text())
+            except (OSError, ValueError):
+                continue
+            profile_id = metadata.get("profile_id")
+            if not profile_id or not PROFILE_ID_PATTERN.match(profile_id):
+                continue
+            metadata["size_bytes"] = sum(path.stat().st_size for path in self._files_of(profile_id) if path.exists())
+            profiles.append(metadata)
+        profiles.sort(key=lambda item: item["profile_id"], reverse=True)
+        return profiles
+
+    def profile_path(self, profile_id: str, profile_format: str) -> Optional[Path]:
+        """File of a stored profile, or None (ids are validated, so no traversal)"""
+        if not PROFILE_ID_PATTERN.match(profile_id) or profile_format not in PROFILE_FORMATS:
+            return None
+        path = self.profile_dir / f"{profile_id}{PROFILE_FORMATS[profile_format][0]}"
+        return path if path.exists() else None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware marking the tasks of requests a filtered session should sample"""
+
+    def __init__(self, app, profiler: SamplingProfiler = None):
+        self.app = app
+        self.profiler = profiler or sampling_profiler
+
+    async def __call__(self, scope, receive, send):
+        session = self.profiler.session
+        if session is None or not session.filtered or scope["type"] != "http" or not session.matches(scope):
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        session.target_tasks.add(task)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.target_tasks.discard(task)
+
+
+# Global sampling profiler
+sampling_profiler = SamplingProfiler()
@@ -2,11 +2,12 @@ from fastapi import FastAPI, APIRouter, HTTPException, status, BackgroundTasks,
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
 from typing import List, Optional
+from contextlib import asynccontextmanager
 from models import (
     SessionBooking, SessionBookingCreate,
     Event, EventCreate, EventRegistration,
@@ -22,17 +23,38 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from api.admin.rate_limits import limiter, PUBLIC_RATE_LIMIT
 from api.admin.background_tasks import EmailService
+from json_responses import DefaultJSONResponse, ORJSON_AVAILABLE, trusted_list_response
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Phase 14.1 - Command monitoring must be registered before any client is created
+from mongo_monitoring import install_command_monitoring
+
+install_command_monitoring()
+
+# MongoDB connection - one client shared with the routers, created on first query
+from db_clients import close_clients, motor_database
+
+db = motor_database()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown work (see on_startup / on_shutdown at the end of this module)"""
+    await on_startup(app)
+    try:
+        yield
+    finally:
+        await on_shutdown(app)
+
 
 # Create the main app without a prefix
-app = FastAPI(title="A-Cube Mental Health Platform API")
+app = FastAPI(
+    title="A-Cube Mental Health Platform API",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
+)
 
 # Add rate limiter to app state
 app.state.limiter = limiter
@@ -79,7 +101,7 @@ async def get_all_sessions(request: Request, status_filter: Optional[str] = None
     try:
         query = {"status": status_filter} if status_filter else {}
         bookings = await db.session_bookings.find(query).to_list(1000)
-        return [SessionBooking(**booking) for booking in bookings]
+        return trusted_list_response(SessionBooking, [SessionBooking(**booking) for booking in bookings])
     except Exception as e:
         logger.error(f"Error fetching sessions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch sessions")
@@ -134,7 +156,7 @@ async def get_all_events(request: Request, is_active: Optional[bool] = None):
         # Try to get from cache
         cached_result = cache.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return trusted_list_response(Event, cached_result)
         
         # Query database
         query = {"is_active": is_active} if is_active is not None else {}
@@ -144,7 +166,7 @@ async def get_all_events(request: Request, is_active: Optional[bool] = None):
         # Cache result for 5 minutes (300 seconds)
         cache.set(cache_key, result, ttl=300)
         
-        return result
+        return trusted_list_response(Event, result)
     except Exception as e:
         logger.error(f"Error fetching events: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch events")
@@ -219,7 +241,7 @@ async def get_all_blogs(category: Optional[str] = None, featured: Optional[bool]
         # Try to get from cache
         cached_result = cache.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return trusted_list_response(Blog, cached_result)
         
         # Query database
         query = {}
@@ -234,7 +256,7 @@ async def get_all_blogs(category: Optional[str] = None, featured: Optional[bool]
         # Cache result for 5 minutes (300 seconds)
         cache.set(cache_key, result, ttl=300)
         
-        return result
+        return trusted_list_response(Blog, result)
     except Exception as e:
         logger.error(f"Error fetching blogs: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch blogs")
@@ -273,7 +295,7 @@ async def get_all_jobs(is_active: Optional[bool] = None):
         # Try to get from cache
         cached_result = cache.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return trusted_list_response(Career, cached_result)
         
         # Query database
         query = {"is_active": is_active} if is_active is not None else {}
@@ -283,7 +305,7 @@ async def get_all_jobs(is_active: Optional[bool] = None):
         # Cache result for 10 minutes (600 seconds)
         cache.set(cache_key, result, ttl=600)
         
-        return result
+        return trusted_list_response(Career, result)
     except Exception as e:
         logger.error(f"Error fetching job postings: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch job postings")
@@ -348,7 +370,7 @@ async def get_all_volunteers(request: Request, status_filter: Optional[str] = No
     try:
         query = {"status": status_filter} if status_filter else {}
         volunteers = await db.volunteers.find(query).to_list(1000)
-        return [Volunteer(**volunteer) for volunteer in volunteers]
+        return trusted_list_response(Volunteer, [Volunteer(**volunteer) for volunteer in volunteers])
     except Exception as e:
         logger.error(f"Error fetching volunteers: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch volunteers")
@@ -378,7 +400,7 @@ async def get_all_psychologists(is_active: Optional[bool] = None):
         # Try to get from cache
         cached_result = cache.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return trusted_list_response(Psychologist, cached_result)
         
         # Query database
         query = {"is_active": is_active} if is_active is not None else {}
@@ -388,7 +410,7 @@ async def get_all_psychologists(is_active: Optional[bool] = None):
         # Cache result for 10 minutes (600 seconds)
         cache.set(cache_key, result, ttl=600)
         
-        return result
+        return trusted_list_response(Psychologist, result)
     except Exception as e:
         logger.error(f"Error fetching psychologists: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch psychologists")
@@ -433,7 +455,7 @@ async def get_all_contact_forms(request: Request, status_filter: Optional[str] =
     try:
         query = {"status": status_filter} if status_filter else {}
         forms = await db.contact_forms.find(query).to_list(1000)
-        return [ContactForm(**form) for form in forms]
+        return trusted_list_response(ContactForm, [ContactForm(**form) for form in forms])
     except Exception as e:
         logger.error(f"Error fetching contact forms: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch contact forms")
@@ -541,8 +563,22 @@ app.include_router(phase14_hardening_router)  # Phase 14.7 routes
 app.include_router(phase15_pwa_router)  # Phase 15.1 routes - PWA
 app.include_router(phase15_router)  # Phase 15.2 routes - Mobile & Push Notifications
 
+
+# ============= METRICS EXPOSITION (Phase 14.1) =============
+from fastapi.responses import PlainTextResponse
+from metrics_registry import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics_registry
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # When set, scrapers must send "Authorization: Bearer <token>"
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Every registered subsystem's counters in Prometheus text format"""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(await metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Mount static files for uploads
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 # Create static/uploads directory if it doesn't exist
@@ -550,7 +586,16 @@ static_dir = Path("/app/backend/static")
 uploads_dir = static_dir / "uploads"
 uploads_dir.mkdir(parents=True, exist_ok=True)
 
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+# Serves .br/.gz siblings (see compression.precompress_directory) when accepted
+from compression import PrecompressedStaticFiles
+
+app.mount("/static", PrecompressedStaticFiles(directory=str(static_dir)), name="static")
+
+# Phase 14.1 - Adaptive concurrency limit; sheds public traffic first under overload
+# (added before CORS so shed responses still carry CORS headers)
+from load_shedding import LoadSheddingMiddleware
+
+app.add_middleware(LoadSheddingMiddleware)
 
 # CORS Middleware
 app.add_middleware(
@@ -562,46 +607,37 @@ app.add_middleware(
 )
 
 # Phase 13.1 - Compression Middleware for Performance
-from starlette.middleware.gzip import GZipMiddleware
+from compression import CompressionMiddleware
 
-# Add GZip compression for responses > 500 bytes
-app.add_middleware(GZipMiddleware, minimum_size=500)
+# Brotli/zstd/gzip (negotiated) for compressible responses > 500 bytes
+app.add_middleware(CompressionMiddleware, minimum_size=500)
 
 # Security Headers Middleware (Phase 9.7 - Final Hardening)
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response as StarletteResponse
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Security headers for production
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        
-        # Content Security Policy (basic - adjust as needed)
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://www.googletagmanager.com https://www.google-analytics.com; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self' data:; "
-            "connect-src 'self' https://www.google-analytics.com;"
-        )
-        
-        return response
+from security_headers import SecurityHeadersMiddleware
 
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Phase 14.1 - Per-request DB query counts, N+1 detection and Server-Timing (debug mode)
+from query_tracking import QueryTrackingMiddleware
+
+app.add_middleware(QueryTrackingMiddleware)
+
+# Phase 14.7 - Marks requests matching a filtered on-demand profiling session
+from sampling_profiler import ProfilingMiddleware
+
+app.add_middleware(ProfilingMiddleware)
+
+# Phase 14.1 - Per-route latency histograms, status codes and in-flight gauges
+# (outermost, so shed, compressed and error responses are all timed)
+from request_metrics import RequestTimingMiddleware
+from api.phase14_scalability import performance_monitor
 
-# Phase 14.1 - Startup and Shutdown Events
-@app.on_event("startup")
-async def startup_cache_warming():
-    """Warm cache on application startup for better initial performance"""
+app.add_middleware(RequestTimingMiddleware, recorder=performance_monitor)
+
+
+# Phase 14.1 - Startup and Shutdown (run by the lifespan handler above)
+async def warm_caches():
+    """Warm critical caches in the background; the app serves (cold) meanwhile"""
     try:
         from api.phase14_scalability import CacheWarmer
         logger.info("Phase 14.1: Initializing cache warming...")
@@ -609,10 +645,57 @@ async def startup_cache_warming():
         logger.info("✅ Phase 14.1: Cache warming completed")
     except Exception as e:
         logger.error(f"Cache warming on startup failed: {str(e)}")
-        # Don't block startup if cache warming fails
 
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+async def startup_audit_sink(app: FastAPI):
+    """Start the buffered audit log writer on the shared database client"""
+    from api.admin.audit_sink import audit_sink
+    from api.admin.audit_rollups import backfill_rollups
+    from api.admin.audit_partitions import AuditLogPartitions, run_maintenance_loop
+    try:
+        # Roll up pre-existing audit history once, before new entries are counted
+        await backfill_rollups(db)
+    except Exception as e:
+        logger.error(f"Audit rollup backfill failed: {str(e)}")
+    audit_sink.use_collection(AuditLogPartitions(db))
+    audit_sink.start()
+    # Legacy migration and archival of expired monthly partitions
+    app.state.audit_maintenance = asyncio.create_task(run_maintenance_loop(db))
+
+
+async def startup_refresh_token_revocations(app: FastAPI):
+    """Load revoked refresh tokens and keep the local revocation set in sync"""
+    from api.admin.refresh_tokens import prepare_refresh_tokens, run_revocation_sync_loop
+    try:
+        await prepare_refresh_tokens(db)
+    except Exception as e:
+        logger.error(f"Refresh token migration failed: {str(e)}")
+    app.state.revocation_sync = asyncio.create_task(run_revocation_sync_loop(db))
+
+
+async def on_startup(app: FastAPI):
+    if not ORJSON_AVAILABLE:
+        logger.warning("orjson is not installed - responses fall back to the slower stdlib JSON encoder")
+    # Cache warming is an optimisation - don't hold up readiness for it
+    app.state.cache_warming = asyncio.create_task(warm_caches())
+    # Audit and revocation state must be ready before requests are served;
+    # they are independent, so prepare them concurrently
+    await asyncio.gather(startup_audit_sink(app), startup_refresh_token_revocations(app))
+
+
+async def on_shutdown(app: FastAPI):
+    for task_name in ("cache_warming", "audit_maintenance", "revocation_sync"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    # Flush buffered audit entries before the client goes away
+    from api.admin.audit_sink import audit_sink
+    await audit_sink.stop()
+    from password_hashing import password_hashing_pool
+    password_hashing_pool.shutdown()
+    from api.admin.bulk_import import shutdown_validation_pool
+    shutdown_validation_pool()
+    from api.phase14_router import db_pool
+    await db_pool.close()
+    close_clients()
     logger.info("Database connection closed")